@@ -7,17 +7,35 @@ CREATE EXTENSION IF NOT EXISTS vector;
 -- The \gexec meta-command is used so the CREATE INDEX statements only run when the
 -- index is missing. Each command is executed outside an explicit transaction so the
 -- CONCURRENTLY clause is allowed.
+--
+-- The build parameters match the backend defaults (HNSW_M, HNSW_EF_CONSTRUCTION);
+-- keep them in sync when tuning those settings.
 SELECT 'CREATE INDEX CONCURRENTLY embeddings_embedding_hnsw_idx '
-       'ON embeddings USING hnsw (embedding vector_cosine_ops)'
+       'ON embeddings USING hnsw (embedding vector_cosine_ops) '
+       'WITH (m = 16, ef_construction = 64)'
 WHERE to_regclass('embeddings_embedding_hnsw_idx') IS NULL
 \gexec
 
+-- The full-precision image indexes are only built for VECTOR_STORAGE=full (the
+-- default). With halfvec or binary storage the backend builds the compact
+-- indexes on startup instead, so the full ones would only cost memory.
+\getenv vector_storage VECTOR_STORAGE
+\if :{?vector_storage}
+\else
+\set vector_storage full
+\endif
+SELECT lower(:'vector_storage') = 'full' AS full_vector_storage \gset
+
+\if :full_vector_storage
 SELECT 'CREATE INDEX CONCURRENTLY images_embedding_hnsw_idx '
-       'ON images USING hnsw (embedding vector_cosine_ops)'
+       'ON images USING hnsw (embedding vector_cosine_ops) '
+       'WITH (m = 16, ef_construction = 64)'
 WHERE to_regclass('images_embedding_hnsw_idx') IS NULL
 \gexec
 
 SELECT 'CREATE INDEX CONCURRENTLY images_text_embedding_hnsw_idx '
-       'ON images USING hnsw (text_embedding vector_cosine_ops)'
+       'ON images USING hnsw (text_embedding vector_cosine_ops) '
+       'WITH (m = 16, ef_construction = 64)'
 WHERE to_regclass('images_text_embedding_hnsw_idx') IS NULL
 \gexec
+\endif
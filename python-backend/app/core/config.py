@@ -25,6 +25,18 @@ def _get_required_env(key: str) -> str:
     return value
 
 
+# Matches are only found exhaustively below the number of perceptual hash
+# segments (``app.utils.perceptual_hash.SEGMENT_COUNT``).
+_MAX_NEAR_DUPLICATE_DISTANCE = 3
+
+
+def _get_near_duplicate_distance(key: str, *, limit: int, limit_name: str) -> int:
+    value = int(os.getenv(key, "-1"))
+    if value > limit:
+        raise RuntimeError(f"{key} must not exceed {limit_name} ({limit}), got {value}")
+    return value
+
+
 def _get_cors_origins() -> List[str]:
     raw_origins = os.getenv("CORS_ORIGINS")
     if raw_origins:
@@ -50,17 +62,59 @@ class Settings:
     minio_secret_key: str = "minioadmin"
     minio_bucket: str = "images"
     minio_secure: bool = False
+    minio_part_size: int = 10 * 1024 * 1024
     cors_origins: List[str] = field(default_factory=_get_cors_origins)
     openai_api_url: str = "https://api.openai.com/v1/responses"
     openai_chat_api_url: str = "https://api.openai.com/v1/chat/completions"
     openai_api_key: Optional[str] = None
     create_demo_user: bool = False
+    ingest_workers: int = 2
+    ingest_queue_size: int = 32
+    ingest_concurrent_stages: bool = False
+    ingest_stage_workers: int = 4
+    streaming_uploads: bool = False
+    near_duplicate_max_distance: int = -1
+    near_duplicate_reuse_distance: int = -1
+    embedding_model: str = "clip-ViT-B-32"
+    embedding_dimension: int = 512
+    embedding_registry_refresh_seconds: float = 30.0
+    embedding_backend: str = "torch"
+    onnx_model_dir: str = "models/clip-onnx"
+    onnx_quantized: bool = True
+    embedding_micro_batching: bool = False
+    embedding_batch_max_size: int = 32
+    embedding_batch_max_wait_ms: float = 5.0
+    embedding_cache_memory_bytes: int = 16 * 1024 * 1024
+    embedding_cache_path: Optional[str] = None
+    ocr_backend: str = "inline"
+    ocr_workers: int = 2
+    upload_spool_max_bytes: int = 8 * 1024 * 1024
+    model_warmup: bool = False
+    model_server_socket: Optional[str] = None
+    model_server_authkey: Optional[str] = None
+    vector_index_backend: str = "pgvector"
+    vector_index_path: str = "vector-index"
+    retrieval_cache_entries: int = 1024
+    semantic_cache_entries: int = 0
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_near_hit_margin: float = 0.02
+    hnsw_m: int = 16
+    hnsw_ef_construction: int = 64
+    hnsw_ef_search: Optional[int] = None
+    hnsw_iterative_scan: str = "off"
+    vector_storage: str = "full"
+    vector_rerank_oversample: int = 4
 
 
 @lru_cache
 def get_settings() -> Settings:
     """Return a cached instance of :class:`Settings`."""
 
+    near_duplicate_max_distance = _get_near_duplicate_distance(
+        "NEAR_DUPLICATE_MAX_DISTANCE",
+        limit=_MAX_NEAR_DUPLICATE_DISTANCE,
+        limit_name="the number of hash segments minus one",
+    )
     return Settings(
         database_url=_get_required_env("DATABASE_URL"),
         jwt_secret=_get_required_env("JWT_SECRET"),
@@ -73,6 +127,7 @@ def get_settings() -> Settings:
         minio_secret_key=os.getenv("MINIO_SECRET_KEY", "minioadmin"),
         minio_bucket=os.getenv("MINIO_BUCKET", "images"),
         minio_secure=_str_to_bool(os.getenv("MINIO_SECURE"), False),
+        minio_part_size=int(os.getenv("MINIO_PART_SIZE", str(10 * 1024 * 1024))),
         cors_origins=_get_cors_origins(),
         openai_api_url=os.getenv("OPENAI_API_URL", "https://api.openai.com/v1/responses"),
         openai_chat_api_url=os.getenv(
@@ -80,6 +135,62 @@ def get_settings() -> Settings:
         ),
         openai_api_key=os.getenv("OPENAI_API_KEY"),
         create_demo_user=_str_to_bool(os.getenv("CREATE_DEMO_USER"), False),
+        ingest_workers=int(os.getenv("INGEST_WORKERS", "2")),
+        ingest_queue_size=int(os.getenv("INGEST_QUEUE_SIZE", "32")),
+        ingest_concurrent_stages=_str_to_bool(
+            os.getenv("INGEST_CONCURRENT_STAGES"), False
+        ),
+        ingest_stage_workers=int(os.getenv("INGEST_STAGE_WORKERS", "4")),
+        streaming_uploads=_str_to_bool(os.getenv("STREAMING_UPLOADS"), False),
+        near_duplicate_max_distance=near_duplicate_max_distance,
+        near_duplicate_reuse_distance=_get_near_duplicate_distance(
+            "NEAR_DUPLICATE_REUSE_DISTANCE",
+            limit=near_duplicate_max_distance,
+            limit_name="NEAR_DUPLICATE_MAX_DISTANCE",
+        ),
+        embedding_model=os.getenv("EMBEDDING_MODEL", "clip-ViT-B-32"),
+        embedding_dimension=int(os.getenv("EMBEDDING_DIMENSION", "512")),
+        embedding_registry_refresh_seconds=float(
+            os.getenv("EMBEDDING_REGISTRY_REFRESH_SECONDS", "30")
+        ),
+        embedding_backend=os.getenv("EMBEDDING_BACKEND", "torch").lower(),
+        onnx_model_dir=os.getenv("ONNX_MODEL_DIR", "models/clip-onnx"),
+        onnx_quantized=_str_to_bool(os.getenv("ONNX_QUANTIZED"), True),
+        embedding_micro_batching=_str_to_bool(
+            os.getenv("EMBEDDING_MICRO_BATCHING"), False
+        ),
+        embedding_batch_max_size=int(os.getenv("EMBEDDING_BATCH_MAX_SIZE", "32")),
+        embedding_batch_max_wait_ms=float(
+            os.getenv("EMBEDDING_BATCH_MAX_WAIT_MS", "5")
+        ),
+        embedding_cache_memory_bytes=int(
+            os.getenv("EMBEDDING_CACHE_MEMORY_BYTES", str(16 * 1024 * 1024))
+        ),
+        embedding_cache_path=os.getenv("EMBEDDING_CACHE_PATH") or None,
+        ocr_backend=os.getenv("OCR_BACKEND", "inline").lower(),
+        ocr_workers=int(os.getenv("OCR_WORKERS", "2")),
+        upload_spool_max_bytes=int(
+            os.getenv("UPLOAD_SPOOL_MAX_BYTES", str(8 * 1024 * 1024))
+        ),
+        model_warmup=_str_to_bool(os.getenv("MODEL_WARMUP"), False),
+        model_server_socket=os.getenv("MODEL_SERVER_SOCKET") or None,
+        model_server_authkey=os.getenv("MODEL_SERVER_AUTHKEY") or None,
+        vector_index_backend=os.getenv("VECTOR_INDEX_BACKEND", "pgvector").lower(),
+        vector_index_path=os.getenv("VECTOR_INDEX_PATH", "vector-index"),
+        retrieval_cache_entries=int(os.getenv("RETRIEVAL_CACHE_ENTRIES", "1024")),
+        semantic_cache_entries=int(os.getenv("SEMANTIC_CACHE_ENTRIES", "0")),
+        semantic_cache_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.95")),
+        semantic_cache_near_hit_margin=float(
+            os.getenv("SEMANTIC_CACHE_NEAR_HIT_MARGIN", "0.02")
+        ),
+        hnsw_m=int(os.getenv("HNSW_M", "16")),
+        hnsw_ef_construction=int(os.getenv("HNSW_EF_CONSTRUCTION", "64")),
+        hnsw_ef_search=(
+            int(os.environ["HNSW_EF_SEARCH"]) if os.getenv("HNSW_EF_SEARCH") else None
+        ),
+        hnsw_iterative_scan=os.getenv("HNSW_ITERATIVE_SCAN", "off").lower(),
+        vector_storage=os.getenv("VECTOR_STORAGE", "full").lower(),
+        vector_rerank_oversample=int(os.getenv("VECTOR_RERANK_OVERSAMPLE", "4")),
     )
 
 
@@ -8,6 +8,6 @@ Base = declarative_base()
 
 # Import models to ensure they are registered with SQLAlchemy's metadata.
 # pylint: disable=unused-import
-from app.models import embeddings, images, users  # noqa: E402,F401
+from app.models import embedding_models, embeddings, images, ingest_jobs, users  # noqa: E402,F401
 
 __all__ = ["Base"]
@@ -0,0 +1,75 @@
+"""Encoders for PostgreSQL's binary ``COPY`` format."""
+
+from __future__ import annotations
+
+import struct
+from io import BytesIO
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+import numpy as np
+
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_COPY_HEADER = _COPY_SIGNATURE + struct.pack("!ii", 0, 0)
+_COPY_TRAILER = struct.pack("!h", -1)
+_NULL_FIELD = struct.pack("!i", -1)
+
+FieldEncoder = Callable[[Any], bytes]
+
+
+def encode_int4(value: int) -> bytes:
+    return struct.pack("!i", value)
+
+
+def encode_int8(value: int) -> bytes:
+    return struct.pack("!q", value)
+
+
+def encode_text(value: str) -> bytes:
+    return value.encode("utf-8")
+
+
+def encode_vector(value: Sequence[float]) -> bytes:
+    """Encode ``value`` using pgvector's ``vector_recv`` wire format."""
+
+    # A float32 array is byte-swapped in one vectorised pass; lists are
+    # converted first.
+    array = np.asarray(value, dtype=np.float32).astype(">f4", copy=False)
+    return struct.pack("!hh", array.shape[0], 0) + array.tobytes()
+
+
+def encode_binary_copy(
+    rows: Iterable[Sequence[Optional[Any]]],
+    encoders: Sequence[FieldEncoder],
+) -> BytesIO:
+    """Return a buffer holding ``rows`` in ``COPY ... (FORMAT binary)`` layout.
+
+    ``encoders`` holds one callable per column converting a non-null Python
+    value into its binary wire representation; ``None`` values become SQL
+    ``NULL``.
+    """
+
+    buffer = BytesIO()
+    buffer.write(_COPY_HEADER)
+    field_count = struct.pack("!h", len(encoders))
+    for row in rows:
+        buffer.write(field_count)
+        for value, encode in zip(row, encoders):
+            if value is None:
+                buffer.write(_NULL_FIELD)
+                continue
+            payload = encode(value)
+            buffer.write(struct.pack("!i", len(payload)))
+            buffer.write(payload)
+    buffer.write(_COPY_TRAILER)
+    buffer.seek(0)
+    return buffer
+
+
+__all__ = [
+    "FieldEncoder",
+    "encode_binary_copy",
+    "encode_int4",
+    "encode_int8",
+    "encode_text",
+    "encode_vector",
+]
@@ -0,0 +1,190 @@
+"""Helpers for building pgvector HNSW indexes without blocking writes."""
+
+from __future__ import annotations
+
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sqlalchemy import text as sa_text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+# (index name, CREATE INDEX statement)
+IndexStatement = Tuple[str, str]
+
+# How vectors are represented inside the HNSW index. The table always keeps
+# the full ``vector`` column, which compact modes use to re-rank candidates.
+STORAGE_FULL = "full"
+STORAGE_HALFVEC = "halfvec"  # float16 copy: half the index size
+STORAGE_BINARY = "binary"  # one bit per dimension: 1/32 of the index size
+VECTOR_STORAGE_MODES = (STORAGE_FULL, STORAGE_HALFVEC, STORAGE_BINARY)
+
+# Distance the HNSW graph is built for. Models whose stored vectors are all
+# unit length can use the inner product, which equals cosine similarity
+# without the norms.
+METRIC_COSINE = "cosine"
+METRIC_INNER_PRODUCT = "inner_product"
+
+# pgvector's build parameters when an index is created without them.
+_DEFAULT_BUILD_OPTIONS = {"m": 16, "ef_construction": 64}
+
+
+def index_metric(inner_product: bool) -> str:
+    """Return the metric to index and search a model's columns with."""
+
+    return METRIC_INNER_PRODUCT if inner_product else METRIC_COSINE
+
+
+def hnsw_index_statement(
+    table: str,
+    column: str,
+    *,
+    m: Optional[int] = None,
+    ef_construction: Optional[int] = None,
+    storage: str = STORAGE_FULL,
+    dimension: Optional[int] = None,
+    metric: str = METRIC_COSINE,
+) -> IndexStatement:
+    """Return the HNSW index statement for ``table.column``.
+
+    ``m`` (links per node) and ``ef_construction`` (build-time candidate list)
+    fall back to pgvector's defaults of 16 and 64 when omitted. Larger values
+    improve recall at the cost of build time and index size.
+
+    Compact ``storage`` modes index an expression over the column, which
+    needs the column ``dimension``; queries must order by the same
+    expression for PostgreSQL to use the index.
+
+    ``metric`` selects the operator class; inner-product indexes get their own
+    name so they can be built next to the cosine ones before a cutover. Binary
+    indexes always use Hamming distance.
+    """
+
+    if metric not in (METRIC_COSINE, METRIC_INNER_PRODUCT):
+        raise ValueError(f"unknown vector metric {metric!r}")
+    inner_product = metric == METRIC_INNER_PRODUCT
+    if storage == STORAGE_FULL:
+        index_name = f"{table}_{column}_{'ip' if inner_product else 'hnsw'}_idx"
+        opclass = "vector_ip_ops" if inner_product else "vector_cosine_ops"
+        target = f"{column} {opclass}"
+    elif storage == STORAGE_HALFVEC:
+        index_name = f"{table}_{column}_{'hvip' if inner_product else 'hv'}_idx"
+        opclass = "halfvec_ip_ops" if inner_product else "halfvec_cosine_ops"
+        target = f"({column}::halfvec({int(dimension)})) {opclass}"
+    elif storage == STORAGE_BINARY:
+        index_name = f"{table}_{column}_bq_idx"
+        target = f"(binary_quantize({column})::bit({int(dimension)})) bit_hamming_ops"
+    else:
+        raise ValueError(f"unknown vector storage mode {storage!r}")
+    options = [
+        f"{name} = {int(value)}"
+        for name, value in (("m", m), ("ef_construction", ef_construction))
+        if value is not None
+    ]
+    with_clause = f" WITH ({', '.join(options)})" if options else ""
+    return (
+        index_name,
+        f"CREATE INDEX CONCURRENTLY {index_name} "
+        f"ON {table} USING hnsw ({target}){with_clause}",
+    )
+
+
+def create_indexes_concurrently(
+    engine: Engine, statements: Sequence[IndexStatement]
+) -> Tuple[List[str], List[str]]:
+    """Create the missing indexes and return ``(created, skipped)`` names.
+
+    ``CREATE INDEX CONCURRENTLY`` cannot run inside a transaction, so an
+    autocommit connection is used; inserts keep flowing while PostgreSQL
+    builds each index.
+    """
+
+    created: List[str] = []
+    skipped: List[str] = []
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for index_name, statement in statements:
+            exists = connection.execute(
+                sa_text("SELECT to_regclass(:index_name)"),
+                {"index_name": index_name},
+            ).scalar()
+            if exists:
+                skipped.append(index_name)
+                continue
+
+            logger.info(
+                "Creating HNSW index %s concurrently so uploads remain available.",
+                index_name,
+            )
+            connection.execute(sa_text(statement))
+            created.append(index_name)
+    return created, skipped
+
+
+def existing_indexes(engine: Engine, names: Sequence[str]) -> List[str]:
+    """Return the subset of index ``names`` that exist."""
+
+    with engine.connect() as connection:
+        return [
+            name
+            for name in names
+            if connection.execute(
+                sa_text("SELECT to_regclass(:index_name)"), {"index_name": name}
+            ).scalar()
+        ]
+
+
+def index_build_options(engine: Engine, names: Sequence[str]) -> Dict[str, Dict[str, int]]:
+    """Return the ``m`` and ``ef_construction`` each existing index was built with."""
+
+    options: Dict[str, Dict[str, int]] = {}
+    with engine.connect() as connection:
+        for name in names:
+            row = connection.execute(
+                sa_text(
+                    "SELECT reloptions FROM pg_class WHERE oid = to_regclass(:index_name)"
+                ),
+                {"index_name": name},
+            ).first()
+            if row is None:
+                continue
+            stored = dict(option.split("=", 1) for option in row[0] or ())
+            options[name] = {
+                key: int(stored.get(key, default))
+                for key, default in _DEFAULT_BUILD_OPTIONS.items()
+            }
+    return options
+
+
+def superseded_index_names(
+    table: str, column: str, *, storage: str, dimension: int, metric: str
+) -> List[str]:
+    """Return names of ``table.column`` indexes for the other storage modes."""
+
+    current, _ = hnsw_index_statement(
+        table, column, storage=storage, dimension=dimension, metric=metric
+    )
+    names = [
+        hnsw_index_statement(
+            table, column, storage=other, dimension=dimension, metric=metric
+        )[0]
+        for other in VECTOR_STORAGE_MODES
+    ]
+    return [name for name in names if name != current]
+
+
+__all__ = [
+    "IndexStatement",
+    "METRIC_COSINE",
+    "METRIC_INNER_PRODUCT",
+    "STORAGE_BINARY",
+    "STORAGE_FULL",
+    "STORAGE_HALFVEC",
+    "VECTOR_STORAGE_MODES",
+    "create_indexes_concurrently",
+    "existing_indexes",
+    "hnsw_index_statement",
+    "index_build_options",
+    "index_metric",
+    "superseded_index_names",
+]
@@ -13,10 +13,28 @@ from sqlalchemy.exc import NoSuchTableError
 from app.core.config import get_settings
 from app.db.base import Base
 from app.db.session import SessionLocal, engine
+from app.db.vector_indexes import (
+    METRIC_COSINE,
+    create_indexes_concurrently,
+    existing_indexes,
+    hnsw_index_statement,
+    index_build_options,
+    index_metric,
+    superseded_index_names,
+)
+from app.repositories.embedding_models_repo import (
+    DEFAULT_IMAGE_COLUMN,
+    DEFAULT_TEXT_COLUMN,
+    EmbeddingModelRepository,
+)
+from app.repositories.images_repo import INDEX_EPOCH_SEQUENCE
 from app.repositories.users_repo import UserRepository
-from app.routers import auth, images, search
+from app.services.embedding_registry import get_embedding_registry
+from app.services.model_lifecycle import get_model_lifecycle
+from app.routers import auth, health, images, jobs, search
 from app.utils.hashing import hash_password
 from app.utils.storage import get_storage_client
+from app.workers.ingest_jobs import get_ingest_job_queue
 
 
 logger = logging.getLogger(__name__)
@@ -41,6 +59,15 @@ def create_app() -> FastAPI:
         init_database()
         init_default_user()
         get_storage_client().ensure_bucket()
+        recovered = get_ingest_job_queue().recover()
+        if recovered:
+            logger.info("Re-enqueued %d interrupted ingest jobs.", recovered)
+        if settings.model_warmup:
+            # Load and exercise the models off the startup path; /api/ready
+            # reports 503 until they are done. Shadow models are included so
+            # the first dual-written upload does not load one.
+            get_embedding_registry().register_write_models()
+            get_model_lifecycle().start_background_warmup()
 
     @application.get("/api/hello")
     async def read_hello() -> dict[str, str]:
@@ -51,7 +78,9 @@ def create_app() -> FastAPI:
 
 def include_routers(application: FastAPI) -> None:
     application.include_router(auth.router)
+    application.include_router(health.router)
     application.include_router(images.router)
+    application.include_router(jobs.router)
     application.include_router(search.router)
 
 
@@ -59,8 +88,12 @@ _hnsw_index_creation_scheduled = threading.Event()
 
 
 def init_database() -> None:
+    dimension = get_settings().embedding_dimension
     Base.metadata.create_all(bind=engine)
     with engine.begin() as connection:
+        connection.execute(
+            sa_text(f"CREATE SEQUENCE IF NOT EXISTS {INDEX_EPOCH_SEQUENCE}")
+        )
         inspector = inspect(connection)
         table_exists = True
         try:
@@ -72,7 +105,29 @@ def init_database() -> None:
             connection.execute(sa_text("ALTER TABLE images ADD COLUMN text TEXT"))
         if table_exists and "text_embedding" not in columns:
             connection.execute(
-                sa_text("ALTER TABLE images ADD COLUMN text_embedding vector(512)")
+                sa_text(
+                    f"ALTER TABLE images ADD COLUMN text_embedding vector({dimension})"
+                )
+            )
+        if table_exists and "phash" not in columns:
+            connection.execute(sa_text("ALTER TABLE images ADD COLUMN phash BIGINT"))
+        for segment_column in ("phash_0", "phash_1", "phash_2", "phash_3"):
+            if table_exists and segment_column not in columns:
+                connection.execute(
+                    sa_text(f"ALTER TABLE images ADD COLUMN {segment_column} INTEGER")
+                )
+                connection.execute(
+                    sa_text(
+                        f"CREATE INDEX IF NOT EXISTS ix_images_{segment_column} "
+                        f"ON images ({segment_column})"
+                    )
+                )
+        if table_exists and "near_duplicate_of_id" not in columns:
+            connection.execute(
+                sa_text(
+                    "ALTER TABLE images ADD COLUMN near_duplicate_of_id INTEGER "
+                    "REFERENCES images (id)"
+                )
             )
 
         try:
@@ -88,14 +143,27 @@ def init_database() -> None:
             ),
             None,
         )
-        if embedding_dimension is not None and embedding_dimension != 512:
+        if embedding_dimension is not None and embedding_dimension != dimension:
             connection.execute(
                 sa_text("DROP INDEX IF EXISTS embeddings_embedding_hnsw_idx")
             )
             connection.execute(
-                sa_text("ALTER TABLE embeddings ALTER COLUMN embedding TYPE vector(512)")
+                sa_text(
+                    "ALTER TABLE embeddings ALTER COLUMN embedding "
+                    f"TYPE vector({dimension})"
+                )
             )
 
+    session = SessionLocal()
+    try:
+        # Existing deployments adopt the configured model as the active entry
+        # of the registry; its vectors live in the original columns.
+        EmbeddingModelRepository(session).ensure_default(
+            model_id=get_settings().embedding_model, dimension=dimension
+        )
+    finally:
+        session.close()
+
     _schedule_hnsw_index_creation()
 
 
@@ -115,47 +183,74 @@ def _schedule_hnsw_index_creation() -> None:
 
 
 def _ensure_hnsw_indexes() -> None:
-    # Ensure HNSW indexes exist so cosine similarity searches remain fast. They must
+    # Ensure HNSW indexes exist so similarity searches remain fast. They must
     # be created concurrently using an autocommit connection so inserts remain
     # non-blocking while PostgreSQL finishes building them in the background.
-    hnsw_index_statements = (
-        (
-            "embeddings_embedding_hnsw_idx",
-            "CREATE INDEX CONCURRENTLY embeddings_embedding_hnsw_idx "
-            "ON embeddings USING hnsw (embedding vector_cosine_ops)",
-        ),
-        (
-            "images_embedding_hnsw_idx",
-            "CREATE INDEX CONCURRENTLY images_embedding_hnsw_idx "
-            "ON images USING hnsw (embedding vector_cosine_ops)",
-        ),
-        (
-            "images_text_embedding_hnsw_idx",
-            "CREATE INDEX CONCURRENTLY images_text_embedding_hnsw_idx "
-            "ON images USING hnsw (text_embedding vector_cosine_ops)",
-        ),
-    )
-
-    created_indexes: list[str] = []
-    skipped_indexes: list[str] = []
-
+    # Registered models other than the default keep their vectors in their own
+    # columns, each with a side-by-side index of its own. Image columns are
+    # indexed in the configured VECTOR_STORAGE representation, by inner product
+    # for models that store unit-length vectors.
     try:
-        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
-            for index_name, statement in hnsw_index_statements:
-                exists = connection.execute(
-                    sa_text("SELECT to_regclass(:index_name)"),
-                    {"index_name": index_name},
-                ).scalar()
-                if exists:
-                    skipped_indexes.append(index_name)
-                    continue
-
-                logger.info(
-                    "Creating HNSW index %s concurrently so uploads remain available.",
-                    index_name,
+        session = SessionLocal()
+        try:
+            records = EmbeddingModelRepository(session).list()
+        finally:
+            session.close()
+        settings = get_settings()
+        # column -> (dimension, metric)
+        column_layouts = {
+            column: (record.dimension, index_metric(record.inner_product))
+            for record in records
+            for column in (record.image_column, record.text_column)
+        }
+        for column in (DEFAULT_IMAGE_COLUMN, DEFAULT_TEXT_COLUMN):
+            column_layouts.setdefault(
+                column, (settings.embedding_dimension, METRIC_COSINE)
+            )
+        build_options = {
+            "m": settings.hnsw_m,
+            "ef_construction": settings.hnsw_ef_construction,
+        }
+        hnsw_index_statements = [
+            hnsw_index_statement("embeddings", "embedding", **build_options),
+            *(
+                hnsw_index_statement(
+                    "images",
+                    column,
+                    storage=settings.vector_storage,
+                    dimension=dimension,
+                    metric=metric,
+                    **build_options,
                 )
-                connection.execute(sa_text(statement))
-                created_indexes.append(index_name)
+                for column, (dimension, metric) in column_layouts.items()
+            ),
+        ]
+        created_indexes, skipped_indexes = create_indexes_concurrently(
+            engine, hnsw_index_statements
+        )
+        # Build parameters are fixed when an index is created, so indexes that
+        # predate a change to HNSW_M or HNSW_EF_CONSTRUCTION keep the old ones.
+        outdated_indexes = [
+            name
+            for name, options in index_build_options(engine, skipped_indexes).items()
+            if options != build_options
+        ]
+        # Indexes of another VECTOR_STORAGE mode are no longer searched but
+        # still take memory and slow down writes.
+        superseded_indexes = existing_indexes(
+            engine,
+            [
+                name
+                for column, (dimension, metric) in column_layouts.items()
+                for name in superseded_index_names(
+                    "images",
+                    column,
+                    storage=settings.vector_storage,
+                    dimension=dimension,
+                    metric=metric,
+                )
+            ],
+        )
     except Exception:  # pragma: no cover - defensive logging for unexpected failures.
         logger.exception("Failed to create HNSW indexes concurrently.")
         _hnsw_index_creation_scheduled.clear()
@@ -172,6 +267,26 @@ def _ensure_hnsw_indexes() -> None:
             "HNSW vector indexes already exist; skipping creation: %s.",
             ", ".join(skipped_indexes),
         )
+    if outdated_indexes:
+        logger.warning(
+            "HNSW indexes were built with other parameters than HNSW_M=%d and "
+            "HNSW_EF_CONSTRUCTION=%d; rebuild them to apply the new values: %s.",
+            settings.hnsw_m,
+            settings.hnsw_ef_construction,
+            "; ".join(
+                f"ALTER INDEX {name} SET (m = {settings.hnsw_m}, "
+                f"ef_construction = {settings.hnsw_ef_construction}); "
+                f"REINDEX INDEX CONCURRENTLY {name}"
+                for name in outdated_indexes
+            ),
+        )
+    if superseded_indexes:
+        logger.warning(
+            "VECTOR_STORAGE=%s no longer uses these HNSW indexes; drop them to "
+            "reclaim memory: %s.",
+            get_settings().vector_storage,
+            "; ".join(f"DROP INDEX CONCURRENTLY {name}" for name in superseded_indexes),
+        )
 
 
 def init_default_user() -> None:
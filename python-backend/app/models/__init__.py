@@ -1,7 +1,15 @@
 """SQLAlchemy model exports."""
 
+from .embedding_models import EmbeddingModelRecord
 from .embeddings import Embedding
 from .images import ImageMetadata
+from .ingest_jobs import IngestJobRecord
 from .users import User
 
-__all__ = ["Embedding", "ImageMetadata", "User"]
+__all__ = [
+    "Embedding",
+    "EmbeddingModelRecord",
+    "ImageMetadata",
+    "IngestJobRecord",
+    "User",
+]
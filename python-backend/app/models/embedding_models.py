@@ -0,0 +1,36 @@
+"""Database model for the embedding model registry."""
+
+from __future__ import annotations
+
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, func
+
+from app.db.base import Base
+
+
+class EmbeddingModelRecord(Base):
+    """One embedding model whose vectors are stored on ``images``.
+
+    Every model owns an image and a text vector column. Exactly one model is
+    ``active`` and serves search; ``shadow`` models are written alongside it
+    so they can be backfilled and switched to without downtime, and
+    ``retired`` models are no longer written.
+
+    ``normalized`` makes writers store unit-length vectors; ``inner_product``
+    switches searches and indexes to the inner-product metric, which is only
+    correct once every stored vector is unit length.
+    """
+
+    __tablename__ = "embedding_models"
+
+    id = Column(String, primary_key=True)
+    dimension = Column(Integer, nullable=False)
+    normalized = Column(Boolean, nullable=False, default=False)
+    inner_product = Column(Boolean, nullable=False, default=False)
+    image_column = Column(String, unique=True, nullable=False)
+    text_column = Column(String, unique=True, nullable=False)
+    status = Column(String, nullable=False)
+    created_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now())
+    activated_at = Column(DateTime(timezone=True), nullable=True)
+
+
+__all__ = ["EmbeddingModelRecord"]
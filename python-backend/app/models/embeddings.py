@@ -5,6 +5,7 @@ from __future__ import annotations
 from sqlalchemy import Column, Integer, String
 from pgvector.sqlalchemy import Vector
 
+from app.core.config import get_settings
 from app.db.base import Base
 
 
@@ -13,7 +14,7 @@ class Embedding(Base):
 
     id = Column(Integer, primary_key=True, index=True)
     content = Column(String, nullable=True)
-    embedding = Column(Vector(512), nullable=False)
+    embedding = Column(Vector(get_settings().embedding_dimension), nullable=False)
 
 
 __all__ = ["Embedding"]
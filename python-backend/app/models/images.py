@@ -2,11 +2,16 @@
 
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import BigInteger, Column, ForeignKey, Integer, String
 from pgvector.sqlalchemy import Vector
 
+from app.core.config import get_settings
 from app.db.base import Base
 
+# Dimension of the default model's columns; models added through the registry
+# get their own columns (see ``app.models.embedding_models``).
+_DIMENSION = get_settings().embedding_dimension
+
 
 class ImageMetadata(Base):
     __tablename__ = "images"
@@ -16,9 +21,17 @@ class ImageMetadata(Base):
     hash = Column(String, index=True, nullable=False)
     width = Column(Integer, nullable=False)
     height = Column(Integer, nullable=False)
-    embedding = Column(Vector(512))
+    embedding = Column(Vector(_DIMENSION))
     text = Column(String, nullable=True)
-    text_embedding = Column(Vector(512), nullable=True)
+    text_embedding = Column(Vector(_DIMENSION), nullable=True)
+    # 64-bit dHash stored as a signed BIGINT plus four 16-bit segments that are
+    # indexed individually for multi-index Hamming-distance lookups.
+    phash = Column(BigInteger, nullable=True)
+    phash_0 = Column(Integer, index=True, nullable=True)
+    phash_1 = Column(Integer, index=True, nullable=True)
+    phash_2 = Column(Integer, index=True, nullable=True)
+    phash_3 = Column(Integer, index=True, nullable=True)
+    near_duplicate_of_id = Column(Integer, ForeignKey("images.id"), nullable=True)
 
 
 __all__ = ["ImageMetadata"]
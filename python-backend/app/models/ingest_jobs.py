@@ -0,0 +1,35 @@
+"""Database model for background ingest jobs."""
+
+from __future__ import annotations
+
+from sqlalchemy import BigInteger, Column, DateTime, Float, Integer, String, Text
+
+from app.db.base import Base
+
+
+class IngestJobRecord(Base):
+    """Progress of one background ingest job.
+
+    Rows are shared by every API process so a job can be polled from any of
+    them. ``owner`` is the advisory lock key of the process running the job;
+    jobs whose owner no longer holds its lock were interrupted and are picked
+    up again from ``url``.
+    """
+
+    __tablename__ = "ingest_jobs"
+
+    id = Column(String, primary_key=True)
+    filename = Column(String, nullable=False)
+    status = Column(String, index=True, nullable=False)
+    stage = Column(String, nullable=True)
+    progress = Column(Float, nullable=False, default=0.0)
+    url = Column(String, nullable=True)
+    hash = Column(String, nullable=True)
+    image_id = Column(Integer, nullable=True)
+    error = Column(Text, nullable=True)
+    owner = Column(BigInteger, index=True, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+
+
+__all__ = ["IngestJobRecord"]
@@ -1,6 +1,16 @@
 """Repository exports."""
 
-from .images_repo import EmbeddingRepository, ImageRepository
+from .embedding_models_repo import EmbeddingModelRepository
+from .images_repo import EmbeddingRepository, ImageHit, ImageRepository, NewImage
+from .ingest_jobs_repo import IngestJobRepository
 from .users_repo import UserRepository
 
-__all__ = ["EmbeddingRepository", "ImageRepository", "UserRepository"]
+__all__ = [
+    "EmbeddingModelRepository",
+    "EmbeddingRepository",
+    "ImageHit",
+    "ImageRepository",
+    "IngestJobRepository",
+    "NewImage",
+    "UserRepository",
+]
@@ -0,0 +1,218 @@
+"""Database access helpers for the embedding model registry."""
+
+from __future__ import annotations
+
+import re
+from typing import List, Optional
+
+from sqlalchemy import case, func, text as sa_text, update
+from sqlalchemy.orm import Session
+
+from app.models.embedding_models import EmbeddingModelRecord
+
+MODEL_ACTIVE = "active"
+MODEL_SHADOW = "shadow"
+MODEL_RETIRED = "retired"
+
+DEFAULT_IMAGE_COLUMN = "embedding"
+DEFAULT_TEXT_COLUMN = "text_embedding"
+
+# Leaves room for the ``text_embedding_`` prefix and ``_hnsw_idx`` suffix
+# within PostgreSQL's 63 character identifier limit.
+_MAX_SLUG_LENGTH = 32
+
+
+class EmbeddingModelError(ValueError):
+    """Raised when a registry change is not allowed."""
+
+
+def model_columns(model_id: str) -> tuple[str, str]:
+    """Return the ``(image, text)`` vector column names for ``model_id``."""
+
+    slug = re.sub(r"[^a-z0-9]+", "_", model_id.lower()).strip("_")[:_MAX_SLUG_LENGTH]
+    if not slug:
+        raise EmbeddingModelError(f"cannot derive column names from {model_id!r}")
+    return f"embedding_{slug}", f"text_embedding_{slug}"
+
+
+class EmbeddingModelRepository:
+    def __init__(self, session: Session) -> None:
+        self._session = session
+
+    def list(self) -> List[EmbeddingModelRecord]:
+        return (
+            self._session.query(EmbeddingModelRecord)
+            .order_by(EmbeddingModelRecord.created_at, EmbeddingModelRecord.id)
+            .all()
+        )
+
+    def get(self, model_id: str) -> Optional[EmbeddingModelRecord]:
+        return self._session.get(EmbeddingModelRecord, model_id)
+
+    def ensure_default(self, *, model_id: str, dimension: int) -> None:
+        """Record the model stored in the original vector columns.
+
+        Only runs on an empty registry, so existing deployments adopt the
+        configured model as their active one exactly once.
+        """
+
+        if self._session.query(EmbeddingModelRecord.id).first() is not None:
+            return
+        self._session.add(
+            EmbeddingModelRecord(
+                id=model_id,
+                dimension=dimension,
+                normalized=False,
+                inner_product=False,
+                image_column=DEFAULT_IMAGE_COLUMN,
+                text_column=DEFAULT_TEXT_COLUMN,
+                status=MODEL_ACTIVE,
+                activated_at=func.now(),
+            )
+        )
+        self._session.commit()
+
+    def register(
+        self, *, model_id: str, dimension: int, normalized: bool
+    ) -> EmbeddingModelRecord:
+        """Add ``model_id`` as a shadow model with its own vector columns.
+
+        ``ADD COLUMN`` without a default only touches the catalog, so the
+        table is not rewritten and the lock is held for an instant.
+        """
+
+        if self.get(model_id) is not None:
+            raise EmbeddingModelError(f"model {model_id!r} is already registered")
+        if dimension <= 0:
+            raise EmbeddingModelError("dimension must be positive")
+        image_column, text_column = model_columns(model_id)
+        for column in (image_column, text_column):
+            self._session.execute(
+                sa_text(
+                    f"ALTER TABLE images ADD COLUMN IF NOT EXISTS {column} "
+                    f"vector({int(dimension)})"
+                )
+            )
+        record = EmbeddingModelRecord(
+            id=model_id,
+            dimension=dimension,
+            normalized=normalized,
+            # Every vector of a new model is written normalized from the start.
+            inner_product=normalized,
+            image_column=image_column,
+            text_column=text_column,
+            status=MODEL_SHADOW,
+        )
+        self._session.add(record)
+        self._session.commit()
+        return record
+
+    def missing_vectors(self, model_id: str) -> int:
+        """Return how many images have no visual vector for ``model_id`` yet."""
+
+        record = self.get(model_id)
+        if record is None:
+            raise EmbeddingModelError(f"model {model_id!r} is not registered")
+        # Registry columns come from ``model_columns`` and are safe to inline.
+        statement = sa_text(
+            f"SELECT count(*) FROM images WHERE {record.image_column} IS NULL"
+        )
+        return int(self._session.execute(statement).scalar() or 0)
+
+    def activate(self, model_id: str, *, force: bool = False) -> None:
+        """Make ``model_id`` the model used for search in one statement.
+
+        The previously active model becomes a shadow, so it keeps receiving
+        writes and switching back is just as instant. A retired model stopped
+        receiving writes and is refused; so is one whose backfill has not
+        filled every image yet, unless ``force`` is set.
+        """
+
+        record = self.get(model_id)
+        if record is None:
+            raise EmbeddingModelError(f"model {model_id!r} is not registered")
+        if record.status == MODEL_RETIRED:
+            raise EmbeddingModelError(
+                f"model {model_id!r} is retired and missed recent uploads"
+            )
+        if not force:
+            missing = self.missing_vectors(model_id)
+            if missing:
+                raise EmbeddingModelError(
+                    f"{missing} images have no {record.image_column} vector yet; "
+                    "finish the backfill or pass --force"
+                )
+        self._session.execute(
+            update(EmbeddingModelRecord)
+            .where(
+                (EmbeddingModelRecord.id == model_id)
+                | (EmbeddingModelRecord.status == MODEL_ACTIVE)
+            )
+            .values(
+                status=case(
+                    (EmbeddingModelRecord.id == model_id, MODEL_ACTIVE),
+                    else_=MODEL_SHADOW,
+                ),
+                activated_at=case(
+                    (EmbeddingModelRecord.id == model_id, func.now()),
+                    else_=EmbeddingModelRecord.activated_at,
+                ),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self._session.commit()
+
+    def mark_normalized(self, model_id: str) -> None:
+        """Make writers store unit-length vectors for ``model_id``.
+
+        Searches keep using cosine distance, which ignores vector length, so
+        this is safe while older rows are still unnormalized.
+        """
+
+        record = self.get(model_id)
+        if record is None:
+            raise EmbeddingModelError(f"model {model_id!r} is not registered")
+        if record.normalized:
+            raise EmbeddingModelError(f"model {model_id!r} is already normalized")
+        record.normalized = True
+        self._session.commit()
+
+    def use_inner_product(self, model_id: str) -> None:
+        """Search ``model_id`` by inner product.
+
+        Call once every stored vector of the model is unit length and its
+        inner-product indexes exist.
+        """
+
+        record = self.get(model_id)
+        if record is None:
+            raise EmbeddingModelError(f"model {model_id!r} is not registered")
+        if not record.normalized:
+            raise EmbeddingModelError(
+                f"model {model_id!r} does not write normalized vectors yet"
+            )
+        record.inner_product = True
+        self._session.commit()
+
+    def retire(self, model_id: str) -> None:
+        """Stop writing vectors for ``model_id``; its columns are kept."""
+
+        record = self.get(model_id)
+        if record is None:
+            raise EmbeddingModelError(f"model {model_id!r} is not registered")
+        if record.status == MODEL_ACTIVE:
+            raise EmbeddingModelError("activate another model before retiring this one")
+        record.status = MODEL_RETIRED
+        self._session.commit()
+
+
+__all__ = [
+    "DEFAULT_IMAGE_COLUMN",
+    "DEFAULT_TEXT_COLUMN",
+    "EmbeddingModelError",
+    "EmbeddingModelRepository",
+    "MODEL_ACTIVE",
+    "MODEL_RETIRED",
+    "MODEL_SHADOW",
+    "model_columns",
+]
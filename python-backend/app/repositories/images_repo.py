@@ -2,12 +2,221 @@
 
 from __future__ import annotations
 
-from typing import List, Optional
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence
 
+import numpy as np
+from pgvector.sqlalchemy import BIT, HALFVEC, Vector
+from sqlalchemy import (
+    CTE,
+    BigInteger,
+    Float,
+    Integer,
+    and_,
+    bindparam,
+    cast,
+    column as sa_column,
+    func,
+    insert,
+    literal_column,
+    or_,
+    select,
+    table as sa_table,
+    text as sa_text,
+    update,
+    values,
+)
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.expression import ColumnElement, TableClause
 
+from app.db.copy import (
+    encode_binary_copy,
+    encode_int4,
+    encode_int8,
+    encode_text,
+    encode_vector,
+)
+from app.db.vector_indexes import (
+    METRIC_COSINE,
+    METRIC_INNER_PRODUCT,
+    STORAGE_BINARY,
+    STORAGE_FULL,
+    STORAGE_HALFVEC,
+)
 from app.models.embeddings import Embedding
 from app.models.images import ImageMetadata
+from app.utils.perceptual_hash import hash_segments, to_signed64
+from app.utils.vectors import VectorLike, as_float32
+
+
+# Vectors keyed by the ``images`` column they are stored in. Besides the
+# mapped ``embedding``/``text_embedding`` columns this may name columns added
+# for other models through the embedding model registry.
+VectorColumns = Mapping[str, Optional[VectorLike]]
+
+DEFAULT_VECTOR_COLUMNS = ("embedding", "text_embedding")
+
+# Sequence advanced after every committed change to ``images`` rows; cached
+# search results are only reused while it is unchanged.
+INDEX_EPOCH_SEQUENCE = "image_index_epoch"
+
+# Values of pgvector's ``hnsw.iterative_scan`` (0.8+). With a scan mode set, a
+# filtered HNSW query keeps walking the graph until enough rows pass the
+# filter instead of returning fewer than ``LIMIT`` rows.
+HNSW_ITERATIVE_SCAN_MODES = ("off", "relaxed_order", "strict_order")
+
+# pgvector's default ``hnsw.ef_search``; an HNSW scan returns at most this
+# many rows unless iterative scans are enabled.
+_DEFAULT_EF_SEARCH = 40
+
+# float32 rounding keeps normalized vectors within ~1e-7 of unit length.
+_UNIT_NORM_TOLERANCE = 1e-4
+
+
+@dataclass(frozen=True, slots=True)
+class ImageHit:
+    """The columns of an image row a search result needs, without its vectors."""
+
+    id: int
+    url: str
+    width: int
+    height: int
+    text: Optional[str]
+
+
+# Selecting only these keeps the stored vectors out of search results, so
+# candidates skip vector decoding and the ORM identity map.
+_HIT_COLUMNS = (
+    ImageMetadata.id,
+    ImageMetadata.url,
+    ImageMetadata.width,
+    ImageMetadata.height,
+    ImageMetadata.text,
+)
+
+# (hit, visual distance, text distance); a distance is ``None`` when the row
+# was not among that modality's nearest neighbours.
+HybridCandidate = tuple[ImageHit, Optional[float], Optional[float]]
+
+
+@dataclass(slots=True)
+class NewImage:
+    """Column values for an image row that has not been persisted yet."""
+
+    url: str
+    hash_value: str
+    width: int
+    height: int
+    vectors: Dict[str, Optional[np.ndarray]] = field(default_factory=dict)
+    text: Optional[str] = None
+    phash: Optional[int] = None
+    near_duplicate_of_id: Optional[int] = None
+
+
+_COPY_COLUMNS = (
+    "url",
+    "hash",
+    "width",
+    "height",
+    "embedding",
+    "text",
+    "text_embedding",
+    "phash",
+    "phash_0",
+    "phash_1",
+    "phash_2",
+    "phash_3",
+    "near_duplicate_of_id",
+)
+_COPY_ENCODERS = (
+    encode_text,
+    encode_text,
+    encode_int4,
+    encode_int4,
+    encode_vector,
+    encode_text,
+    encode_vector,
+    encode_int8,
+    encode_int4,
+    encode_int4,
+    encode_int4,
+    encode_int4,
+    encode_int4,
+)
+_PHASH_SEGMENT_COLUMNS = ("phash_0", "phash_1", "phash_2", "phash_3")
+_COLUMN_NAME = re.compile(r"^[a-z_][a-z0-9_]*$")
+
+
+def _checked_column(name: str) -> str:
+    # Registry column names are interpolated into SQL; refuse anything else.
+    if not _COLUMN_NAME.match(name):
+        raise ValueError(f"invalid vector column name {name!r}")
+    return name
+
+
+def _vector_column(name: str) -> ColumnElement:
+    if name in DEFAULT_VECTOR_COLUMNS:
+        return getattr(ImageMetadata, name)
+    return literal_column(f"images.{_checked_column(name)}", Vector())
+
+
+def _covering_ef_search(ef_search: Optional[int], limit: Optional[int]) -> Optional[int]:
+    # An HNSW scan yields at most ef_search rows, so a smaller value would
+    # silently return fewer than ``limit`` hits.
+    if ef_search is None or limit is None:
+        return ef_search
+    return max(ef_search, limit)
+
+
+def _optional_vector(vector: Optional[VectorLike]) -> Optional[np.ndarray]:
+    return as_float32(vector) if vector is not None else None
+
+
+def _extra_vectors(vectors: VectorColumns) -> Dict[str, Optional[np.ndarray]]:
+    return {
+        _checked_column(name): _optional_vector(vector)
+        for name, vector in vectors.items()
+        if name not in DEFAULT_VECTOR_COLUMNS
+    }
+
+
+def _images_table(names: Sequence[str]) -> TableClause:
+    # A lightweight table clause so updates can target registry columns
+    # that are not part of the ORM mapping.
+    mapped = ImageMetadata.__table__.c
+    return sa_table(
+        "images",
+        sa_column("id", Integer),
+        *(
+            sa_column(name, mapped[name].type if name in mapped else Vector())
+            for name in map(_checked_column, names)
+        ),
+    )
+
+
+def _phash_values(phash: Optional[int]) -> Dict[str, Optional[int]]:
+    if phash is None:
+        return {"phash": None, **{column: None for column in _PHASH_SEGMENT_COLUMNS}}
+    return {
+        "phash": to_signed64(phash),
+        **dict(zip(_PHASH_SEGMENT_COLUMNS, hash_segments(phash))),
+    }
+
+
+def _row_values(image: NewImage) -> Dict[str, object]:
+    return {
+        "url": image.url,
+        "hash": image.hash_value,
+        "width": image.width,
+        "height": image.height,
+        "embedding": _optional_vector(image.vectors.get("embedding")),
+        "text": image.text,
+        "text_embedding": _optional_vector(image.vectors.get("text_embedding")),
+        "near_duplicate_of_id": image.near_duplicate_of_id,
+        **_phash_values(image.phash),
+    }
 
 
 class ImageRepository:
@@ -21,83 +230,735 @@ class ImageRepository:
         hash_value: str,
         width: int,
         height: int,
-        embedding: List[float],
+        vectors: VectorColumns,
         text: Optional[str] = None,
-        text_embedding: Optional[List[float]] = None,
+        phash: Optional[int] = None,
+        near_duplicate_of_id: Optional[int] = None,
     ) -> ImageMetadata:
         metadata = ImageMetadata(
             url=url,
             hash=hash_value,
             width=width,
             height=height,
-            embedding=embedding,
+            embedding=_optional_vector(vectors.get("embedding")),
             text=text,
-            text_embedding=text_embedding,
+            text_embedding=_optional_vector(vectors.get("text_embedding")),
+            near_duplicate_of_id=near_duplicate_of_id,
+            **_phash_values(phash),
         )
         self._session.add(metadata)
+        extra = _extra_vectors(vectors)
+        if extra:
+            self._session.flush()
+            self._update_rows([{"id": metadata.id, **extra}])
         self._session.commit()
+        self.advance_index_epoch()
         self._session.refresh(metadata)
         return metadata
 
+    def create_many(self, images: Sequence[NewImage]) -> List[ImageMetadata]:
+        """Persist ``images`` inside a single transaction.
+
+        The returned objects carry their generated ids but are detached from
+        the session, so reading them does not trigger a refresh per row.
+        """
+
+        rows = [_row_values(image) for image in images]
+        ids = self._insert_rows(
+            rows, [_extra_vectors(image.vectors) for image in images], commit=True
+        )
+        return [ImageMetadata(id=image_id, **row) for image_id, row in zip(ids, rows)]
+
+    def bulk_create(
+        self, images: Sequence[NewImage], *, commit: bool = True
+    ) -> List[int]:
+        """Insert ``images`` with one ``executemany`` and return their ids.
+
+        Ids are returned in the order of ``images``. Pass ``commit=False`` to
+        keep the insert inside the caller's transaction; the caller then calls
+        :meth:`advance_index_epoch` after committing.
+        """
+
+        return self._insert_rows(
+            [_row_values(image) for image in images],
+            [_extra_vectors(image.vectors) for image in images],
+            commit=commit,
+        )
+
+    def _insert_rows(
+        self,
+        rows: Sequence[Dict[str, object]],
+        extra_vectors: Sequence[Dict[str, Optional[np.ndarray]]],
+        *,
+        commit: bool,
+    ) -> List[int]:
+        if not rows:
+            return []
+        statement = insert(ImageMetadata).returning(
+            ImageMetadata.id, sort_by_parameter_order=True
+        )
+        ids = list(self._session.execute(statement, rows).scalars())
+        # Vectors for registry columns outside the ORM mapping are written in
+        # the same transaction right after the insert.
+        self._update_rows(
+            [
+                {"id": image_id, **extra}
+                for image_id, extra in zip(ids, extra_vectors)
+                if extra
+            ]
+        )
+        if commit:
+            self._session.commit()
+            self.advance_index_epoch()
+        return ids
+
+    def copy_images(self, images: Sequence[NewImage]) -> int:
+        """Write ``images`` with a single binary ``COPY`` and commit.
+
+        This bypasses the ORM entirely and is meant for offline bulk loads;
+        generated ids are not returned.
+        """
+
+        if not images:
+            return 0
+        extra_columns = sorted(
+            {name for image in images for name in _extra_vectors(image.vectors)}
+        )
+        buffer = encode_binary_copy(
+            (
+                (
+                    image.url,
+                    image.hash_value,
+                    image.width,
+                    image.height,
+                    image.vectors.get("embedding"),
+                    image.text,
+                    image.vectors.get("text_embedding"),
+                    *_phash_values(image.phash).values(),
+                    image.near_duplicate_of_id,
+                    *(image.vectors.get(name) for name in extra_columns),
+                )
+                for image in images
+            ),
+            _COPY_ENCODERS + (encode_vector,) * len(extra_columns),
+        )
+        copy_sql = (
+            f"COPY images ({', '.join(_COPY_COLUMNS + tuple(extra_columns))}) "
+            "FROM STDIN WITH (FORMAT binary)"
+        )
+        raw_connection = self._session.connection().connection
+        cursor = raw_connection.cursor()
+        try:
+            cursor.copy_expert(copy_sql, buffer)
+        finally:
+            cursor.close()
+        self._session.commit()
+        self.advance_index_epoch()
+        return len(images)
+
+    def list_for_backfill(
+        self,
+        *,
+        after_id: int,
+        limit: int,
+        missing_only: bool,
+        image_columns: Sequence[str] = ("embedding",),
+        text_columns: Sequence[str] = ("text_embedding",),
+    ) -> List[tuple[int, str, Optional[str]]]:
+        """Return ``(id, url, text)`` for the next keyset page after ``after_id``.
+
+        Vectors are not selected, so paging through large tables stays cheap.
+        With ``missing_only`` only rows lacking a value in one of
+        ``image_columns``, or with OCR text but no value in one of
+        ``text_columns``, are returned. Images without OCR text keep a NULL
+        text vector, so they are not picked up again on every run.
+        """
+
+        query = self._session.query(
+            ImageMetadata.id, ImageMetadata.url, ImageMetadata.text
+        ).filter(ImageMetadata.id > after_id)
+        if missing_only:
+            query = query.filter(
+                or_(
+                    *(_vector_column(name).is_(None) for name in image_columns),
+                    and_(
+                        ImageMetadata.text.isnot(None),
+                        or_(*(_vector_column(name).is_(None) for name in text_columns)),
+                    ),
+                )
+            )
+        rows = query.order_by(ImageMetadata.id).limit(limit).all()
+        return [(row.id, row.url, row.text) for row in rows]
+
+    def bulk_update(
+        self, updates: Sequence[Dict[str, object]], *, commit: bool = True
+    ) -> None:
+        """Apply per-row column updates keyed by ``id`` with one ``executemany``.
+
+        Keys may name registry vector columns as well as mapped columns.
+        """
+
+        if not updates:
+            return
+        self._update_rows(updates)
+        if commit:
+            self._session.commit()
+            self.advance_index_epoch()
+
+    def current_index_epoch(self) -> int:
+        return int(
+            self._session.execute(
+                sa_text(f"SELECT last_value FROM {INDEX_EPOCH_SEQUENCE}")
+            ).scalar_one()
+        )
+
+    def advance_index_epoch(self) -> None:
+        """Invalidate cached search results after a committed change.
+
+        Runs after the commit so a search that reads the new epoch also sees
+        the change. ``nextval`` is not transactional; the short transaction
+        it opens is closed right away.
+        """
+
+        self._session.execute(sa_text(f"SELECT nextval('{INDEX_EPOCH_SEQUENCE}')"))
+        self._session.commit()
+
+    def _update_rows(self, updates: Sequence[Mapping[str, object]]) -> None:
+        batches: Dict[tuple[str, ...], List[Mapping[str, object]]] = {}
+        for row in updates:
+            names = tuple(sorted(name for name in row if name != "id"))
+            if names:
+                batches.setdefault(names, []).append(row)
+        for names, rows in batches.items():
+            images = _images_table(names)
+            statement = (
+                update(images)
+                .where(images.c.id == bindparam("row_id"))
+                .values({name: bindparam(f"value_{name}") for name in names})
+            )
+            self._session.execute(
+                statement,
+                [
+                    {
+                        "row_id": row["id"],
+                        **{f"value_{name}": row[name] for name in names},
+                    }
+                    for row in rows
+                ],
+            )
+
+    def list_vectors(
+        self, column: str, *, after_id: int, limit: int
+    ) -> List[tuple[int, Optional[np.ndarray]]]:
+        """Return ``(id, vector)`` for the next keyset page of ``column``.
+
+        Rows whose vector is missing are included with ``None`` so callers can
+        advance past them.
+        """
+
+        rows = (
+            self._session.query(ImageMetadata.id, _vector_column(column))
+            .filter(ImageMetadata.id > after_id)
+            .order_by(ImageMetadata.id)
+            .limit(limit)
+            .all()
+        )
+        return [(image_id, _optional_vector(vector)) for image_id, vector in rows]
+
+    def get_vectors(
+        self, column: str, ids: Iterable[int]
+    ) -> List[tuple[int, Optional[np.ndarray]]]:
+        """Return ``(id, vector)`` of ``ids`` in ``column``, ordered by id."""
+
+        ids = list(ids)
+        if not ids:
+            return []
+        rows = (
+            self._session.query(ImageMetadata.id, _vector_column(column))
+            .filter(ImageMetadata.id.in_(ids))
+            .order_by(ImageMetadata.id)
+            .all()
+        )
+        return [(image_id, _optional_vector(vector)) for image_id, vector in rows]
+
+    def count_vectors(self, column: str, *, max_id: int) -> int:
+        """Count rows with ``id <= max_id`` that have a vector in ``column``."""
+
+        vectors = _vector_column(column)
+        return int(
+            self._session.query(func.count(ImageMetadata.id))
+            .filter(ImageMetadata.id <= max_id, vectors.isnot(None))
+            .scalar()
+        )
+
+    def sample_vectors(self, column: str, count: int) -> List[np.ndarray]:
+        """Return up to ``count`` random non-null vectors stored in ``column``."""
+
+        vectors = _vector_column(column)
+        rows = (
+            self._session.query(vectors)
+            .select_from(ImageMetadata)
+            .filter(vectors.isnot(None))
+            .order_by(func.random())
+            .limit(count)
+            .all()
+        )
+        return [as_float32(vector) for (vector,) in rows]
+
+    def normalize_vectors(
+        self, columns: Sequence[str], *, after_id: int, limit: int
+    ) -> Optional[int]:
+        """Scale the next keyset page of ``columns`` to unit length in place.
+
+        Returns the last id of the page, or ``None`` once no rows are left.
+        Rows already at unit length (and zero vectors) are not rewritten, so a
+        second pass only touches rows written while the first one ran. The
+        page is committed; the distances of stored rows do not change.
+        """
+
+        ids = [
+            image_id
+            for (image_id,) in self._session.query(ImageMetadata.id)
+            .filter(ImageMetadata.id > after_id)
+            .order_by(ImageMetadata.id)
+            .limit(limit)
+            .all()
+        ]
+        if not ids:
+            return None
+        images = _images_table(columns)
+        for name in columns:
+            vectors = images.c[name]
+            norm = func.vector_norm(vectors)
+            self._session.execute(
+                update(images)
+                .where(
+                    images.c.id.between(ids[0], ids[-1]),
+                    norm > 0,
+                    func.abs(norm - 1) > _UNIT_NORM_TOLERANCE,
+                )
+                .values({name: func.l2_normalize(vectors)})
+            )
+        self._session.commit()
+        return ids[-1]
+
+    def get_hits(self, ids: Iterable[int]) -> Dict[int, ImageHit]:
+        """Return the search presentation columns of ``ids`` keyed by id."""
+
+        id_list = list(set(ids))
+        if not id_list:
+            return {}
+        rows = (
+            self._session.query(*_HIT_COLUMNS)
+            .filter(ImageMetadata.id.in_(id_list))
+            .all()
+        )
+        return {row.id: _image_hit(row) for row in rows}
+
+    def get_by_hash(self, hash_value: str) -> Optional[ImageMetadata]:
+        return (
+            self._session.query(ImageMetadata)
+            .filter(ImageMetadata.hash == hash_value)
+            .order_by(ImageMetadata.id)
+            .first()
+        )
+
+    def get_by_hashes(self, hash_values: Iterable[str]) -> Dict[str, ImageMetadata]:
+        """Return the earliest record for each of ``hash_values`` that exists."""
+
+        unique_hashes = set(hash_values)
+        if not unique_hashes:
+            return {}
+        records = (
+            self._session.query(ImageMetadata)
+            .filter(ImageMetadata.hash.in_(unique_hashes))
+            .order_by(ImageMetadata.id.desc())
+            .all()
+        )
+        return {record.hash: record for record in records}
+
+    def find_near_duplicate(
+        self, phash: int, max_distance: int
+    ) -> Optional[ImageMetadata]:
+        """Return the stored image whose perceptual hash is closest to ``phash``.
+
+        See :meth:`find_near_duplicates`.
+        """
+
+        return self.find_near_duplicates([phash], max_distance)[0]
+
+    def find_near_duplicates(
+        self, phashes: Sequence[int], max_distance: int
+    ) -> List[Optional[ImageMetadata]]:
+        """Return the closest stored image for each of ``phashes`` in one query.
+
+        Candidates are narrowed through the indexed hash segments (multi-index
+        hashing) and ranked by exact Hamming distance in SQL; only matches
+        within ``max_distance`` bits are returned. Lookups are exhaustive for
+        distances below the number of segments.
+        """
+
+        if max_distance < 0 or not phashes:
+            return [None] * len(phashes)
+        probes = values(
+            sa_column("position", Integer),
+            sa_column("phash", BigInteger),
+            *(sa_column(column, Integer) for column in _PHASH_SEGMENT_COLUMNS),
+            name="probes",
+        ).data(
+            [
+                (position, to_signed64(phash), *hash_segments(phash))
+                for position, phash in enumerate(phashes)
+            ]
+        )
+        distance = func.bit_count(
+            cast(ImageMetadata.phash.op("#")(probes.c.phash), BIT(64))
+        )
+        rows = (
+            self._session.query(probes.c.position, ImageMetadata.id)
+            .select_from(probes)
+            .join(
+                ImageMetadata,
+                and_(
+                    or_(
+                        *(
+                            getattr(ImageMetadata, column) == probes.c[column]
+                            for column in _PHASH_SEGMENT_COLUMNS
+                        )
+                    ),
+                    distance <= max_distance,
+                ),
+            )
+            .distinct(probes.c.position)
+            .order_by(probes.c.position, distance, ImageMetadata.id)
+            .all()
+        )
+        if not rows:
+            return [None] * len(phashes)
+        best_ids = {position: image_id for position, image_id in rows}
+        records = {
+            record.id: record
+            for record in self._session.query(ImageMetadata)
+            .filter(ImageMetadata.id.in_(set(best_ids.values())))
+            .all()
+        }
+        return [
+            records.get(best_ids.get(position)) for position in range(len(phashes))
+        ]
+
+    def get_vector_columns(
+        self, ids: Iterable[int], columns: Sequence[str]
+    ) -> Dict[int, Dict[str, Optional[np.ndarray]]]:
+        """Return the vectors of ``ids`` in every one of ``columns``, keyed by id."""
+
+        ids = list(ids)
+        if not ids or not columns:
+            return {}
+        rows = (
+            self._session.query(
+                ImageMetadata.id, *(_vector_column(column) for column in columns)
+            )
+            .filter(ImageMetadata.id.in_(ids))
+            .all()
+        )
+        return {
+            row[0]: {
+                column: _optional_vector(vector)
+                for column, vector in zip(columns, row[1:])
+            }
+            for row in rows
+        }
+
+    def configure_hnsw_scan(
+        self,
+        *,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None,
+    ) -> None:
+        """Set HNSW search options for the rest of the current transaction.
+
+        ``ef_search`` is the size of the candidate list walked per query;
+        raising it trades latency for recall.
+        """
+
+        options: Dict[str, str] = {}
+        if ef_search is not None:
+            options["hnsw.ef_search"] = str(int(ef_search))
+        if iterative_scan is not None:
+            if iterative_scan not in HNSW_ITERATIVE_SCAN_MODES:
+                raise ValueError(f"unknown HNSW iterative scan {iterative_scan!r}")
+            options["hnsw.iterative_scan"] = iterative_scan
+        if not options:
+            return
+        # ``set_config(..., true)`` is ``SET LOCAL`` with bind parameters; all
+        # options are applied in one round trip.
+        calls = ", ".join(
+            f"set_config(:name_{i}, :value_{i}, true)" for i in range(len(options))
+        )
+        params: Dict[str, str] = {}
+        for i, (name, value) in enumerate(options.items()):
+            params[f"name_{i}"] = name
+            params[f"value_{i}"] = value
+        self._session.execute(sa_text(f"SELECT {calls}"), params)
+
     def search_by_embedding_vector(
-        self, vector: List[float], limit: int = 3
-    ) -> List[tuple[ImageMetadata, float]]:
-        """Return image rows ordered by visual embedding distance."""
+        self,
+        vector: VectorLike,
+        limit: int = 3,
+        *,
+        column: str = "embedding",
+        ef_search: Optional[int] = None,
+        metric: str = METRIC_COSINE,
+    ) -> List[tuple[ImageHit, float]]:
+        """Return image hits ordered by visual embedding distance in ``column``."""
 
-        if not vector:
+        vector = as_float32(vector)
+        if vector.size == 0:
             return []
 
-        distance = ImageMetadata.embedding.cosine_distance(vector)
+        self.configure_hnsw_scan(ef_search=_covering_ef_search(ef_search, limit))
+
+        ordering, distance = _exact_distance(_vector_column(column), vector, metric)
         query = (
-            self._session.query(ImageMetadata, distance.label("distance"))
-            .order_by(distance)
+            self._session.query(*_HIT_COLUMNS, distance.label("distance"))
+            .order_by(ordering)
         )
         if limit is not None:
             query = query.limit(limit)
-        return [
-            (record, float(dist))
-            for record, dist in query.all()
-        ]
+        return [(_image_hit(row), float(row.distance)) for row in query.all()]
 
     def search_by_text_embedding_vector(
-        self, vector: List[float], limit: int = 3
-    ) -> List[tuple[ImageMetadata, float]]:
-        """Return image rows ordered by OCR/text embedding distance."""
+        self,
+        vector: VectorLike,
+        limit: int = 3,
+        *,
+        column: str = "text_embedding",
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None,
+        metric: str = METRIC_COSINE,
+    ) -> List[tuple[ImageHit, float]]:
+        """Return image hits ordered by OCR/text embedding distance in ``column``."""
 
-        if not vector:
+        vector = as_float32(vector)
+        if vector.size == 0:
             return []
 
-        distance = ImageMetadata.text_embedding.cosine_distance(vector)
+        self.configure_hnsw_scan(
+            ef_search=_covering_ef_search(ef_search, limit),
+            iterative_scan=iterative_scan,
+        )
+
+        text_vectors = _vector_column(column)
+        ordering, distance = _exact_distance(text_vectors, vector, metric)
         query = (
-            self._session.query(ImageMetadata, distance.label("distance"))
-            .filter(ImageMetadata.text_embedding.isnot(None))
-            .order_by(distance)
+            self._session.query(*_HIT_COLUMNS, distance.label("distance"))
+            .filter(text_vectors.isnot(None))
+            .order_by(ordering)
         )
         if limit is not None:
             query = query.limit(limit)
+        return [(_image_hit(row), float(row.distance)) for row in query.all()]
+
+    def hybrid_search(
+        self,
+        vector: VectorLike,
+        limit: int = 3,
+        *,
+        image_column: str = "embedding",
+        text_column: str = "text_embedding",
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None,
+        storage: str = STORAGE_FULL,
+        oversample: int = 4,
+        metric: str = METRIC_COSINE,
+    ) -> List[HybridCandidate]:
+        """Run the visual and text ANN searches in one statement.
+
+        Each modality is a CTE ordered by its own column so PostgreSQL can walk
+        that column's HNSW index; the two candidate lists are full-outer
+        joined on id, so every row comes back once with both distances. The
+        text CTE filters out rows without OCR text, which is where
+        ``iterative_scan`` keeps the candidate list from running short.
+
+        With a compact ``storage`` mode each modality first takes
+        ``limit * oversample`` candidates from the halfvec or binary index and
+        then re-ranks them by exact cosine distance on the full vectors, so
+        the returned distances are always exact.
+
+        ``METRIC_INNER_PRODUCT`` is for columns holding unit-length vectors:
+        rows are ordered by negative inner product so the ``*_ip_ops`` indexes
+        apply, and ``1 - <a, b>`` is reported, which is the cosine distance.
+        """
+
+        vector = as_float32(vector)
+        if vector.size == 0 or limit <= 0:
+            return []
+
+        if storage != STORAGE_FULL:
+            # The compact index has to produce the whole oversampled list.
+            ef_search = max(
+                ef_search or _DEFAULT_EF_SEARCH, limit * max(1, oversample)
+            )
+        else:
+            ef_search = _covering_ef_search(ef_search, limit)
+        self.configure_hnsw_scan(ef_search=ef_search, iterative_scan=iterative_scan)
+
+        visual = _modality_cte(
+            "visual",
+            image_column,
+            vector,
+            limit,
+            storage=storage,
+            oversample=oversample,
+            metric=metric,
+        )
+        textual = _modality_cte(
+            "textual",
+            text_column,
+            vector,
+            limit,
+            storage=storage,
+            oversample=oversample,
+            metric=metric,
+            skip_missing=True,
+        )
+        candidates = visual.join(textual, visual.c.id == textual.c.id, full=True)
+        statement = select(
+            *_HIT_COLUMNS,
+            visual.c.distance.label("visual_distance"),
+            textual.c.distance.label("text_distance"),
+        ).select_from(
+            candidates.join(
+                ImageMetadata.__table__,
+                ImageMetadata.id == func.coalesce(visual.c.id, textual.c.id),
+            )
+        )
         return [
-            (record, float(dist))
-            for record, dist in query.all()
+            (
+                _image_hit(row),
+                None if row.visual_distance is None else float(row.visual_distance),
+                None if row.text_distance is None else float(row.text_distance),
+            )
+            for row in self._session.execute(statement)
         ]
 
 
+def _exact_distance(
+    vectors: ColumnElement, vector: np.ndarray, metric: str
+) -> tuple[ColumnElement, ColumnElement]:
+    """Return ``(ordering, cosine distance)`` expressions for ``metric``."""
+
+    if metric == METRIC_COSINE:
+        distance = vectors.cosine_distance(vector)
+        return distance, distance
+    if metric == METRIC_INNER_PRODUCT:
+        # ``<#>`` is the negative inner product; ordering by it directly is
+        # what lets PostgreSQL walk a ``vector_ip_ops`` index.
+        negative_inner_product = vectors.max_inner_product(vector)
+        return negative_inner_product, negative_inner_product + 1
+    raise ValueError(f"unknown vector metric {metric!r}")
+
+
+def _compact_distance(
+    column: str, vector: np.ndarray, storage: str, metric: str
+) -> ColumnElement:
+    # These must match the index expressions in ``hnsw_index_statement``.
+    dimension = int(vector.shape[-1])
+    query = bindparam(None, vector, type_=Vector(dimension))
+    if storage == STORAGE_HALFVEC:
+        operator = "<#>" if metric == METRIC_INNER_PRODUCT else "<=>"
+        return cast(_vector_column(column), HALFVEC(dimension)).op(
+            operator, return_type=Float
+        )(cast(query, HALFVEC(dimension)))
+    if storage == STORAGE_BINARY:
+        return cast(func.binary_quantize(_vector_column(column)), BIT(dimension)).op(
+            "<~>", return_type=Float
+        )(func.binary_quantize(query))
+    raise ValueError(f"unknown vector storage mode {storage!r}")
+
+
+def _modality_cte(
+    name: str,
+    column: str,
+    vector: np.ndarray,
+    limit: int,
+    *,
+    storage: str,
+    oversample: int,
+    metric: str,
+    skip_missing: bool = False,
+) -> CTE:
+    vectors = _vector_column(column)
+    ordering, exact = _exact_distance(vectors, vector, metric)
+    filters = [vectors.isnot(None)] if skip_missing else []
+    if storage == STORAGE_FULL:
+        return (
+            select(ImageMetadata.id.label("id"), exact.label("distance"))
+            .where(*filters)
+            .order_by(ordering)
+            .limit(limit)
+            .cte(name)
+        )
+    approximate = _compact_distance(column, vector, storage, metric)
+    candidates = (
+        select(ImageMetadata.id)
+        .where(*filters)
+        .order_by(approximate)
+        .limit(limit * max(1, oversample))
+        .cte(f"{name}_candidates")
+    )
+    # The exact distances are computed in a materialized CTE and sorted as a
+    # plain column: an ``ORDER BY`` on the vector expression itself could be
+    # planned as a scan of a leftover full-precision HNSW index filtered by
+    # ``id IN (...)``, which returns at most ``ef_search`` rows before the
+    # filter and can come back short.
+    scored = (
+        select(ImageMetadata.id.label("id"), exact.label("distance"))
+        .where(ImageMetadata.id.in_(select(candidates.c.id)))
+        .cte(f"{name}_scored")
+        .prefix_with("MATERIALIZED")
+    )
+    return (
+        select(scored.c.id, scored.c.distance)
+        .order_by(scored.c.distance)
+        .limit(limit)
+        .cte(name)
+    )
+
+
+def _image_hit(row: Row) -> ImageHit:
+    return ImageHit(
+        id=row.id, url=row.url, width=row.width, height=row.height, text=row.text
+    )
+
+
 class EmbeddingRepository:
     def __init__(self, session: Session) -> None:
         self._session = session
 
-    def create(self, embedding: List[float], content: Optional[str] = None) -> Embedding:
-        record = Embedding(embedding=embedding, content=content)
+    def create(self, embedding: VectorLike, content: Optional[str] = None) -> Embedding:
+        record = Embedding(embedding=as_float32(embedding), content=content)
         self._session.add(record)
         self._session.commit()
         self._session.refresh(record)
         return record
 
-    def search_by_vector(self, vector: List[float]) -> List[Embedding]:
+    def search_by_vector(self, vector: VectorLike) -> List[Embedding]:
         return (
             self._session.query(Embedding)
-            .order_by(Embedding.embedding.cosine_distance(vector))
+            .order_by(Embedding.embedding.cosine_distance(as_float32(vector)))
             .all()
         )
 
 
-__all__ = ["ImageRepository", "EmbeddingRepository"]
+__all__ = [
+    "DEFAULT_VECTOR_COLUMNS",
+    "EmbeddingRepository",
+    "HNSW_ITERATIVE_SCAN_MODES",
+    "HybridCandidate",
+    "INDEX_EPOCH_SEQUENCE",
+    "ImageHit",
+    "ImageRepository",
+    "NewImage",
+    "VectorColumns",
+]
@@ -0,0 +1,102 @@
+"""Data-access helpers for background ingest jobs."""
+
+from __future__ import annotations
+
+from datetime import datetime, timezone
+from typing import Iterable, List, Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.models.ingest_jobs import IngestJobRecord
+
+
+class IngestJobRepository:
+    def __init__(self, session: Session) -> None:
+        self._session = session
+
+    def get(self, job_id: str) -> Optional[IngestJobRecord]:
+        return self._session.get(IngestJobRecord, job_id)
+
+    def create(self, record: IngestJobRecord) -> IngestJobRecord:
+        self._session.add(record)
+        self._session.commit()
+        self._session.refresh(record)
+        return record
+
+    def update(self, job_id: str, **changes: object) -> None:
+        self._session.execute(
+            update(IngestJobRecord)
+            .where(IngestJobRecord.id == job_id)
+            .values(**changes, updated_at=datetime.now(timezone.utc))
+        )
+        self._session.commit()
+
+    def owners_of(self, statuses: Iterable[str]) -> List[int]:
+        """Return the distinct owners of jobs in ``statuses``."""
+
+        return list(
+            self._session.scalars(
+                select(IngestJobRecord.owner)
+                .where(
+                    IngestJobRecord.status.in_(list(statuses)),
+                    IngestJobRecord.owner.is_not(None),
+                )
+                .distinct()
+            )
+        )
+
+    def claim(
+        self, *, previous_owner: int, owner: int, statuses: Iterable[str], status: str
+    ) -> List[IngestJobRecord]:
+        """Move ``previous_owner``'s jobs in ``statuses`` to ``owner``."""
+
+        job_ids = self._session.scalars(
+            update(IngestJobRecord)
+            .where(
+                IngestJobRecord.owner == previous_owner,
+                IngestJobRecord.status.in_(list(statuses)),
+            )
+            .values(
+                owner=owner,
+                status=status,
+                stage=None,
+                progress=0.0,
+                updated_at=datetime.now(timezone.utc),
+            )
+            .returning(IngestJobRecord.id)
+        ).all()
+        self._session.commit()
+        if not job_ids:
+            return []
+        return list(
+            self._session.scalars(
+                select(IngestJobRecord)
+                .where(IngestJobRecord.id.in_(job_ids))
+                .order_by(IngestJobRecord.created_at)
+            )
+        )
+
+    def prune(self, *, statuses: Iterable[str], keep: int) -> int:
+        """Delete all but the ``keep`` most recently updated jobs in ``statuses``."""
+
+        statuses = list(statuses)
+        retained = (
+            select(IngestJobRecord.id)
+            .where(IngestJobRecord.status.in_(statuses))
+            .order_by(IngestJobRecord.updated_at.desc())
+            .limit(max(0, keep))
+        )
+        result = self._session.execute(
+            delete(IngestJobRecord)
+            .where(
+                IngestJobRecord.status.in_(statuses),
+                IngestJobRecord.id.not_in(retained.scalar_subquery()),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        self._session.commit()
+        return result.rowcount or 0
+
+
+__all__ = ["IngestJobRepository"]
@@ -1,5 +1,5 @@
 """Router module exports."""
 
-from . import auth, images, search
+from . import auth, health, images, jobs, search
 
-__all__ = ["auth", "images", "search"]
+__all__ = ["auth", "health", "images", "jobs", "search"]
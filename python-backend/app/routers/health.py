@@ -0,0 +1,46 @@
+"""Readiness probe reporting the state of the ML models."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Response, status
+
+from app.core.config import get_settings
+from app.schemas.health import ModelStatusOut, ReadinessOut
+from app.services.model_lifecycle import MODEL_FAILED, get_model_lifecycle
+
+router = APIRouter(prefix="/api", tags=["health"])
+
+
+@router.get("/ready", response_model=ReadinessOut)
+def read_ready(response: Response) -> ReadinessOut:
+    """Report per-model load status and timings.
+
+    With ``MODEL_WARMUP`` enabled the probe fails until every model has loaded
+    and run its warm-up pass. Otherwise models load lazily on first use, so the
+    service is ready as long as no model has failed to load.
+    """
+
+    lifecycle = get_model_lifecycle()
+    states = lifecycle.states()
+    if get_settings().model_warmup:
+        ready = lifecycle.all_ready()
+    else:
+        ready = all(state.status != MODEL_FAILED for state in states)
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return ReadinessOut(
+        ready=ready,
+        models=[
+            ModelStatusOut(
+                name=state.name,
+                status=state.status,
+                load_seconds=state.load_seconds,
+                warmup_seconds=state.warmup_seconds,
+                error=state.error,
+            )
+            for state in states
+        ],
+    )
+
+
+__all__ = ["router"]
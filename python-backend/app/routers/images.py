@@ -2,25 +2,42 @@
 
 from __future__ import annotations
 
-from typing import List, Optional, Sequence
+from typing import List
 
-from fastapi import APIRouter, Depends, File, UploadFile
+from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
 from app.db.session import get_db
-from app.schemas.images import ImageOut
-from app.services.image_ingest_service import get_image_ingest_service
+from app.models.images import ImageMetadata
+from app.routers.jobs import to_job_out
+from app.schemas.images import BatchUploadItem, BatchUploadResponse, ImageOut
+from app.schemas.jobs import JobOut
+from app.services.image_ingest_service import ImageUpload, get_image_ingest_service
 from app.core.security import get_current_user
+from app.utils.vectors import vector_to_list
+from app.workers.ingest_jobs import IngestQueueFullError, get_ingest_job_queue
 
 router = APIRouter(
     prefix="/api", tags=["images"], dependencies=[Depends(get_current_user)]
 )
 
+_MAX_BATCH_FILES = 64
 
-def _vector_to_list(vector: Optional[Sequence[float]]) -> Optional[List[float]]:
-    if vector is None:
-        return None
-    return list(vector)
+
+def _to_image_out(metadata: ImageMetadata) -> ImageOut:
+    return ImageOut(
+        id=metadata.id,
+        url=metadata.url,
+        hash=metadata.hash,
+        width=metadata.width,
+        height=metadata.height,
+        embedding=vector_to_list(metadata.embedding) or [],
+        text=metadata.text,
+        text_embedding=vector_to_list(metadata.text_embedding),
+        near_duplicate_of_id=metadata.near_duplicate_of_id,
+    )
 
 
 @router.post("/upload-image", response_model=ImageOut)
@@ -28,23 +45,82 @@ async def upload_image(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
 ) -> ImageOut:
-    data = await file.read()
     service = get_image_ingest_service()
-    metadata = service.ingest(
+    filename = file.filename or "uploaded_image"
+    if get_settings().streaming_uploads:
+        metadata = await run_in_threadpool(
+            service.ingest_stream,
+            db=db,
+            stream=file.file,
+            filename=filename,
+            content_type=file.content_type,
+        )
+        return _to_image_out(metadata)
+
+    data = await file.read()
+    metadata = await run_in_threadpool(
+        service.ingest,
         db=db,
         data=data,
-        filename=file.filename or "uploaded_image",
+        filename=filename,
         content_type=file.content_type,
     )
-    return ImageOut(
-        id=metadata.id,
-        url=metadata.url,
-        hash=metadata.hash,
-        width=metadata.width,
-        height=metadata.height,
-        embedding=list(metadata.embedding) if metadata.embedding is not None else [],
-        text=metadata.text,
-        text_embedding=_vector_to_list(metadata.text_embedding),
+    return _to_image_out(metadata)
+
+
+@router.post(
+    "/upload-image/async",
+    response_model=JobOut,
+    status_code=status.HTTP_202_ACCEPTED,
+)
+async def enqueue_image_upload(file: UploadFile = File(...)) -> JobOut:
+    data = await file.read()
+    try:
+        job = await run_in_threadpool(
+            get_ingest_job_queue().submit,
+            data=data,
+            filename=file.filename or "uploaded_image",
+            content_type=file.content_type,
+        )
+    except IngestQueueFullError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many uploads are being processed; retry later",
+        ) from None
+    return to_job_out(job)
+
+
+@router.post("/upload-images", response_model=BatchUploadResponse)
+async def upload_images(
+    files: List[UploadFile] = File(...),
+    db: Session = Depends(get_db),
+) -> BatchUploadResponse:
+    if len(files) > _MAX_BATCH_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {_MAX_BATCH_FILES} files can be uploaded per batch",
+        )
+    uploads = [
+        ImageUpload(
+            data=await file.read(),
+            filename=file.filename or "uploaded_image",
+            content_type=file.content_type,
+        )
+        for file in files
+    ]
+    service = get_image_ingest_service()
+    results = await run_in_threadpool(service.ingest_batch, db=db, uploads=uploads)
+    items = [
+        BatchUploadItem(
+            filename=result.filename,
+            image=_to_image_out(result.metadata) if result.metadata is not None else None,
+            error=result.error,
+        )
+        for result in results
+    ]
+    succeeded = sum(1 for item in items if item.image is not None)
+    return BatchUploadResponse(
+        items=items, succeeded=succeeded, failed=len(items) - succeeded
     )
 
 
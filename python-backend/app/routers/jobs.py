@@ -0,0 +1,38 @@
+"""Background job status API routes."""
+
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException
+
+from app.core.security import get_current_user
+from app.schemas.jobs import JobOut
+from app.workers.ingest_jobs import IngestJob, get_ingest_job_queue
+
+router = APIRouter(
+    prefix="/api", tags=["jobs"], dependencies=[Depends(get_current_user)]
+)
+
+
+def to_job_out(job: IngestJob) -> JobOut:
+    return JobOut(
+        id=job.id,
+        filename=job.filename,
+        status=job.status,
+        stage=job.stage,
+        progress=job.progress,
+        image_id=job.image_id,
+        error=job.error,
+        created_at=job.created_at,
+        updated_at=job.updated_at,
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=JobOut)
+def get_job(job_id: str) -> JobOut:
+    job = get_ingest_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return to_job_out(job)
+
+
+__all__ = ["router", "to_job_out"]
@@ -18,6 +18,7 @@ from app.schemas.embeddings import (
     RetrieveQuery,
     RetrievedItem,
     RetrievalAugmentedResponse,
+    SemanticCacheStatsOut,
 )
 from app.services.retrieval_service import (
     RetrievalService,
@@ -28,6 +29,7 @@ from app.services.chat_completion_service import (
     ChatCompletionService,
     get_chat_completion_service,
 )
+from app.utils.vectors import vector_to_list
 
 router = APIRouter(
     prefix="/api", tags=["search"], dependencies=[Depends(get_current_user)]
@@ -40,7 +42,7 @@ def create_demo_embedding(db: Session = Depends(get_db)) -> EmbeddingOut:
     embedding = repository.create(embedding=[0.1, 0.2, 0.3], content="demo content")
     return EmbeddingOut(
         id=embedding.id,
-        embedding=list(embedding.embedding),
+        embedding=vector_to_list(embedding.embedding),
         content=embedding.content,
     )
 
@@ -55,7 +57,7 @@ def list_embeddings(
     return [
         EmbeddingOut(
             id=record.id,
-            embedding=list(record.embedding),
+            embedding=vector_to_list(record.embedding),
             content=record.content,
         )
         for record in results
@@ -87,7 +89,9 @@ def retrieve_images(
     chat_service: ChatCompletionService = Depends(get_chat_completion_service),
 ) -> RetrievalAugmentedResponse:
     try:
-        results = retrieval_service.retrieve(db=db, query=request.query, k=request.k)
+        results = retrieval_service.retrieve(
+            db=db, query=request.query, k=request.k, ef_search=request.ef_search
+        )
     except RetrievalServiceError as exc:
         status_code = 400 if isinstance(exc.__cause__, ValueError) else 503
         raise HTTPException(status_code=status_code, detail=str(exc)) from exc
@@ -111,4 +115,27 @@ def retrieve_images(
     return RetrievalAugmentedResponse(items=items, completion=completion)
 
 
+@router.get("/search/cache-stats", response_model=SemanticCacheStatsOut)
+def semantic_cache_stats(
+    retrieval_service: RetrievalService = Depends(get_retrieval_service),
+) -> SemanticCacheStatsOut:
+    """Report this worker's semantic query cache counters for threshold tuning."""
+
+    stats = retrieval_service.semantic_cache_stats()
+    if stats is None:
+        return SemanticCacheStatsOut(enabled=False)
+    lookups = stats.hits + stats.misses
+    return SemanticCacheStatsOut(
+        enabled=True,
+        entries=stats.entries,
+        capacity=stats.capacity,
+        threshold=stats.threshold,
+        near_hit_margin=stats.near_hit_margin,
+        hits=stats.hits,
+        misses=stats.misses,
+        near_hits=stats.near_hits,
+        hit_rate=stats.hits / lookups if lookups else 0.0,
+    )
+
+
 __all__ = ["router"]
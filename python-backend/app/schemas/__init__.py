@@ -9,8 +9,11 @@ from .embeddings import (
     RetrieveQuery,
     RetrievedItem,
     RetrievalAugmentedResponse,
+    SemanticCacheStatsOut,
 )
-from .images import ImageOut
+from .health import ModelStatusOut, ReadinessOut
+from .images import BatchUploadItem, BatchUploadResponse, ImageOut
+from .jobs import JobOut
 
 __all__ = [
     "Token",
@@ -25,5 +28,11 @@ __all__ = [
     "RetrieveQuery",
     "RetrievedItem",
     "RetrievalAugmentedResponse",
+    "SemanticCacheStatsOut",
+    "BatchUploadItem",
+    "BatchUploadResponse",
     "ImageOut",
+    "JobOut",
+    "ModelStatusOut",
+    "ReadinessOut",
 ]
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 try:  # pragma: no cover - compatibility shim
     from pydantic import ConfigDict
@@ -40,6 +40,10 @@ class OpenAIRequest(BaseModel):
 class RetrieveQuery(BaseModel):
     query: str
     k: int = 3
+    # HNSW candidate list size for this request; higher values improve recall
+    # at the cost of latency. ``None`` uses HNSW_EF_SEARCH; values below the
+    # candidate pool are raised to it so a search never returns short.
+    ef_search: int | None = Field(default=None, ge=1, le=1000)
 
 
 class RetrievedItem(BaseModel):
@@ -65,6 +69,18 @@ class RetrievalAugmentedResponse(BaseModel):
     completion: Dict[str, Any]
 
 
+class SemanticCacheStatsOut(BaseModel):
+    enabled: bool
+    entries: int = 0
+    capacity: int = 0
+    threshold: float | None = None
+    near_hit_margin: float | None = None
+    hits: int = 0
+    misses: int = 0
+    near_hits: int = 0
+    hit_rate: float = 0.0
+
+
 __all__ = [
     "EmbeddingOut",
     "AskRequest",
@@ -73,4 +89,5 @@ __all__ = [
     "RetrieveQuery",
     "RetrievedItem",
     "RetrievalAugmentedResponse",
+    "SemanticCacheStatsOut",
 ]
@@ -0,0 +1,23 @@
+"""Pydantic models for service readiness."""
+
+from __future__ import annotations
+
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+
+class ModelStatusOut(BaseModel):
+    name: str
+    status: str
+    load_seconds: Optional[float] = None
+    warmup_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+class ReadinessOut(BaseModel):
+    ready: bool
+    models: List[ModelStatusOut]
+
+
+__all__ = ["ModelStatusOut", "ReadinessOut"]
@@ -21,6 +21,7 @@ class ImageOut(BaseModel):
     embedding: List[float]
     text: Optional[str] = None
     text_embedding: Optional[List[float]] = None
+    near_duplicate_of_id: Optional[int] = None
 
     if ConfigDict is not None:  # pragma: no branch
         model_config = ConfigDict(from_attributes=True)
@@ -29,4 +30,16 @@ class ImageOut(BaseModel):
             orm_mode = True
 
 
-__all__ = ["ImageOut"]
+class BatchUploadItem(BaseModel):
+    filename: str
+    image: Optional[ImageOut] = None
+    error: Optional[str] = None
+
+
+class BatchUploadResponse(BaseModel):
+    items: List[BatchUploadItem]
+    succeeded: int
+    failed: int
+
+
+__all__ = ["BatchUploadItem", "BatchUploadResponse", "ImageOut"]
@@ -0,0 +1,34 @@
+"""Pydantic models describing background ingest jobs."""
+
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Optional
+
+from pydantic import BaseModel
+
+try:  # pragma: no cover - compatibility shim
+    from pydantic import ConfigDict
+except ImportError:  # pragma: no cover
+    ConfigDict = None
+
+
+class JobOut(BaseModel):
+    id: str
+    filename: str
+    status: str
+    stage: Optional[str] = None
+    progress: float
+    image_id: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    if ConfigDict is not None:  # pragma: no branch
+        model_config = ConfigDict(from_attributes=True)
+    else:  # pragma: no cover - legacy support
+        class Config:
+            orm_mode = True
+
+
+__all__ = ["JobOut"]
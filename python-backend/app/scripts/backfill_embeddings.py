@@ -0,0 +1,136 @@
+"""CLI utility to (re)compute embeddings and OCR text for stored images."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from app.services.embedding_registry import encoder_columns, get_embedding_registry
+from app.services.ocr_service import get_ocr_service
+from app.services.vector_index import MmapVectorIndex, get_vector_index
+from app.utils.checkpoint import JsonCheckpoint
+from app.utils.storage import get_storage_client
+from app.workers.backfill import BackfillProgress, EmbeddingBackfill
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Fill or refresh image embeddings, OCR text and text embeddings in "
+            "resumable keyset-paginated batches."
+        )
+    )
+    parser.add_argument(
+        "--all",
+        action="store_true",
+        help=(
+            "Re-embed every row (e.g. after a model upgrade) instead of only rows "
+            "missing an image vector or holding OCR text without a text vector."
+        ),
+    )
+    parser.add_argument(
+        "--model",
+        action="append",
+        dest="models",
+        metavar="MODEL_ID",
+        help=(
+            "Only fill the columns of this registered model; may be repeated. "
+            "Defaults to the active model and every shadow model."
+        ),
+    )
+    parser.add_argument(
+        "--reuse-text",
+        action="store_true",
+        help="Keep stored OCR text and only re-encode it instead of running OCR again.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="Number of rows processed and written per batch.",
+    )
+    parser.add_argument(
+        "--download-workers",
+        type=int,
+        default=8,
+        help="Number of concurrent MinIO downloads.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        default=Path("backfill-checkpoint.json"),
+        help="Checkpoint file recording the last processed image id.",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore an existing checkpoint and start from the first row.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.batch_size <= 0:
+        print("Error: --batch-size must be positive.", file=sys.stderr)
+        return 1
+
+    encoders = get_embedding_registry().write_encoders()
+    if args.models:
+        unknown = set(args.models) - {encoder.spec.model_id for encoder in encoders}
+        if unknown:
+            print(
+                f"Error: not an active or shadow model: {', '.join(sorted(unknown))}.",
+                file=sys.stderr,
+            )
+            return 1
+        encoders = [
+            encoder for encoder in encoders if encoder.spec.model_id in args.models
+        ]
+
+    checkpoint = JsonCheckpoint(args.checkpoint)
+    if args.restart:
+        checkpoint.clear()
+
+    backfill = EmbeddingBackfill(
+        storage_client=get_storage_client(),
+        encoders=encoders,
+        ocr_service=None if args.reuse_text else get_ocr_service(),
+        checkpoint=checkpoint,
+        batch_size=args.batch_size,
+        download_workers=args.download_workers,
+        missing_only=not args.all,
+    )
+    progress = backfill.load_progress()
+    if progress.last_id:
+        print(f"Resuming after image id {progress.last_id}.")
+
+    def report(current: BackfillProgress) -> None:
+        print(
+            f"Processed up to id {current.last_id}: {current.updated} updated, "
+            f"{current.failed} failed."
+        )
+
+    vector_index = get_vector_index()
+    if isinstance(vector_index, MmapVectorIndex):
+        # The on-disk copies would lack the filled rows; search PostgreSQL
+        # until build_vector_index has copied them.
+        vector_index.invalidate(encoder_columns(encoders))
+        print(
+            "On-disk vector index paused for these columns; run "
+            "app.scripts.build_vector_index afterwards to resume it."
+        )
+
+    result = backfill.run(progress, on_batch=report)
+    print(
+        f"Backfill finished: {result.updated} rows updated, {result.failed} failed. "
+        f"Removed {checkpoint.path}; the next run starts from the first row."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,68 @@
+"""CLI utility to build the on-disk vector index used by the mmap backend."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+from app.core.config import get_settings
+from app.services.embedding_registry import get_embedding_registry
+from app.services.vector_index import MmapVectorIndex
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Copy image vectors from PostgreSQL into memory-mapped files so "
+            "VECTOR_INDEX_BACKEND=mmap can search them in-process. Without "
+            "--rebuild only rows added since the last run are appended."
+        )
+    )
+    parser.add_argument(
+        "--path",
+        type=Path,
+        default=None,
+        help="Index directory; defaults to VECTOR_INDEX_PATH.",
+    )
+    parser.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Re-read every row, e.g. after a backfill changed stored vectors.",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=4096,
+        help="Number of rows read per query.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _parse_args()
+    logging.basicConfig(level=logging.INFO)
+    if args.batch_size <= 0:
+        print("Error: --batch-size must be positive.", file=sys.stderr)
+        return 1
+
+    index = MmapVectorIndex(
+        args.path or get_settings().vector_index_path, batch_size=args.batch_size
+    )
+    # Copy the columns of every model that receives writes. A column is only
+    # served from disk once it has rows and every stored vector is on disk, so
+    # a shadow model stays on pgvector until its backfill has been copied.
+    columns = [
+        column
+        for spec in get_embedding_registry().write_models()
+        for column in (spec.image_column, spec.text_column)
+    ]
+    for column, added in index.build(columns, rebuild=args.rebuild).items():
+        served = "served from disk" if index.is_ready(column) else "served by pgvector"
+        print(f"{column}: {added} vectors added; {served}.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,285 @@
+"""CLI utility to seed large image collections without going through HTTP."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import mimetypes
+import sys
+import tarfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from itertools import islice
+from pathlib import Path
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from app.db.session import SessionLocal
+from app.repositories.images_repo import ImageRepository, NewImage
+from app.services.embedding_registry import (
+    encode_batch_columns,
+    encoder_columns,
+    get_embedding_registry,
+)
+from app.services.ocr_service import get_ocr_service
+from app.services.vector_index import MmapVectorIndex, get_vector_index
+from app.utils.checkpoint import JsonCheckpoint
+from app.utils.hashing import sha256_hash
+from app.utils.perceptual_hash import dhash
+from app.utils.storage import get_storage_client
+
+
+logger = logging.getLogger(__name__)
+
+IMAGE_SUFFIXES = frozenset(
+    {".png", ".jpg", ".jpeg", ".gif", ".bmp", ".tif", ".tiff", ".webp"}
+)
+
+
+@dataclass(slots=True)
+class _SourceFile:
+    name: str
+    data: bytes
+
+
+@dataclass(slots=True)
+class _DecodedFile:
+    source: _SourceFile
+    hash_value: str
+    image: Image.Image
+    phash: int
+    url: str = ""
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Import a directory or tar archive of images into the knowledge hub "
+            "using batched embedding, concurrent object uploads and binary COPY."
+        )
+    )
+    parser.add_argument(
+        "source",
+        type=Path,
+        help="Directory to walk recursively or tar archive (optionally compressed).",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=256,
+        help="Number of images decoded, embedded and written per batch.",
+    )
+    parser.add_argument(
+        "--upload-workers",
+        type=int,
+        default=8,
+        help="Number of concurrent MinIO uploads.",
+    )
+    parser.add_argument(
+        "--checkpoint",
+        type=Path,
+        help=(
+            "Checkpoint file used to resume an interrupted run. Defaults to "
+            "<source>.import-checkpoint.json."
+        ),
+    )
+    parser.add_argument(
+        "--skip-ocr",
+        action="store_true",
+        help="Do not run OCR; rows are written without text or text embeddings.",
+    )
+    parser.add_argument(
+        "--restart",
+        action="store_true",
+        help="Ignore an existing checkpoint and start from the first file.",
+    )
+    return parser.parse_args()
+
+
+def _iter_directory(root: Path) -> Iterator[Tuple[str, Path]]:
+    for path in sorted(root.rglob("*")):
+        if path.is_file() and path.suffix.lower() in IMAGE_SUFFIXES:
+            yield path.relative_to(root).as_posix(), path
+
+
+def _iter_source(source: Path, skip: int) -> Iterator[_SourceFile]:
+    """Yield image files in a deterministic order, skipping the first ``skip``.
+
+    Skipped entries are never read, so resuming a large run only pays for
+    walking the directory listing or the tar headers.
+    """
+
+    if source.is_dir():
+        for name, path in islice(_iter_directory(source), skip, None):
+            yield _SourceFile(name=name, data=path.read_bytes())
+        return
+
+    with tarfile.open(source, "r:*") as archive:
+        position = 0
+        for member in archive:
+            if not member.isfile() or Path(member.name).suffix.lower() not in IMAGE_SUFFIXES:
+                continue
+            position += 1
+            if position <= skip:
+                continue
+            handle = archive.extractfile(member)
+            if handle is None:
+                continue
+            yield _SourceFile(name=member.name, data=handle.read())
+
+
+def _batched(files: Iterator[_SourceFile], size: int) -> Iterator[List[_SourceFile]]:
+    while True:
+        batch = list(islice(files, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _decode(batch: Sequence[_SourceFile], existing_hashes: set[str]) -> List[_DecodedFile]:
+    decoded: List[_DecodedFile] = []
+    seen = set(existing_hashes)
+    for source in batch:
+        hash_value = sha256_hash(source.data)
+        if hash_value in seen:
+            continue
+        try:
+            image = Image.open(BytesIO(source.data)).convert("RGB")
+        except Exception:
+            logger.warning("Skipping %s: not a valid image.", source.name)
+            continue
+        seen.add(hash_value)
+        decoded.append(
+            _DecodedFile(
+                source=source, hash_value=hash_value, image=image, phash=dhash(image)
+            )
+        )
+    return decoded
+
+
+def _upload(item: _DecodedFile) -> str:
+    content_type, _ = mimetypes.guess_type(item.source.name)
+    object_name = f"{uuid.uuid4()}_{Path(item.source.name).name}"
+    return get_storage_client().upload_file(object_name, item.source.data, content_type)
+
+
+def _import_batch(
+    batch: Sequence[_SourceFile],
+    *,
+    uploader: ThreadPoolExecutor,
+    skip_ocr: bool,
+) -> int:
+    session = SessionLocal()
+    try:
+        repository = ImageRepository(session)
+        existing = repository.get_by_hashes(sha256_hash(item.data) for item in batch)
+        decoded = _decode(batch, set(existing))
+        if not decoded:
+            return 0
+
+        # Uploads run on the pool while the batch is embedded and OCR'd.
+        upload_futures = [uploader.submit(_upload, item) for item in decoded]
+
+        if skip_ocr:
+            texts: List[Optional[str]] = [None] * len(decoded)
+        else:
+            ocr_service = get_ocr_service()
+            ocr_futures = [ocr_service.submit(item.image) for item in decoded]
+            texts = [future.result() for future in ocr_futures]
+        batch_vectors = encode_batch_columns(
+            get_embedding_registry().write_encoders(),
+            [item.image for item in decoded],
+            texts,
+        )
+
+        for item, future in zip(decoded, upload_futures):
+            item.url = future.result()
+
+        return repository.copy_images(
+            [
+                NewImage(
+                    url=item.url,
+                    hash_value=item.hash_value,
+                    width=item.image.width,
+                    height=item.image.height,
+                    vectors=vectors,
+                    text=text,
+                    phash=item.phash,
+                )
+                for item, text, vectors in zip(decoded, texts, batch_vectors)
+            ]
+        )
+    finally:
+        session.close()
+
+
+def main() -> int:
+    args = _parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    source: Path = args.source
+    if not source.exists():
+        print(f"Error: {source} does not exist.", file=sys.stderr)
+        return 1
+    if args.batch_size <= 0:
+        print("Error: --batch-size must be positive.", file=sys.stderr)
+        return 1
+
+    checkpoint = JsonCheckpoint(
+        args.checkpoint or source.with_name(f"{source.name}.import-checkpoint.json")
+    )
+    state = None if args.restart else checkpoint.load()
+    if state is not None and state.get("source") != str(source.resolve()):
+        print(
+            f"Error: checkpoint {checkpoint.path} belongs to {state.get('source')}. "
+            "Pass --restart or a different --checkpoint.",
+            file=sys.stderr,
+        )
+        return 1
+    processed = int(state["processed"]) if state else 0
+    imported = int(state["imported"]) if state else 0
+    if processed:
+        print(f"Resuming after {processed} files ({imported} imported so far).")
+
+    vector_index = get_vector_index()
+    if isinstance(vector_index, MmapVectorIndex):
+        # COPY does not return the new ids, so the on-disk copies cannot be
+        # appended to; search PostgreSQL until build_vector_index catches up.
+        vector_index.invalidate(
+            encoder_columns(get_embedding_registry().write_encoders())
+        )
+        print(
+            "On-disk vector index paused for the imported columns; run "
+            "app.scripts.build_vector_index afterwards to resume it."
+        )
+
+    get_storage_client().ensure_bucket()
+    with ThreadPoolExecutor(
+        max_workers=max(1, args.upload_workers), thread_name_prefix="bulk-upload"
+    ) as uploader:
+        for batch in _batched(_iter_source(source, processed), args.batch_size):
+            imported += _import_batch(batch, uploader=uploader, skip_ocr=args.skip_ocr)
+            processed += len(batch)
+            # Rows are committed before the checkpoint advances; a crash in
+            # between is harmless because re-read files are skipped by hash.
+            checkpoint.save(
+                {
+                    "source": str(source.resolve()),
+                    "processed": processed,
+                    "imported": imported,
+                }
+            )
+            print(f"Processed {processed} files, imported {imported}.")
+
+    print(
+        f"Bulk import finished: {imported} images imported from {processed} files. "
+        f"Checkpoint kept at {checkpoint.path}."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
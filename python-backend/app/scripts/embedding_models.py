@@ -0,0 +1,260 @@
+"""CLI utility to manage the embedding model registry."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+import time
+from typing import Sequence
+
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings, get_settings
+from app.db.session import SessionLocal, engine
+from app.db.vector_indexes import (
+    METRIC_COSINE,
+    METRIC_INNER_PRODUCT,
+    create_indexes_concurrently,
+    hnsw_index_statement,
+    index_metric,
+)
+from app.repositories.embedding_models_repo import (
+    EmbeddingModelError,
+    EmbeddingModelRepository,
+)
+from app.repositories.images_repo import ImageRepository
+
+logger = logging.getLogger(__name__)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Register, activate and retire embedding models. Each model keeps "
+            "its vectors in its own columns, so a new model can be backfilled "
+            "next to the active one and switched to without downtime."
+        )
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    commands.add_parser("list", help="Show every registered model.")
+
+    register = commands.add_parser(
+        "register",
+        help="Add a shadow model, its vector columns and their HNSW indexes.",
+    )
+    register.add_argument("model_id", help="SentenceTransformer model name.")
+    register.add_argument(
+        "--dimension",
+        type=int,
+        required=True,
+        help="Length of the vectors the model produces.",
+    )
+    register.add_argument(
+        "--normalized",
+        action="store_true",
+        help="L2-normalize the model's vectors before they are stored.",
+    )
+
+    activate = commands.add_parser(
+        "activate",
+        help="Serve searches from this model; the current one becomes a shadow.",
+    )
+    activate.add_argument("model_id")
+    activate.add_argument(
+        "--force",
+        action="store_true",
+        help="Activate even though some images have no vector for the model yet.",
+    )
+
+    retire = commands.add_parser(
+        "retire", help="Stop writing vectors for a shadow model."
+    )
+    retire.add_argument("model_id")
+
+    normalize = commands.add_parser(
+        "normalize",
+        help=(
+            "Rescale a model's stored vectors to unit length in place and "
+            "switch it to inner-product indexes."
+        ),
+    )
+    normalize.add_argument("model_id")
+    normalize.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Rows rewritten per transaction.",
+    )
+    return parser.parse_args()
+
+
+def _normalize_columns(
+    repository: ImageRepository, columns: Sequence[str], batch_size: int
+) -> None:
+    last_id = 0
+    while True:
+        page_end = repository.normalize_vectors(
+            columns, after_id=last_id, limit=batch_size
+        )
+        if page_end is None:
+            return
+        last_id = page_end
+        logger.info("Normalized %s up to id %d.", ", ".join(columns), last_id)
+
+
+def _normalize_model(
+    session: Session, model_id: str, *, batch_size: int, settings: Settings
+) -> int:
+    models = EmbeddingModelRepository(session)
+    record = models.get(model_id)
+    if record is None:
+        raise EmbeddingModelError(f"model {model_id!r} is not registered")
+    if record.inner_product:
+        raise EmbeddingModelError(
+            f"model {model_id!r} is already searched by inner product"
+        )
+    columns = (record.image_column, record.text_column)
+    images = ImageRepository(session)
+
+    # Writers switch to unit-length vectors first; searches stay on cosine
+    # distance, which ignores vector length, until every row is rescaled.
+    if not record.normalized:
+        models.mark_normalized(model_id)
+        print(
+            f"{model_id} now writes normalized vectors; waiting "
+            f"{settings.embedding_registry_refresh_seconds:g} seconds for "
+            "workers to switch."
+        )
+        time.sleep(settings.embedding_registry_refresh_seconds)
+    _normalize_columns(images, columns, batch_size)
+    index_options = {
+        "m": settings.hnsw_m,
+        "ef_construction": settings.hnsw_ef_construction,
+        "storage": settings.vector_storage,
+        "dimension": record.dimension,
+    }
+    statements = [
+        hnsw_index_statement(
+            "images", column, metric=METRIC_INNER_PRODUCT, **index_options
+        )
+        for column in columns
+    ]
+    created, skipped = create_indexes_concurrently(engine, statements)
+    # Rescale rows from ingests that encoded before the switch but committed
+    # after the first pass read them; no row is unnormalized after this.
+    _normalize_columns(images, columns, batch_size)
+    models.use_inner_product(model_id)
+    images.advance_index_epoch()
+
+    if created:
+        print(f"Created HNSW indexes: {', '.join(created)}.")
+    if skipped:
+        print(f"HNSW indexes already present: {', '.join(skipped)}.")
+    print(f"{model_id} is now searched by inner product.")
+    # Binary indexes use Hamming distance either way and are kept.
+    in_use = {name for name, _ in statements}
+    unused = [
+        name
+        for name, _ in (
+            hnsw_index_statement(
+                "images", column, metric=METRIC_COSINE, **index_options
+            )
+            for column in columns
+        )
+        if name not in in_use
+    ]
+    if unused:
+        print(
+            "The cosine indexes are no longer used; drop them to reclaim memory: "
+            + "; ".join(f"DROP INDEX CONCURRENTLY {name}" for name in unused)
+        )
+    return 0
+
+
+def main() -> int:
+    args = _parse_args()
+    logging.basicConfig(level=logging.INFO)
+    settings = get_settings()
+
+    session = SessionLocal()
+    try:
+        repository = EmbeddingModelRepository(session)
+        repository.ensure_default(
+            model_id=settings.embedding_model,
+            dimension=settings.embedding_dimension,
+        )
+        if args.command == "list":
+            for record in repository.list():
+                print(
+                    f"{record.id}\t{record.status}\tdim={record.dimension}\t"
+                    f"normalized={record.normalized}\t"
+                    f"inner_product={record.inner_product}\t"
+                    f"columns={record.image_column},{record.text_column}"
+                )
+            return 0
+        if args.command == "register":
+            record = repository.register(
+                model_id=args.model_id,
+                dimension=args.dimension,
+                normalized=args.normalized,
+            )
+            columns = (record.image_column, record.text_column)
+        elif args.command == "normalize":
+            if args.batch_size <= 0:
+                print("Error: --batch-size must be positive.", file=sys.stderr)
+                return 1
+            return _normalize_model(
+                session, args.model_id, batch_size=args.batch_size, settings=settings
+            )
+        elif args.command == "activate":
+            repository.activate(args.model_id, force=args.force)
+            print(
+                f"Activated {args.model_id}; API workers switch within "
+                f"{settings.embedding_registry_refresh_seconds:g} seconds."
+            )
+            return 0
+        else:
+            repository.retire(args.model_id)
+            print(f"Retired {args.model_id}; its columns were kept.")
+            return 0
+    except EmbeddingModelError as exc:
+        print(f"Error: {exc}.", file=sys.stderr)
+        return 1
+    finally:
+        session.close()
+
+    created, skipped = create_indexes_concurrently(
+        engine,
+        [
+            hnsw_index_statement(
+                "images",
+                column,
+                m=settings.hnsw_m,
+                ef_construction=settings.hnsw_ef_construction,
+                storage=settings.vector_storage,
+                dimension=record.dimension,
+                metric=index_metric(record.inner_product),
+            )
+            for column in columns
+        ],
+    )
+    print(
+        f"Registered {args.model_id} as a shadow model in columns "
+        f"{', '.join(columns)}."
+    )
+    if created:
+        print(f"Created HNSW indexes: {', '.join(created)}.")
+    if skipped:
+        print(f"HNSW indexes already present: {', '.join(skipped)}.")
+    print(
+        "Fill its columns with "
+        f"`python -m app.scripts.backfill_embeddings --model {args.model_id}`, "
+        "then activate it."
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,114 @@
+"""CLI utility to export CLIP to ONNX and verify it against PyTorch."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+from pathlib import Path
+from typing import List
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import get_settings
+from app.services.embedding_service import TorchClipBackend
+from app.services.onnx_clip import OnnxClipBackend, check_parity, export_clip_to_onnx
+
+_SAMPLE_TEXTS = [
+    "invoice total",
+    "a screenshot of an error dialog",
+    "quarterly revenue chart",
+    "handwritten meeting notes",
+    "shipping label with barcode",
+    "login page of a web application",
+]
+_IMAGE_SUFFIXES = {".png", ".jpg", ".jpeg", ".bmp", ".gif", ".webp"}
+
+
+def _parse_args() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description=(
+            "Export the CLIP text and vision towers to ONNX, optionally quantize "
+            "them to int8 and check cosine agreement with the PyTorch model."
+        )
+    )
+    parser.add_argument(
+        "--model-name",
+        default=settings.embedding_model,
+        help="SentenceTransformer CLIP model to export (EMBEDDING_MODEL).",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=Path(settings.onnx_model_dir),
+        help="Directory that will hold the exported models (ONNX_MODEL_DIR).",
+    )
+    parser.add_argument(
+        "--no-quantize",
+        action="store_true",
+        help="Only export full-precision models.",
+    )
+    parser.add_argument(
+        "--images",
+        type=Path,
+        help="Directory of sample images for the parity check; synthetic images are used otherwise.",
+    )
+    parser.add_argument(
+        "--min-cosine",
+        type=float,
+        default=0.99,
+        help="Fail when any sample's cosine similarity to PyTorch drops below this value.",
+    )
+    return parser.parse_args()
+
+
+def _sample_images(directory: Path | None, limit: int = 16) -> List[Image.Image]:
+    if directory is not None:
+        paths = sorted(
+            path for path in directory.iterdir() if path.suffix.lower() in _IMAGE_SUFFIXES
+        )[:limit]
+        return [Image.open(path).convert("RGB") for path in paths]
+    rng = np.random.default_rng(0)
+    return [
+        Image.fromarray(rng.integers(0, 256, size=(224, 224, 3), dtype=np.uint8))
+        for _ in range(limit)
+    ]
+
+
+def main() -> int:
+    args = _parse_args()
+    quantize = not args.no_quantize
+
+    print(f"Exporting {args.model_name} to {args.output_dir} ...")
+    export_clip_to_onnx(args.model_name, args.output_dir, quantize=quantize)
+
+    reference = TorchClipBackend(args.model_name)
+    images = _sample_images(args.images)
+    passed = True
+    variants = [False, True] if quantize else [False]
+    for quantized in variants:
+        candidate = OnnxClipBackend(args.output_dir, quantized=quantized)
+        for report in check_parity(
+            reference, candidate, texts=_SAMPLE_TEXTS, images=images
+        ):
+            ok = report.min_cosine >= args.min_cosine
+            passed = passed and ok
+            print(
+                f"[{candidate.name}] {report.modality}: {report.samples} samples, "
+                f"min cosine {report.min_cosine:.5f}, mean cosine {report.mean_cosine:.5f}"
+                f"{'' if ok else '  <-- below threshold'}"
+            )
+
+    if not passed:
+        print(
+            f"Error: parity below {args.min_cosine}; keep EMBEDDING_BACKEND=torch.",
+            file=sys.stderr,
+        )
+        return 1
+    print("Parity check passed. Set EMBEDDING_BACKEND=onnx to use the exported models.")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
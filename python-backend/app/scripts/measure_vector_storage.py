@@ -0,0 +1,161 @@
+"""CLI utility to compare recall, latency and index size of vector storage modes."""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from typing import List, Optional
+
+from sqlalchemy import text as sa_text
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.db.vector_indexes import (
+    METRIC_COSINE,
+    METRIC_INNER_PRODUCT,
+    STORAGE_FULL,
+    VECTOR_STORAGE_MODES,
+    hnsw_index_statement,
+)
+from app.repositories.images_repo import ImageRepository
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description=(
+            "Query stored image vectors against each HNSW storage mode and "
+            "report recall@k against an exact scan, mean latency and index size."
+        )
+    )
+    parser.add_argument(
+        "--column",
+        default="embedding",
+        help="images vector column to measure.",
+    )
+    parser.add_argument(
+        "--samples", type=int, default=100, help="Number of query vectors."
+    )
+    parser.add_argument("--k", type=int, default=10, help="Results per query.")
+    parser.add_argument(
+        "--oversample",
+        type=int,
+        default=4,
+        help="Candidates re-ranked per result in compact modes.",
+    )
+    parser.add_argument(
+        "--metric",
+        choices=(METRIC_COSINE, METRIC_INNER_PRODUCT),
+        default=METRIC_COSINE,
+        help="Index metric of the column (inner_product for normalized models).",
+    )
+    return parser.parse_args()
+
+
+def _nearest_ids(
+    repository: ImageRepository,
+    vector,
+    *,
+    column: str,
+    k: int,
+    storage: str,
+    oversample: int,
+    metric: str,
+) -> List[int]:
+    candidates = repository.hybrid_search(
+        vector,
+        k,
+        image_column=column,
+        text_column=column,
+        storage=storage,
+        oversample=oversample,
+        metric=metric,
+    )
+    ranked = sorted(
+        (distance, hit.id) for hit, distance, _ in candidates if distance is not None
+    )
+    return [image_id for _, image_id in ranked]
+
+
+def _index_size(session: Session, index_name: str) -> Optional[int]:
+    return session.execute(
+        sa_text("SELECT pg_relation_size(to_regclass(:name))"), {"name": index_name}
+    ).scalar()
+
+
+def main() -> int:
+    args = _parse_args()
+    if args.samples <= 0 or args.k <= 0:
+        print("Error: --samples and --k must be positive.", file=sys.stderr)
+        return 1
+
+    session = SessionLocal()
+    try:
+        repository = ImageRepository(session)
+        queries = repository.sample_vectors(args.column, args.samples)
+        if not queries:
+            print(f"Error: no stored vectors in images.{args.column}.", file=sys.stderr)
+            return 1
+        dimension = int(queries[0].shape[-1])
+
+        # Ground truth: the same query with index scans disabled is exact.
+        exact: List[set[int]] = []
+        for vector in queries:
+            session.execute(sa_text("SET LOCAL enable_indexscan = off"))
+            exact.append(
+                set(
+                    _nearest_ids(
+                        repository,
+                        vector,
+                        column=args.column,
+                        k=args.k,
+                        storage=STORAGE_FULL,
+                        oversample=1,
+                        metric=args.metric,
+                    )
+                )
+            )
+            session.rollback()
+
+        print(f"{len(queries)} queries, k={args.k}, images.{args.column} ({dimension} dims)")
+        print(f"{'mode':<10}{'recall@k':>10}{'mean ms':>10}{'index MB':>10}")
+        for storage in VECTOR_STORAGE_MODES:
+            index_name, _ = hnsw_index_statement(
+                "images",
+                args.column,
+                storage=storage,
+                dimension=dimension,
+                metric=args.metric,
+            )
+            size = _index_size(session, index_name)
+            if size is None:
+                print(f"{storage:<10}{'index ' + index_name + ' missing':>30}")
+                continue
+            found = 0
+            elapsed = 0.0
+            for vector, truth in zip(queries, exact):
+                started = time.perf_counter()
+                ids = _nearest_ids(
+                    repository,
+                    vector,
+                    column=args.column,
+                    k=args.k,
+                    storage=storage,
+                    oversample=args.oversample,
+                    metric=args.metric,
+                )
+                elapsed += time.perf_counter() - started
+                session.rollback()
+                found += len(truth.intersection(ids))
+            expected = sum(len(truth) for truth in exact) or 1
+            print(
+                f"{storage:<10}{found / expected:>10.3f}"
+                f"{1000 * elapsed / len(queries):>10.2f}{size / 2**20:>10.1f}"
+            )
+    finally:
+        session.close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
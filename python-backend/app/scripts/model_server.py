@@ -0,0 +1,56 @@
+"""CLI utility to run the shared model server for local API workers."""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+
+from app.core.config import get_settings
+from app.services.embedding_service import create_embedding_service
+from app.services.model_server import ModelServer, model_server_authkey
+from app.services.ocr_service import create_ocr_service
+
+
+def _parse_args() -> argparse.Namespace:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(
+        description=(
+            "Load CLIP and OCR once and serve them over a Unix socket so several "
+            "API worker processes can share one copy of the models."
+        )
+    )
+    parser.add_argument(
+        "--socket",
+        default=settings.model_server_socket,
+        help="Unix socket path; API workers must use the same MODEL_SERVER_SOCKET.",
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = _parse_args()
+    if not args.socket:
+        print("Error: pass --socket or set MODEL_SERVER_SOCKET.", file=sys.stderr)
+        return 1
+    logging.basicConfig(level=logging.INFO)
+
+    server = ModelServer(
+        args.socket,
+        authkey=model_server_authkey(get_settings()),
+        embedding_service=create_embedding_service(),
+        ocr_service=create_ocr_service(),
+        # Shadow models requested by the workers are loaded here on first use.
+        embedding_loader=lambda name, normalize: create_embedding_service(
+            name, normalize=normalize
+        ),
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,9 +1,17 @@
 """Service layer exports."""
 
 from .chat_completion_service import ChatCompletionService, get_chat_completion_service
+from .embedding_cache import EmbeddingCache
+from .embedding_registry import EmbeddingModelRegistry, get_embedding_registry
 from .embedding_service import EmbeddingService, get_embedding_service
-from .image_ingest_service import ImageIngestService, get_image_ingest_service
-from .ocr_service import OCRService, get_ocr_service
+from .image_ingest_service import (
+    BatchIngestResult,
+    ImageIngestService,
+    ImageUpload,
+    get_image_ingest_service,
+)
+from .model_lifecycle import ModelLifecycleManager, get_model_lifecycle
+from .ocr_service import OCRBackend, OCRProcessPool, OCRService, get_ocr_service
 from .retrieval_service import (
     RetrievalResult,
     RetrievalService,
@@ -13,10 +21,19 @@ from .retrieval_service import (
 __all__ = [
     "ChatCompletionService",
     "get_chat_completion_service",
+    "EmbeddingCache",
+    "EmbeddingModelRegistry",
+    "get_embedding_registry",
     "EmbeddingService",
     "get_embedding_service",
+    "BatchIngestResult",
     "ImageIngestService",
+    "ImageUpload",
     "get_image_ingest_service",
+    "ModelLifecycleManager",
+    "get_model_lifecycle",
+    "OCRBackend",
+    "OCRProcessPool",
     "OCRService",
     "get_ocr_service",
     "RetrievalResult",
@@ -0,0 +1,140 @@
+"""Two-tier cache for query text embeddings."""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """Cache text embeddings in memory and, optionally, in a shared SQLite file.
+
+    The memory tier keeps read-only ``float32`` arrays in LRU order and evicts
+    by total byte size rather than entry count. The disk tier is keyed by
+    ``(model name, text)`` so it survives restarts and deploys, and runs in WAL
+    mode so several uvicorn worker processes can share one file. Disk entries
+    beyond ``disk_max_entries`` are pruned oldest first.
+    """
+
+    _PRUNE_EVERY = 1000
+
+    def __init__(
+        self,
+        *,
+        model_name: str,
+        memory_bytes: int = 16 * 1024 * 1024,
+        disk_path: Optional[str] = None,
+        disk_max_entries: int = 1_000_000,
+    ) -> None:
+        self._model_name = model_name
+        self._memory_budget = max(0, memory_bytes)
+        self._memory: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+
+        self._disk_path = disk_path
+        self._disk_max_entries = disk_max_entries
+        self._local = threading.local()
+        self._puts_since_prune = 0
+        if disk_path:
+            self._connection().executescript(
+                """
+                CREATE TABLE IF NOT EXISTS text_embeddings (
+                    model TEXT NOT NULL,
+                    text TEXT NOT NULL,
+                    vector BLOB NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (model, text)
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS text_embeddings_created_at_idx
+                    ON text_embeddings (created_at);
+                """
+            )
+
+    @staticmethod
+    def normalize_key(text: str) -> str:
+        return " ".join(text.split())
+
+    def get(self, text: str) -> Optional[np.ndarray]:
+        key = self.normalize_key(text)
+        with self._lock:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                return vector
+
+        if not self._disk_path:
+            return None
+        row = self._connection().execute(
+            "SELECT vector FROM text_embeddings WHERE model = ? AND text = ?",
+            (self._model_name, key),
+        ).fetchone()
+        if row is None:
+            return None
+        vector = np.frombuffer(row[0], dtype=np.float32)
+        self._remember(key, vector)
+        return vector
+
+    def put(self, text: str, vector: np.ndarray) -> np.ndarray:
+        """Store ``vector`` for ``text`` and return the cached read-only copy."""
+
+        key = self.normalize_key(text)
+        cached = np.ascontiguousarray(vector, dtype=np.float32)
+        cached.setflags(write=False)
+        self._remember(key, cached)
+
+        if self._disk_path:
+            connection = self._connection()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO text_embeddings (model, text, vector, created_at) "
+                    "VALUES (?, ?, ?, ?)",
+                    (self._model_name, key, cached.tobytes(), time.time()),
+                )
+            self._maybe_prune(connection)
+        return cached
+
+    def _remember(self, key: str, vector: np.ndarray) -> None:
+        if vector.nbytes > self._memory_budget:
+            return
+        with self._lock:
+            previous = self._memory.pop(key, None)
+            if previous is not None:
+                self._memory_used -= previous.nbytes
+            self._memory[key] = vector
+            self._memory_used += vector.nbytes
+            while self._memory_used > self._memory_budget:
+                _, evicted = self._memory.popitem(last=False)
+                self._memory_used -= evicted.nbytes
+
+    def _maybe_prune(self, connection: sqlite3.Connection) -> None:
+        with self._lock:
+            self._puts_since_prune += 1
+            if self._puts_since_prune < self._PRUNE_EVERY:
+                return
+            self._puts_since_prune = 0
+        with connection:
+            connection.execute(
+                "DELETE FROM text_embeddings WHERE created_at <= ("
+                "SELECT created_at FROM text_embeddings ORDER BY created_at DESC "
+                "LIMIT 1 OFFSET ?)",
+                (self._disk_max_entries,),
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across threads; keep one each.
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self._disk_path, timeout=5.0)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+
+__all__ = ["EmbeddingCache"]
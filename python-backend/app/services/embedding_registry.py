@@ -0,0 +1,230 @@
+"""Cached view of the embedding model registry used by ingest and search."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.repositories.embedding_models_repo import (
+    DEFAULT_IMAGE_COLUMN,
+    DEFAULT_TEXT_COLUMN,
+    MODEL_ACTIVE,
+    MODEL_SHADOW,
+    EmbeddingModelRepository,
+)
+from app.services.embedding_service import (
+    EmbeddingService,
+    get_embedding_service_for,
+    register_embedding_model,
+)
+
+logger = logging.getLogger(__name__)
+
+# Vectors of one image keyed by the ``images`` column they belong in.
+ImageVectors = Dict[str, Optional[np.ndarray]]
+
+
+@dataclass(frozen=True, slots=True)
+class EmbeddingModelSpec:
+    """Immutable snapshot of one registry row."""
+
+    model_id: str
+    dimension: int
+    normalized: bool
+    inner_product: bool
+    image_column: str
+    text_column: str
+    status: str
+
+
+@dataclass(frozen=True, slots=True)
+class ModelEncoder:
+    """A registry model paired with the service that produces its vectors."""
+
+    spec: EmbeddingModelSpec
+    service: EmbeddingService
+
+
+class EmbeddingModelRegistry:
+    """Serve registry lookups from a snapshot refreshed every few seconds.
+
+    Each snapshot is internally consistent, so a query always encodes with
+    the model whose columns it searches; after a cutover every worker moves
+    to the new active model on its next refresh while the previous model's
+    columns keep serving in the meantime.
+    """
+
+    def __init__(
+        self,
+        *,
+        default_model: str,
+        default_dimension: int,
+        session_factory: Callable[[], Session] = SessionLocal,
+        refresh_seconds: float = 30.0,
+    ) -> None:
+        self._default = EmbeddingModelSpec(
+            model_id=default_model,
+            dimension=default_dimension,
+            normalized=False,
+            inner_product=False,
+            image_column=DEFAULT_IMAGE_COLUMN,
+            text_column=DEFAULT_TEXT_COLUMN,
+            status=MODEL_ACTIVE,
+        )
+        self._session_factory = session_factory
+        self._refresh_seconds = max(0.0, refresh_seconds)
+        self._lock = threading.Lock()
+        self._models: Optional[Tuple[EmbeddingModelSpec, ...]] = None
+        self._loaded_at = 0.0
+
+    def models(self) -> Tuple[EmbeddingModelSpec, ...]:
+        with self._lock:
+            stale = time.monotonic() - self._loaded_at >= self._refresh_seconds
+            if self._models is None or stale:
+                self._models = self._load(self._models)
+                self._loaded_at = time.monotonic()
+            return self._models
+
+    def refresh(self) -> None:
+        with self._lock:
+            self._loaded_at = 0.0
+
+    def active(self) -> EmbeddingModelSpec:
+        for spec in self.models():
+            if spec.status == MODEL_ACTIVE:
+                return spec
+        return self._default
+
+    def write_models(self) -> Tuple[EmbeddingModelSpec, ...]:
+        """Return the active model followed by every shadow model."""
+
+        active = self.active()
+        shadows = tuple(spec for spec in self.models() if spec.status == MODEL_SHADOW)
+        return (active, *shadows)
+
+    def register_write_models(self) -> None:
+        """Register every written model so the background warm-up loads it."""
+
+        for spec in self.write_models():
+            register_embedding_model(spec.model_id, normalize=spec.normalized)
+
+    def active_encoder(self) -> ModelEncoder:
+        return _encoder(self.active())
+
+    def write_encoders(self) -> List[ModelEncoder]:
+        return [_encoder(spec) for spec in self.write_models()]
+
+    def _load(
+        self, previous: Optional[Tuple[EmbeddingModelSpec, ...]]
+    ) -> Tuple[EmbeddingModelSpec, ...]:
+        session = self._session_factory()
+        try:
+            records = EmbeddingModelRepository(session).list()
+        except Exception:
+            logger.exception("Could not load the embedding model registry.")
+            return previous if previous is not None else (self._default,)
+        finally:
+            session.close()
+        if not records:
+            return (self._default,)
+        return tuple(
+            EmbeddingModelSpec(
+                model_id=record.id,
+                dimension=record.dimension,
+                normalized=record.normalized,
+                inner_product=record.inner_product,
+                image_column=record.image_column,
+                text_column=record.text_column,
+                status=record.status,
+            )
+            for record in records
+        )
+
+
+def _encoder(spec: EmbeddingModelSpec) -> ModelEncoder:
+    return ModelEncoder(
+        spec=spec,
+        service=get_embedding_service_for(spec.model_id, normalize=spec.normalized),
+    )
+
+
+def encoder_columns(encoders: Sequence[ModelEncoder]) -> List[str]:
+    """Return every ``images`` column written by ``encoders``."""
+
+    return [
+        column
+        for encoder in encoders
+        for column in (encoder.spec.image_column, encoder.spec.text_column)
+    ]
+
+
+def encode_image_columns(
+    encoders: Sequence[ModelEncoder], image: Image.Image
+) -> ImageVectors:
+    return {
+        encoder.spec.image_column: encoder.service.encode_image(image)
+        for encoder in encoders
+    }
+
+
+def encode_text_columns(
+    encoders: Sequence[ModelEncoder], text: Optional[str]
+) -> ImageVectors:
+    return {
+        encoder.spec.text_column: encoder.service.encode_text(text) if text else None
+        for encoder in encoders
+    }
+
+
+def encode_batch_columns(
+    encoders: Sequence[ModelEncoder],
+    images: Sequence[Image.Image],
+    texts: Sequence[Optional[str]],
+) -> List[ImageVectors]:
+    """Encode a batch for every model with one forward pass per model and modality."""
+
+    rows: List[ImageVectors] = [{} for _ in images]
+    present = [index for index, text in enumerate(texts) if text]
+    for encoder in encoders:
+        image_vectors = encoder.service.encode_images(images)
+        text_vectors = encoder.service.encode_texts([texts[i] for i in present])
+        for row, vector in zip(rows, image_vectors):
+            row[encoder.spec.image_column] = vector
+        for row in rows:
+            row[encoder.spec.text_column] = None
+        for index, vector in zip(present, text_vectors):
+            rows[index][encoder.spec.text_column] = vector
+    return rows
+
+
+@lru_cache
+def get_embedding_registry() -> EmbeddingModelRegistry:
+    settings = get_settings()
+    return EmbeddingModelRegistry(
+        default_model=settings.embedding_model,
+        default_dimension=settings.embedding_dimension,
+        refresh_seconds=settings.embedding_registry_refresh_seconds,
+    )
+
+
+__all__ = [
+    "EmbeddingModelRegistry",
+    "EmbeddingModelSpec",
+    "ImageVectors",
+    "ModelEncoder",
+    "encode_batch_columns",
+    "encode_image_columns",
+    "encode_text_columns",
+    "encoder_columns",
+    "get_embedding_registry",
+]
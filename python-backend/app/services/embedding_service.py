@@ -2,46 +2,320 @@
 
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import List, Tuple
+from functools import partial
+from typing import TYPE_CHECKING, List, Optional, Protocol, Sequence
 
+import numpy as np
 from PIL import Image
-from sentence_transformers import SentenceTransformer
 
+from app.core.config import get_settings
+from app.services.embedding_cache import EmbeddingCache
+from app.services.micro_batcher import MicroBatcher
+from app.services.model_lifecycle import get_model_lifecycle
+from app.utils.vectors import as_float32, l2_normalize
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+EMBEDDING_BACKEND_TORCH = "torch"
+EMBEDDING_BACKEND_ONNX = "onnx"
+
+
+class ClipBackend(Protocol):
+    """Inference backend producing CLIP embeddings as ``float32`` matrices."""
+
+    name: str
+
+    def encode_images(self, images: Sequence[Image.Image]) -> np.ndarray:
+        ...
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        ...
+
+
+class TorchClipBackend:
+    """Full-precision PyTorch inference through SentenceTransformers."""
+
+    name = EMBEDDING_BACKEND_TORCH
+
+    def __init__(self, model_name: str) -> None:
+        # Imported here so that importing the app does not pull in torch.
+        from sentence_transformers import SentenceTransformer
 
-class EmbeddingService:
-    def __init__(self, model_name: str = "clip-ViT-B-32") -> None:
         self._model = SentenceTransformer(model_name)
-        # Lazily initialised cache for text encodings. Using a tuple keeps
-        # the cached values hashable for ``functools.lru_cache``.
-        self._encode_text_cached = lru_cache(maxsize=256)(self._encode_text_impl)
 
-    def encode_image(self, image: Image.Image) -> List[float]:
-        return self._model.encode([image], convert_to_tensor=False)[0].tolist()
+    @property
+    def model(self) -> "SentenceTransformer":
+        return self._model
+
+    def encode_images(self, images: Sequence[Image.Image]) -> np.ndarray:
+        return np.asarray(
+            self._model.encode(list(images), convert_to_tensor=False), dtype=np.float32
+        )
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        return np.asarray(
+            self._model.encode(list(texts), convert_to_tensor=False), dtype=np.float32
+        )
+
 
-    def encode_text(self, text: str) -> List[float]:
+class EmbeddingService:
+    def __init__(
+        self,
+        model_name: str = "clip-ViT-B-32",
+        *,
+        backend: Optional[ClipBackend] = None,
+        micro_batching: bool = False,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        cache: Optional[EmbeddingCache] = None,
+        normalize: bool = False,
+    ) -> None:
+        self._backend = backend or TorchClipBackend(model_name)
+        # Registry models may store unit-length vectors; every output is then
+        # L2-normalised, including cached query vectors.
+        self._normalize = normalize
+        # Query encodings are cached as float32 arrays in memory and, when a
+        # cache path is configured, in a SQLite file shared across workers.
+        self._text_cache = cache or EmbeddingCache(
+            model_name=_cache_namespace(model_name, self._backend, normalize)
+        )
+        # Cache misses from concurrent requests are coalesced into one forward
+        # pass when micro-batching is enabled.
+        self._text_batcher: Optional[MicroBatcher[str, np.ndarray]] = (
+            MicroBatcher(
+                self._encode_text_batch,
+                max_batch_size=max_batch_size,
+                max_wait_ms=max_wait_ms,
+                name="text-embedding-batcher",
+            )
+            if micro_batching
+            else None
+        )
+
+    def encode_image(self, image: Image.Image) -> np.ndarray:
+        return self.encode_images([image])[0]
+
+    def encode_images(self, images: Sequence[Image.Image]) -> np.ndarray:
+        """Return one ``float32`` row per image using a single forward pass."""
+
+        if not images:
+            return _EMPTY_MATRIX
+        # Rows of a contiguous matrix are contiguous too, so callers can hand
+        # them to pgvector or COPY without another copy.
+        return self._finish(self._backend.encode_images(images))
+
+    def encode_text(self, text: str) -> np.ndarray:
         """Return the embedding vector for ``text``.
 
         The method applies lightweight caching so repeated queries avoid
         recomputing embeddings, significantly reducing latency for popular
         prompts. Empty or whitespace-only inputs are rejected to prevent
-        unnecessary model calls.
+        unnecessary model calls. The returned array is shared with the cache
+        and therefore read-only.
         """
 
         normalized = text.strip()
         if not normalized:
             raise ValueError("text must not be empty")
-        return list(self._encode_text_cached(normalized))
+        vector = self._text_cache.get(normalized)
+        if vector is None:
+            vector = self._text_cache.put(normalized, self._encode_text_impl(normalized))
+        return vector
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """Return embedding vectors for ``texts`` using a single forward pass.
+
+        Unlike :meth:`encode_text` the batch path bypasses the query cache since
+        it is meant for ingest workloads where texts rarely repeat.
+        """
+
+        normalized = [text.strip() for text in texts]
+        if any(not text for text in normalized):
+            raise ValueError("text must not be empty")
+        if not normalized:
+            return _EMPTY_MATRIX
+        return self._finish(self._backend.encode_texts(normalized))
+
+    def _encode_text_impl(self, text: str) -> np.ndarray:
+        if self._text_batcher is not None:
+            return self._finish(self._text_batcher(text))
+        return self._finish(self._backend.encode_texts([text])[0])
+
+    def _finish(self, vectors: np.ndarray) -> np.ndarray:
+        return l2_normalize(vectors) if self._normalize else as_float32(vectors)
+
+    def _encode_text_batch(self, texts: List[str]) -> List[np.ndarray]:
+        # Identical concurrent queries are encoded once.
+        unique_texts = list(dict.fromkeys(texts))
+        vectors = self._backend.encode_texts(unique_texts)
+        encoded = dict(zip(unique_texts, vectors))
+        return [encoded[text] for text in texts]
+
+
+_EMPTY_MATRIX = np.empty((0, 0), dtype=np.float32)
+_EMPTY_MATRIX.setflags(write=False)
 
-    def _encode_text_impl(self, text: str) -> Tuple[float, ...]:
-        return tuple(
-            self._model.encode([text], convert_to_tensor=False)[0].tolist()
+
+def _cache_namespace(
+    model_name: str, backend: ClipBackend, normalize: bool = False
+) -> str:
+    # Quantized or exported backends drift slightly from PyTorch, so cached
+    # vectors are never shared between backends.
+    namespace = f"{model_name}:{backend.name}"
+    return f"{namespace}:l2" if normalize else namespace
+
+
+def _create_backend(model_name: str) -> ClipBackend:
+    settings = get_settings()
+    # The exported ONNX towers belong to the configured model only.
+    if (
+        settings.embedding_backend == EMBEDDING_BACKEND_ONNX
+        and model_name == settings.embedding_model
+    ):
+        from app.services.onnx_clip import OnnxClipBackend
+
+        return OnnxClipBackend(
+            settings.onnx_model_dir, quantized=settings.onnx_quantized
+        )
+    if settings.embedding_backend != EMBEDDING_BACKEND_TORCH:
+        raise RuntimeError(f"Unknown EMBEDDING_BACKEND {settings.embedding_backend!r}")
+    return TorchClipBackend(model_name)
+
+
+MODEL_EMBEDDING = "embedding"
+
+
+def create_embedding_service(
+    model_name: Optional[str] = None, *, normalize: bool = False
+) -> EmbeddingService:
+    """Build an in-process service for ``model_name`` (``EMBEDDING_MODEL`` by default)."""
+
+    settings = get_settings()
+    model_name = model_name or settings.embedding_model
+    backend = _create_backend(model_name)
+    return EmbeddingService(
+        model_name,
+        backend=backend,
+        normalize=normalize,
+        cache=EmbeddingCache(
+            model_name=_cache_namespace(model_name, backend, normalize),
+            memory_bytes=settings.embedding_cache_memory_bytes,
+            disk_path=settings.embedding_cache_path,
+        ),
+        micro_batching=settings.embedding_micro_batching,
+        max_batch_size=settings.embedding_batch_max_size,
+        max_wait_ms=settings.embedding_batch_max_wait_ms,
+    )
+
+
+def _load_embedding_service(
+    model_name: Optional[str] = None, normalize: bool = False
+) -> EmbeddingService:
+    settings = get_settings()
+    if settings.model_server_socket:
+        from app.services.model_server import (
+            ModelServerClient,
+            RemoteEmbeddingService,
+            model_server_authkey,
+        )
+
+        model = (model_name, normalize) if model_name is not None else None
+        return RemoteEmbeddingService(
+            ModelServerClient(
+                settings.model_server_socket, authkey=model_server_authkey(settings)
+            ),
+            model,
         )
+    return create_embedding_service(model_name, normalize=normalize)
+
+
+def _warm_up_embedding_service(service: EmbeddingService) -> None:
+    # The batch methods bypass the query cache, so the model really runs.
+    service.encode_texts(["warm up"])
+    service.encode_images([Image.new("RGB", (224, 224))])
+
+
+get_model_lifecycle().register(
+    MODEL_EMBEDDING, _load_embedding_service, warmup=_warm_up_embedding_service
+)
 
 
-@lru_cache
 def get_embedding_service() -> EmbeddingService:
-    return EmbeddingService()
+    """Return the shared service, loading the CLIP model on first use."""
+
+    return get_model_lifecycle().get(MODEL_EMBEDDING)
+
+
+class _UnitLengthEmbeddingService:
+    """Scale the shared service's vectors to unit length.
+
+    Lets a normalized registry entry for ``EMBEDDING_MODEL`` reuse the loaded
+    model (or the model server) instead of loading a second copy.
+    """
+
+    def encode_image(self, image: Image.Image) -> np.ndarray:
+        return l2_normalize(get_embedding_service().encode_image(image))
+
+    def encode_images(self, images: Sequence[Image.Image]) -> np.ndarray:
+        return l2_normalize(get_embedding_service().encode_images(images))
+
+    def encode_text(self, text: str) -> np.ndarray:
+        return l2_normalize(get_embedding_service().encode_text(text))
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        return l2_normalize(get_embedding_service().encode_texts(texts))
+
+
+_UNIT_LENGTH_SERVICE = _UnitLengthEmbeddingService()
+
+
+def register_embedding_model(model_name: str, *, normalize: bool = False) -> str:
+    """Register a registry model with the lifecycle manager; return its name.
+
+    Registered models load on first use like the configured one, through the
+    model server when ``MODEL_SERVER_SOCKET`` is set, are reported by
+    ``/api/ready`` and are loaded by the background warm-up.
+    """
+
+    if model_name == get_settings().embedding_model:
+        # Served by the configured model, scaled to unit length if needed.
+        return MODEL_EMBEDDING
+    name = f"{MODEL_EMBEDDING}:{model_name}{':l2' if normalize else ''}"
+    get_model_lifecycle().register(
+        name,
+        partial(_load_embedding_service, model_name, normalize),
+        warmup=_warm_up_embedding_service,
+    )
+    return name
+
+
+def get_embedding_service_for(
+    model_name: str, *, normalize: bool = False
+) -> EmbeddingService:
+    """Return the service encoding for a registry model.
+
+    The configured ``EMBEDDING_MODEL`` resolves to :func:`get_embedding_service`;
+    other models go through :func:`register_embedding_model`.
+    """
+
+    if model_name == get_settings().embedding_model:
+        return _UNIT_LENGTH_SERVICE if normalize else get_embedding_service()
+    return get_model_lifecycle().get(
+        register_embedding_model(model_name, normalize=normalize)
+    )
 
 
-__all__ = ["EmbeddingService", "get_embedding_service"]
+__all__ = [
+    "ClipBackend",
+    "EMBEDDING_BACKEND_ONNX",
+    "EMBEDDING_BACKEND_TORCH",
+    "EmbeddingService",
+    "MODEL_EMBEDDING",
+    "TorchClipBackend",
+    "create_embedding_service",
+    "get_embedding_service",
+    "get_embedding_service_for",
+    "register_embedding_model",
+]
@@ -2,35 +2,150 @@
 
 from __future__ import annotations
 
+import logging
 import uuid
+from concurrent.futures import Executor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
 from functools import lru_cache
 from io import BytesIO
-from typing import Optional
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Callable, Dict, List, Optional, Sequence
 
 from PIL import Image
 from sqlalchemy.orm import Session
 
+from app.core.config import get_settings
 from app.models.images import ImageMetadata
-from app.repositories.images_repo import ImageRepository
-from app.services.embedding_service import (
-    EmbeddingService,
-    get_embedding_service,
+from app.repositories.images_repo import ImageRepository, NewImage
+from app.services.embedding_registry import (
+    EmbeddingModelRegistry,
+    ImageVectors,
+    ModelEncoder,
+    encode_batch_columns,
+    encode_image_columns,
+    encode_text_columns,
+    encoder_columns,
+    get_embedding_registry,
 )
-from app.services.ocr_service import OCRService, get_ocr_service
-from app.utils.hashing import sha256_hash
+from app.services.ocr_service import OCRBackend, get_ocr_service
+from app.services.vector_index import VectorIndex, get_vector_index
+from app.utils.hashing import sha256_hash, sha256_stream
+from app.utils.perceptual_hash import dhash, from_signed64, hamming_distance
 from app.utils.storage import MinioStorageClient, get_storage_client
 
 
+logger = logging.getLogger(__name__)
+
+StageCallback = Callable[[str], None]
+
+STAGE_DECODING = "decoding"
+STAGE_EMBEDDING = "embedding"
+STAGE_OCR = "ocr"
+STAGE_TEXT_EMBEDDING = "text_embedding"
+STAGE_SAVING = "saving"
+
+PROCESSING_STAGES = (
+    STAGE_DECODING,
+    STAGE_EMBEDDING,
+    STAGE_OCR,
+    STAGE_TEXT_EMBEDDING,
+    STAGE_SAVING,
+)
+
+
+def _ignore_stage(stage: str) -> None:
+    return None
+
+
+def _link_target(near_duplicate: Optional[ImageMetadata]) -> Optional[int]:
+    """Return the id a near-duplicate should link to, following existing links."""
+
+    if near_duplicate is None:
+        return None
+    return near_duplicate.near_duplicate_of_id or near_duplicate.id
+
+
+def _covers_encoders(
+    original: ImageMetadata,
+    encoders: Sequence[ModelEncoder],
+    vectors: ImageVectors,
+) -> bool:
+    # A shadow model may not be backfilled for ``original`` yet; its text
+    # vectors are legitimately missing only when OCR found no text.
+    return all(
+        vectors.get(encoder.spec.image_column) is not None
+        and (not original.text or vectors.get(encoder.spec.text_column) is not None)
+        for encoder in encoders
+    )
+
+
+def _decode_image(stream: BinaryIO) -> Image.Image:
+    with Image.open(stream) as source:
+        return source.convert("RGB")
+
+
+@dataclass(slots=True)
+class ImageUpload:
+    """Raw upload payload handed to :meth:`ImageIngestService.ingest_batch`."""
+
+    data: bytes
+    filename: str
+    content_type: Optional[str]
+
+
+@dataclass(slots=True)
+class BatchIngestResult:
+    """Outcome of ingesting a single file as part of a batch."""
+
+    filename: str
+    metadata: Optional[ImageMetadata] = None
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class _PreparedImage:
+    index: int
+    upload: ImageUpload
+    image: Image.Image
+    hash_value: str
+    phash: int
+    near_duplicate: Optional[ImageMetadata] = None
+    url: str = ""
+    text: Optional[str] = None
+    vectors: ImageVectors = field(default_factory=dict)
+
+
 class ImageIngestService:
     def __init__(
         self,
         storage_client: MinioStorageClient,
-        embedding_service: EmbeddingService,
-        ocr_service: OCRService,
+        registry: EmbeddingModelRegistry,
+        ocr_service: OCRBackend,
+        *,
+        spool_max_bytes: int = 8 * 1024 * 1024,
+        stage_executor: Optional[Executor] = None,
+        near_duplicate_max_distance: int = -1,
+        near_duplicate_reuse_distance: int = -1,
+        vector_index: Optional[VectorIndex] = None,
     ) -> None:
         self._storage_client = storage_client
-        self._embedding_service = embedding_service
+        # Vectors are written for the active model and every shadow model in
+        # the registry, each into its own columns.
+        self._registry = registry
         self._ocr_service = ocr_service
+        self._spool_max_bytes = spool_max_bytes
+        # When set, independent ingest stages (object upload, CLIP, OCR) run
+        # concurrently so latency approaches that of the slowest stage.
+        self._stage_executor = stage_executor
+        # Maximum dHash Hamming distance treated as a near-duplicate; negative
+        # values disable the lookup.
+        self._near_duplicate_max_distance = near_duplicate_max_distance
+        # Near-duplicates within this tighter distance are treated as the same
+        # picture re-encoded and copy the original's vectors and OCR text
+        # instead of running CLIP and OCR; negative values always recompute.
+        self._near_duplicate_reuse_distance = near_duplicate_reuse_distance
+        # In-process vector indexes get the rows of every committed ingest.
+        self._vector_index = vector_index
 
     def ingest(
         self,
@@ -40,39 +155,468 @@ class ImageIngestService:
         filename: str,
         content_type: Optional[str],
     ) -> ImageMetadata:
+        hash_value = sha256_hash(data)
+        existing = self.find_duplicate(db=db, hash_value=hash_value)
+        if existing is not None:
+            return existing
+        if self._stage_executor is None:
+            url = self.store(data=data, filename=filename, content_type=content_type)
+            return self.process(db=db, url=url, data=data, hash_value=hash_value)
+
+        # Upload while the image is decoded and encoded; only the row insert
+        # has to wait for the object URL.
+        upload = self._stage_executor.submit(
+            self.store, data=data, filename=filename, content_type=content_type
+        )
+        try:
+            image = Image.open(BytesIO(data)).convert("RGB")
+        except Exception:
+            wait([upload])
+            raise
+        return self._process_image(
+            db=db,
+            resolve_url=upload.result,
+            image=image,
+            hash_value=hash_value,
+            notify=_ignore_stage,
+        )
+
+    def find_duplicate(self, *, db: Session, hash_value: str) -> Optional[ImageMetadata]:
+        """Return an already ingested image with identical content, if any.
+
+        Identical uploads reuse the stored object, embeddings and OCR output of
+        the first copy instead of repeating every ingest stage.
+        """
+
+        return ImageRepository(db).get_by_hash(hash_value)
+
+    def store(
+        self,
+        *,
+        data: bytes,
+        filename: str,
+        content_type: Optional[str],
+    ) -> str:
+        """Upload the raw bytes to object storage and return their URL."""
+
         object_name = f"{uuid.uuid4()}_{filename}"
-        url = self._storage_client.upload_file(object_name, data, content_type)
+        return self._storage_client.upload_file(object_name, data, content_type)
+
+    def fetch(self, url: str) -> bytes:
+        """Download bytes previously written by :meth:`store`."""
+
+        return self._storage_client.download_file(
+            self._storage_client.object_name_from_url(url)
+        )
+
+    def discard(self, url: str) -> None:
+        """Delete an object stored by :meth:`store` that will not be ingested."""
+
+        self._storage_client.delete_file(
+            self._storage_client.object_name_from_url(url)
+        )
+
+    def process(
+        self,
+        *,
+        db: Session,
+        url: str,
+        data: bytes,
+        hash_value: Optional[str] = None,
+        on_stage: Optional[StageCallback] = None,
+    ) -> ImageMetadata:
+        """Run the embedding and OCR stages for stored bytes and persist them.
 
+        ``on_stage`` is invoked with the name of each stage as it starts so
+        background jobs can report progress.
+        """
+
+        notify = on_stage or _ignore_stage
+
+        notify(STAGE_DECODING)
         image = Image.open(BytesIO(data)).convert("RGB")
+        if hash_value is None:
+            hash_value = sha256_hash(data)
+        return self._process_image(
+            db=db,
+            resolve_url=lambda: url,
+            image=image,
+            hash_value=hash_value,
+            notify=notify,
+        )
+
+    def ingest_stream(
+        self,
+        *,
+        db: Session,
+        stream: BinaryIO,
+        filename: str,
+        content_type: Optional[str],
+    ) -> ImageMetadata:
+        """Ingest an upload without materialising it as a single ``bytes`` object.
+
+        The stream is hashed chunk by chunk while it is copied into a spooled
+        temporary file, uploaded to MinIO as a multipart object of unknown
+        length and decoded straight from the spool, so peak memory stays bounded
+        by the spool threshold and the decoded pixels.
+        """
+
+        with SpooledTemporaryFile(max_size=self._spool_max_bytes) as spool:
+            hash_value = sha256_stream(stream, sink=spool)
+            existing = self.find_duplicate(db=db, hash_value=hash_value)
+            if existing is not None:
+                return existing
+
+            object_name = f"{uuid.uuid4()}_{filename}"
+            if self._stage_executor is None:
+                spool.seek(0)
+                url = self._storage_client.upload_stream(
+                    object_name, spool, content_type
+                )
+                spool.seek(0)
+                image = _decode_image(spool)
+                return self._process_image(
+                    db=db,
+                    resolve_url=lambda: url,
+                    image=image,
+                    hash_value=hash_value,
+                    notify=_ignore_stage,
+                )
+
+            # Decode first so the spool is free to be streamed to MinIO while
+            # the model stages run.
+            spool.seek(0)
+            image = _decode_image(spool)
+            spool.seek(0)
+            upload = self._stage_executor.submit(
+                self._storage_client.upload_stream, object_name, spool, content_type
+            )
+            try:
+                return self._process_image(
+                    db=db,
+                    resolve_url=upload.result,
+                    image=image,
+                    hash_value=hash_value,
+                    notify=_ignore_stage,
+                )
+            finally:
+                wait([upload])
+
+    def _process_image(
+        self,
+        *,
+        db: Session,
+        resolve_url: Callable[[], str],
+        image: Image.Image,
+        hash_value: str,
+        notify: StageCallback,
+    ) -> ImageMetadata:
         width, height = image.size
-        hash_value = sha256_hash(data)
+        repository = ImageRepository(db)
 
-        embedding_vector = self._embedding_service.encode_image(image)
-        text = self._ocr_service.extract_text(image)
-        text_embedding = (
-            self._embedding_service.encode_text(text) if text else None
+        phash = dhash(image)
+        near_duplicate = repository.find_near_duplicate(
+            phash, self._near_duplicate_max_distance
         )
+        # A likely re-encoded or resized copy is linked to the original. Its
+        # own vectors and OCR text are still computed unless it is within the
+        # reuse distance: images that merely share a layout (blank forms,
+        # slides) can hash within a few bits.
+        near_duplicate_of_id = _link_target(near_duplicate)
+        encoders = self._registry.write_encoders()
+        reusable = self._reusable_vectors(repository, encoders, [(phash, near_duplicate)])
+        if near_duplicate is not None and near_duplicate.id in reusable:
+            vectors = reusable[near_duplicate.id]
+            text = near_duplicate.text
+        elif self._stage_executor is None:
+            notify(STAGE_EMBEDDING)
+            vectors = encode_image_columns(encoders, image)
+            notify(STAGE_OCR)
+            text = self._ocr_service.extract_text(image)
+            notify(STAGE_TEXT_EMBEDDING)
+            vectors.update(encode_text_columns(encoders, text))
+        else:
+            # The visual embedding and OCR are independent; run CLIP on the
+            # stage pool while OCR and the OCR-text embedding run here.
+            notify(STAGE_EMBEDDING)
+            image_vectors = self._stage_executor.submit(
+                encode_image_columns, encoders, image
+            )
+            try:
+                notify(STAGE_OCR)
+                text = self._ocr_service.extract_text(image)
+                notify(STAGE_TEXT_EMBEDDING)
+                text_vectors = encode_text_columns(encoders, text)
+            finally:
+                wait([image_vectors])
+            vectors = {**image_vectors.result(), **text_vectors}
 
-        repository = ImageRepository(db)
+        url = resolve_url()
+
+        notify(STAGE_SAVING)
         metadata = repository.create(
             url=url,
             hash_value=hash_value,
             width=width,
             height=height,
-            embedding=embedding_vector,
+            vectors=vectors,
             text=text,
-            text_embedding=text_embedding,
+            phash=phash,
+            near_duplicate_of_id=near_duplicate_of_id,
         )
+        self._add_to_vector_index([metadata.id])
         return metadata
 
+    def ingest_batch(
+        self,
+        *,
+        db: Session,
+        uploads: Sequence[ImageUpload],
+    ) -> List[BatchIngestResult]:
+        """Ingest ``uploads`` with one model pass per stage and a single commit.
+
+        Files that cannot be decoded, stored, OCR'd or embedded are reported
+        individually, with their stored object deleted, and do not prevent the
+        remaining images from being persisted. Files whose content was already
+        ingested, or that repeat earlier in the same batch, reuse the existing
+        record.
+        """
+
+        results = [BatchIngestResult(filename=upload.filename) for upload in uploads]
+        hashes = [sha256_hash(upload.data) for upload in uploads]
+        repository = ImageRepository(db)
+        existing = repository.get_by_hashes(hashes)
+
+        prepared: List[_PreparedImage] = []
+        first_index_by_hash: Dict[str, int] = {}
+        repeats: List[tuple[int, int]] = []
+        for index, (upload, hash_value) in enumerate(zip(uploads, hashes)):
+            if hash_value in existing:
+                results[index].metadata = existing[hash_value]
+                continue
+            if hash_value in first_index_by_hash:
+                repeats.append((index, first_index_by_hash[hash_value]))
+                continue
+            try:
+                image = Image.open(BytesIO(upload.data)).convert("RGB")
+            except Exception:
+                results[index].error = "file is not a valid image"
+                continue
+            first_index_by_hash[hash_value] = index
+            prepared.append(
+                _PreparedImage(
+                    index=index,
+                    upload=upload,
+                    image=image,
+                    hash_value=hash_value,
+                    phash=dhash(image),
+                )
+            )
+        near_duplicates = repository.find_near_duplicates(
+            [item.phash for item in prepared], self._near_duplicate_max_distance
+        )
+        for item, near_duplicate in zip(prepared, near_duplicates):
+            item.near_duplicate = near_duplicate
+
+        stored: List[_PreparedImage] = []
+        for item in prepared:
+            object_name = f"{uuid.uuid4()}_{item.upload.filename}"
+            try:
+                item.url = self._storage_client.upload_file(
+                    object_name, item.upload.data, item.upload.content_type
+                )
+            except Exception:
+                logger.exception("Failed to store %s in object storage.", object_name)
+                results[item.index].error = "failed to store image"
+                continue
+            stored.append(item)
+
+        if not stored:
+            self._resolve_repeats(results, repeats)
+            return results
+
+        encoders = self._registry.write_encoders()
+        reusable = self._reusable_vectors(
+            repository, encoders, [(item.phash, item.near_duplicate) for item in stored]
+        )
+        to_encode: List[_PreparedImage] = []
+        for item in stored:
+            if item.near_duplicate is not None and item.near_duplicate.id in reusable:
+                item.text = item.near_duplicate.text
+                item.vectors = reusable[item.near_duplicate.id]
+            else:
+                to_encode.append(item)
+        # Submit every image before collecting results so a process-pool OCR
+        # backend can work on several images at once.
+        ocr_futures = [self._ocr_service.submit(item.image) for item in to_encode]
+        # A failing image is reported on its own and its object deleted; the
+        # rest of the batch is still saved.
+        failed: set[int] = set()
+        recognized: List[_PreparedImage] = []
+        for item, future in zip(to_encode, ocr_futures):
+            try:
+                item.text = future.result()
+            except Exception:
+                logger.exception("Failed to extract text from %s.", item.upload.filename)
+                self._fail_stored(results, item, "failed to extract text")
+                failed.add(item.index)
+                continue
+            recognized.append(item)
+        for item, vectors in zip(recognized, self._encode_items(encoders, recognized)):
+            if vectors is None:
+                self._fail_stored(results, item, "failed to embed image")
+                failed.add(item.index)
+                continue
+            item.vectors = vectors
+        stored = [item for item in stored if item.index not in failed]
+        if not stored:
+            self._resolve_repeats(results, repeats)
+            return results
+
+        try:
+            records = repository.create_many(
+                [
+                    NewImage(
+                        url=item.url,
+                        hash_value=item.hash_value,
+                        width=item.image.width,
+                        height=item.image.height,
+                        vectors=item.vectors,
+                        text=item.text,
+                        phash=item.phash,
+                        near_duplicate_of_id=_link_target(item.near_duplicate),
+                    )
+                    for item in stored
+                ]
+            )
+        except BaseException:
+            # Nothing was committed, so none of the uploaded objects is used.
+            for item in stored:
+                self._discard_quietly(item.url)
+            raise
+        for item, record in zip(stored, records):
+            results[item.index].metadata = record
+        self._resolve_repeats(results, repeats)
+        self._add_to_vector_index([record.id for record in records])
+        return results
+
+    def _encode_items(
+        self, encoders: Sequence[ModelEncoder], items: Sequence[_PreparedImage]
+    ) -> List[Optional[ImageVectors]]:
+        """Encode ``items`` in one batch, or one at a time if the batch fails.
+
+        Items that cannot be encoded on their own get ``None``.
+        """
+
+        if not items:
+            return []
+        try:
+            return list(
+                encode_batch_columns(
+                    encoders, [item.image for item in items], [item.text for item in items]
+                )
+            )
+        except Exception:
+            if len(items) == 1:
+                logger.exception("Failed to embed %s.", items[0].upload.filename)
+                return [None]
+            logger.warning(
+                "Batch embedding failed; retrying the batch one image at a time.",
+                exc_info=True,
+            )
+        return [self._encode_items(encoders, [item])[0] for item in items]
+
+    def _fail_stored(
+        self,
+        results: Sequence[BatchIngestResult],
+        item: _PreparedImage,
+        error: str,
+    ) -> None:
+        results[item.index].error = error
+        self._discard_quietly(item.url)
+
+    def _discard_quietly(self, url: str) -> None:
+        try:
+            self.discard(url)
+        except Exception:
+            logger.warning("Failed to delete %s from object storage.", url, exc_info=True)
+
+    def _reusable_vectors(
+        self,
+        repository: ImageRepository,
+        encoders: Sequence[ModelEncoder],
+        matches: Sequence[tuple[int, Optional[ImageMetadata]]],
+    ) -> Dict[int, ImageVectors]:
+        """Return the stored vectors of near-duplicates close enough to copy.
+
+        ``matches`` pairs each new perceptual hash with its near-duplicate; the
+        result is keyed by the near-duplicate's id and only includes images
+        that have a vector for every column ``encoders`` write.
+        """
+
+        originals = {
+            near_duplicate.id: near_duplicate
+            for phash, near_duplicate in matches
+            if near_duplicate is not None
+            and near_duplicate.phash is not None
+            and hamming_distance(phash, from_signed64(near_duplicate.phash))
+            <= self._near_duplicate_reuse_distance
+        }
+        if not originals:
+            return {}
+        stored = repository.get_vector_columns(list(originals), encoder_columns(encoders))
+        return {
+            image_id: vectors
+            for image_id, vectors in stored.items()
+            if _covers_encoders(originals[image_id], encoders, vectors)
+        }
+
+    def _add_to_vector_index(self, ids: Sequence[int]) -> None:
+        if self._vector_index is None:
+            return
+        try:
+            self._vector_index.add(ids)
+        except Exception:
+            # The rows are committed; the next build verifies and adds them.
+            logger.exception("Failed to add new images to the vector index.")
+
+    @staticmethod
+    def _resolve_repeats(
+        results: Sequence[BatchIngestResult], repeats: Sequence[tuple[int, int]]
+    ) -> None:
+        for index, original_index in repeats:
+            original = results[original_index]
+            results[index].metadata = original.metadata
+            results[index].error = original.error
+
 
 @lru_cache
 def get_image_ingest_service() -> ImageIngestService:
+    settings = get_settings()
     return ImageIngestService(
         storage_client=get_storage_client(),
-        embedding_service=get_embedding_service(),
+        registry=get_embedding_registry(),
         ocr_service=get_ocr_service(),
+        spool_max_bytes=settings.upload_spool_max_bytes,
+        stage_executor=(
+            ThreadPoolExecutor(
+                max_workers=max(2, settings.ingest_stage_workers),
+                thread_name_prefix="ingest-stage",
+            )
+            if settings.ingest_concurrent_stages
+            else None
+        ),
+        near_duplicate_max_distance=settings.near_duplicate_max_distance,
+        near_duplicate_reuse_distance=settings.near_duplicate_reuse_distance,
+        vector_index=get_vector_index(),
     )
 
 
-__all__ = ["ImageIngestService", "get_image_ingest_service"]
+__all__ = [
+    "BatchIngestResult",
+    "ImageIngestService",
+    "ImageUpload",
+    "PROCESSING_STAGES",
+    "StageCallback",
+    "get_image_ingest_service",
+]
@@ -0,0 +1,84 @@
+"""Dynamic micro-batching for model calls issued by concurrent requests."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Callable, Generic, List, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass(slots=True)
+class _Request(Generic[T, R]):
+    item: T
+    future: "Future[R]" = field(default_factory=Future)
+
+
+class MicroBatcher(Generic[T, R]):
+    """Coalesce concurrent single-item calls into batched ``handler`` calls.
+
+    The first queued item opens a collection window of ``max_wait_ms``; the
+    batch is dispatched when the window closes or ``max_batch_size`` items are
+    waiting, whichever comes first. A caller therefore waits at most one window
+    plus the batched call itself. ``handler`` must return one result per input,
+    in order; if it raises, every caller in the batch receives the exception.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[List[T]], Sequence[R]],
+        *,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        name: str = "micro-batcher",
+    ) -> None:
+        self._handler = handler
+        self._max_batch_size = max(1, max_batch_size)
+        self._max_wait = max(0.0, max_wait_ms) / 1000.0
+        self._queue: "queue.Queue[_Request[T, R]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name=name, daemon=True)
+        self._worker.start()
+
+    def submit(self, item: T) -> "Future[R]":
+        request: _Request[T, R] = _Request(item)
+        self._queue.put(request)
+        return request.future
+
+    def __call__(self, item: T) -> R:
+        return self.submit(item).result()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._max_wait
+            while len(batch) < self._max_batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._dispatch(batch)
+
+    def _dispatch(self, batch: List[_Request[T, R]]) -> None:
+        try:
+            results = self._handler([request.item for request in batch])
+            if len(results) != len(batch):
+                raise RuntimeError(
+                    f"batch handler returned {len(results)} results for {len(batch)} items"
+                )
+        except BaseException as exc:
+            for request in batch:
+                request.future.set_exception(exc)
+            return
+        for request, result in zip(batch, results):
+            request.future.set_result(result)
+
+
+__all__ = ["MicroBatcher"]
@@ -0,0 +1,167 @@
+"""Lazy loading, warm-up and readiness tracking for ML models."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+MODEL_NOT_LOADED = "not_loaded"
+MODEL_LOADING = "loading"
+MODEL_WARMING_UP = "warming_up"
+MODEL_READY = "ready"
+MODEL_FAILED = "failed"
+
+
+@dataclass(slots=True)
+class ModelState:
+    """Load status and timings of a registered model."""
+
+    name: str
+    status: str = MODEL_NOT_LOADED
+    load_seconds: Optional[float] = None
+    warmup_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+
+@dataclass(slots=True)
+class _Registration:
+    loader: Callable[[], Any]
+    warmup: Optional[Callable[[Any], None]]
+    lock: threading.Lock
+    state: ModelState
+    instance: Any = None
+    warmed: bool = False
+
+
+class ModelLifecycleManager:
+    """Load registered models on first use and report their readiness.
+
+    Heavy libraries (torch, sentence-transformers, EasyOCR) are only imported
+    by the loaders, so processes that never touch a model start instantly.
+    ``start_background_warmup`` loads every model on a daemon thread and runs a
+    dummy forward pass so the first real request does not pay for it.
+    """
+
+    def __init__(self) -> None:
+        self._registrations: Dict[str, _Registration] = {}
+        self._lock = threading.Lock()
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def register(
+        self,
+        name: str,
+        loader: Callable[[], Any],
+        warmup: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        with self._lock:
+            if name in self._registrations:
+                return
+            self._registrations[name] = _Registration(
+                loader=loader,
+                warmup=warmup,
+                lock=threading.Lock(),
+                state=ModelState(name=name),
+            )
+
+    def get(self, name: str) -> Any:
+        """Return the model instance, loading it on first use."""
+
+        registration = self._registration(name)
+        if registration.instance is not None:
+            return registration.instance
+        with registration.lock:
+            if registration.instance is None:
+                self._load(registration)
+        return registration.instance
+
+    def warm_up(self, name: str) -> None:
+        registration = self._registration(name)
+        instance = self.get(name)
+        with registration.lock:
+            if registration.warmed or registration.warmup is None:
+                registration.warmed = True
+                return
+            registration.state.status = MODEL_WARMING_UP
+            started = time.perf_counter()
+            try:
+                registration.warmup(instance)
+            except Exception as exc:
+                logger.exception("Warm-up for model %s failed.", name)
+                registration.state.status = MODEL_FAILED
+                registration.state.error = str(exc) or type(exc).__name__
+                return
+            registration.state.warmup_seconds = time.perf_counter() - started
+            registration.state.status = MODEL_READY
+            registration.warmed = True
+
+    def start_background_warmup(self) -> None:
+        with self._lock:
+            if self._warmup_thread is not None:
+                return
+            self._warmup_thread = threading.Thread(
+                target=self._warm_up_all, name="model-warmup", daemon=True
+            )
+        self._warmup_thread.start()
+
+    def states(self) -> List[ModelState]:
+        with self._lock:
+            registrations = list(self._registrations.values())
+        return [replace(registration.state) for registration in registrations]
+
+    def all_ready(self) -> bool:
+        return all(state.status == MODEL_READY for state in self.states())
+
+    def _warm_up_all(self) -> None:
+        with self._lock:
+            names = list(self._registrations)
+        for name in names:
+            try:
+                self.warm_up(name)
+            except Exception:
+                logger.exception("Could not load model %s during warm-up.", name)
+
+    def _registration(self, name: str) -> _Registration:
+        with self._lock:
+            try:
+                return self._registrations[name]
+            except KeyError:
+                raise KeyError(f"Model {name!r} is not registered") from None
+
+    def _load(self, registration: _Registration) -> None:
+        state = registration.state
+        state.status = MODEL_LOADING
+        state.error = None
+        started = time.perf_counter()
+        try:
+            registration.instance = registration.loader()
+        except Exception as exc:
+            state.status = MODEL_FAILED
+            state.error = str(exc) or type(exc).__name__
+            raise
+        state.load_seconds = time.perf_counter() - started
+        # A loaded model can serve requests; warm-up only shaves first-call latency.
+        state.status = MODEL_READY
+        logger.info("Loaded model %s in %.2fs.", state.name, state.load_seconds)
+
+
+@lru_cache
+def get_model_lifecycle() -> ModelLifecycleManager:
+    return ModelLifecycleManager()
+
+
+__all__ = [
+    "MODEL_FAILED",
+    "MODEL_LOADING",
+    "MODEL_NOT_LOADED",
+    "MODEL_READY",
+    "MODEL_WARMING_UP",
+    "ModelLifecycleManager",
+    "ModelState",
+    "get_model_lifecycle",
+]
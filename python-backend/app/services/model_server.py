@@ -0,0 +1,426 @@
+"""Out-of-process model server shared by several API worker processes.
+
+One process owns the CLIP and OCR models and answers requests over a Unix
+socket; API workers use the thin :class:`RemoteEmbeddingService` and
+:class:`RemoteOCRService` clients instead of loading their own copies. Control
+messages travel over ``multiprocessing.connection`` while image pixels and
+result matrices are exchanged through a shared-memory block owned by each
+client connection, so bulk data is never pickled. Connections authenticate
+with a shared key before any message is unpickled. Besides the configured
+model, the server loads registry (shadow) models on their first request, so
+workers never load a second copy of CLIP themselves.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from multiprocessing import AuthenticationError, resource_tracker
+from multiprocessing.connection import Client, Connection, Listener
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import Settings
+
+logger = logging.getLogger(__name__)
+
+_OP_INFO = "info"
+_OP_ENCODE_TEXT = "encode_text"
+_OP_ENCODE_TEXTS = "encode_texts"
+_OP_ENCODE_IMAGES = "encode_images"
+_OP_OCR = "ocr"
+
+_ERROR_VALUE = "value"
+_ERROR_INTERNAL = "internal"
+
+# (offset, height, width) of an RGB image inside a shared-memory block.
+_ImageLayout = Tuple[int, int, int]
+
+# Embedding model a request is for: ``None`` is the server's configured model,
+# registry models are addressed as ``(model_name, normalize)``.
+ModelKey = Optional[Tuple[str, bool]]
+
+
+class ModelServerError(RuntimeError):
+    """Raised when the model server cannot be reached or fails a request."""
+
+
+def model_server_authkey(settings: Settings) -> bytes:
+    """Return the key the model server and its clients authenticate with.
+
+    ``MODEL_SERVER_AUTHKEY`` when set, otherwise a key derived from
+    ``JWT_SECRET``, which both sides already need.
+    """
+
+    if settings.model_server_authkey:
+        return settings.model_server_authkey.encode()
+    return hashlib.sha256(b"model-server:" + settings.jwt_secret.encode()).digest()
+
+
+class ModelServer:
+    """Serve embedding and OCR requests for local API workers.
+
+    Each client connection is handled on its own thread; concurrent text
+    queries still coalesce inside ``embedding_service`` when micro-batching is
+    enabled, and OCR parallelism comes from the configured OCR backend.
+    """
+
+    def __init__(
+        self,
+        socket_path: str,
+        *,
+        authkey: bytes,
+        embedding_service: Any,
+        ocr_service: Any,
+        embedding_loader: Optional[Callable[[str, bool], Any]] = None,
+    ) -> None:
+        self._socket_path = socket_path
+        self._authkey = authkey
+        self._ocr_service = ocr_service
+        self._embedding_loader = embedding_loader
+        self._embedding_services: Dict[ModelKey, Any] = {None: embedding_service}
+        self._dimensions: Dict[ModelKey, int] = {
+            None: _probe_dimension(embedding_service)
+        }
+        self._models_lock = threading.Lock()
+
+    def serve_forever(self) -> None:
+        if os.path.exists(self._socket_path):
+            os.unlink(self._socket_path)
+        # Requests are pickled: the socket is created owner-only, and clients
+        # must prove they know the authkey before anything is unpickled.
+        previous_umask = os.umask(0o177)
+        try:
+            listener = Listener(
+                self._socket_path, family="AF_UNIX", authkey=self._authkey
+            )
+        finally:
+            os.umask(previous_umask)
+        with listener:
+            logger.info("Model server listening on %s.", self._socket_path)
+            while True:
+                try:
+                    connection = listener.accept()
+                except (AuthenticationError, EOFError, ConnectionError) as exc:
+                    logger.warning("Rejected a model server connection: %s", exc)
+                    continue
+                threading.Thread(
+                    target=self._serve_connection,
+                    args=(connection,),
+                    name="model-server-connection",
+                    daemon=True,
+                ).start()
+
+    def _serve_connection(self, connection: Connection) -> None:
+        attached: Dict[str, SharedMemory] = {}
+        try:
+            while True:
+                try:
+                    op, payload = connection.recv()
+                except (EOFError, OSError):
+                    return
+                try:
+                    result = self._handle(op, payload, attached)
+                except ValueError as exc:
+                    connection.send((False, _ERROR_VALUE, str(exc)))
+                except Exception as exc:
+                    logger.exception("Model server request %s failed.", op)
+                    message = str(exc) or type(exc).__name__
+                    connection.send((False, _ERROR_INTERNAL, message))
+                else:
+                    connection.send((True, None, result))
+        finally:
+            for segment in attached.values():
+                segment.close()
+            connection.close()
+
+    def _handle(self, op: str, payload: Any, attached: Dict[str, SharedMemory]) -> Any:
+        if op == _OP_INFO:
+            self._embedding(payload)
+            return {"dimension": self._dimensions[payload]}
+        if op == _OP_ENCODE_TEXT:
+            model, text = payload
+            return self._embedding(model).encode_text(text)
+        if op == _OP_ENCODE_TEXTS:
+            model, texts, segment_name, out_offset = payload
+            vectors = self._embedding(model).encode_texts(texts)
+            self._write_matrix(attached, segment_name, out_offset, vectors)
+            return len(texts)
+        if op == _OP_ENCODE_IMAGES:
+            model, segment_name, layouts, out_offset = payload
+            buffer = self._attach(attached, segment_name).buf
+            images = [_read_image(buffer, layout) for layout in layouts]
+            vectors = self._embedding(model).encode_images(images)
+            self._write_matrix(attached, segment_name, out_offset, vectors)
+            return len(images)
+        if op == _OP_OCR:
+            segment_name, layout = payload
+            image = _read_image(self._attach(attached, segment_name).buf, layout)
+            return self._ocr_service.extract_text(image)
+        raise ValueError(f"unknown model server operation {op!r}")
+
+    def _embedding(self, model: ModelKey) -> Any:
+        service = self._embedding_services.get(model)
+        if service is not None:
+            return service
+        if self._embedding_loader is None or model is None:
+            raise ValueError(f"model server does not serve {model!r}")
+        with self._models_lock:
+            service = self._embedding_services.get(model)
+            if service is None:
+                name, normalize = model
+                logger.info("Loading registry model %s for clients.", name)
+                service = self._embedding_loader(name, normalize)
+                self._dimensions[model] = _probe_dimension(service)
+                self._embedding_services[model] = service
+        return service
+
+    def _write_matrix(
+        self,
+        attached: Dict[str, SharedMemory],
+        segment_name: str,
+        offset: int,
+        vectors: np.ndarray,
+    ) -> None:
+        buffer = self._attach(attached, segment_name).buf
+        target = np.ndarray(
+            vectors.shape, dtype=np.float32, buffer=buffer, offset=offset
+        )
+        target[...] = vectors
+
+    @staticmethod
+    def _attach(attached: Dict[str, SharedMemory], name: str) -> SharedMemory:
+        segment = attached.get(name)
+        if segment is None:
+            # A client only uses its newest block; drop the ones it replaced.
+            for stale in attached.values():
+                stale.close()
+            attached.clear()
+            segment = SharedMemory(name=name)
+            # The client owns the block. Without this the server's resource
+            # tracker would unlink it when the server exits.
+            resource_tracker.unregister(
+                segment._name, "shared_memory"  # type: ignore[attr-defined]
+            )
+            attached[name] = segment
+        return segment
+
+
+def _probe_dimension(embedding_service: Any) -> int:
+    return int(embedding_service.encode_texts(["dimension probe"]).shape[1])
+
+
+def _read_image(buffer: memoryview, layout: _ImageLayout) -> Image.Image:
+    offset, height, width = layout
+    pixels = np.ndarray(
+        (height, width, 3), dtype=np.uint8, buffer=buffer, offset=offset
+    )
+    # Copy out of the shared block so the client may reuse it immediately.
+    return Image.fromarray(pixels.copy())
+
+
+def _rgb_pixels(image: Image.Image) -> np.ndarray:
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return np.asarray(image, dtype=np.uint8)
+
+
+def _release_segment(segment: SharedMemory) -> None:
+    segment.close()
+    try:
+        segment.unlink()
+    except FileNotFoundError:  # pragma: no cover - already removed
+        pass
+
+
+class _Channel:
+    """A client connection plus the shared-memory block it exchanges data in."""
+
+    def __init__(self, socket_path: str, authkey: bytes) -> None:
+        self.connection = Client(socket_path, family="AF_UNIX", authkey=authkey)
+        self.segment: Optional[SharedMemory] = None
+        self._finalizer: Optional[weakref.finalize] = None
+
+    def reserve(self, size: int) -> SharedMemory:
+        if self.segment is None or self.segment.size < size:
+            # Grow geometrically so varying batch sizes do not reallocate often.
+            previous = self.segment.size if self.segment is not None else 0
+            capacity = max(size, 2 * previous, 1 << 20)
+            if self._finalizer is not None:
+                self._finalizer()
+            self.segment = SharedMemory(create=True, size=capacity)
+            self._finalizer = weakref.finalize(self, _release_segment, self.segment)
+        return self.segment
+
+    def close(self) -> None:
+        if self._finalizer is not None:
+            self._finalizer()
+        self.connection.close()
+
+
+class ModelServerClient:
+    """Thread-safe client keeping one connection and buffer per thread."""
+
+    def __init__(self, socket_path: str, *, authkey: bytes) -> None:
+        self._socket_path = socket_path
+        self._authkey = authkey
+        self._local = threading.local()
+
+    def channel(self) -> _Channel:
+        channel = getattr(self._local, "channel", None)
+        if channel is None:
+            try:
+                channel = _Channel(self._socket_path, self._authkey)
+            except AuthenticationError as exc:
+                raise ModelServerError(
+                    f"model server at {self._socket_path} rejected the authkey; "
+                    "set the same MODEL_SERVER_AUTHKEY (or JWT_SECRET) on both sides"
+                ) from exc
+            except (OSError, EOFError) as exc:
+                raise ModelServerError(
+                    f"model server is not reachable at {self._socket_path}"
+                ) from exc
+            self._local.channel = channel
+        return channel
+
+    def call(self, op: str, payload: Any) -> Any:
+        channel = self.channel()
+        try:
+            channel.connection.send((op, payload))
+            ok, kind, result = channel.connection.recv()
+        except (EOFError, OSError) as exc:
+            # Drop the broken connection; the next call reconnects.
+            channel.close()
+            self._local.channel = None
+            raise ModelServerError("lost connection to the model server") from exc
+        if ok:
+            return result
+        if kind == _ERROR_VALUE:
+            raise ValueError(result)
+        raise ModelServerError(result)
+
+    def write_images(
+        self, images: Sequence[Image.Image], extra: int
+    ) -> Tuple[SharedMemory, List[_ImageLayout], int]:
+        """Copy ``images`` into this thread's block with ``extra`` bytes after them.
+
+        Returns the block, the per-image layouts and the offset of the extra
+        space, which the server fills with result vectors.
+        """
+
+        pixels = [_rgb_pixels(image) for image in images]
+        image_bytes = sum(array.nbytes for array in pixels)
+        # float32 results start on an 8-byte boundary.
+        out_offset = (image_bytes + 7) & ~7
+        segment = self.channel().reserve(out_offset + extra)
+        layouts: List[_ImageLayout] = []
+        offset = 0
+        for array in pixels:
+            height, width, _ = array.shape
+            target = np.ndarray(
+                array.shape, dtype=np.uint8, buffer=segment.buf, offset=offset
+            )
+            target[...] = array
+            layouts.append((offset, height, width))
+            offset += array.nbytes
+        return segment, layouts, out_offset
+
+    def read_matrix(
+        self, segment: SharedMemory, offset: int, rows: int, columns: int
+    ) -> np.ndarray:
+        view = np.ndarray(
+            (rows, columns), dtype=np.float32, buffer=segment.buf, offset=offset
+        )
+        return view.copy()
+
+
+class RemoteEmbeddingService:
+    """Drop-in replacement for ``EmbeddingService`` backed by the model server.
+
+    ``model`` selects a registry model; by default the server's configured
+    model is used.
+    """
+
+    def __init__(self, client: ModelServerClient, model: ModelKey = None) -> None:
+        self._client = client
+        self._model = model
+        self._dimension: Optional[int] = None
+
+    @property
+    def dimension(self) -> int:
+        if self._dimension is None:
+            info = self._client.call(_OP_INFO, self._model)
+            self._dimension = int(info["dimension"])
+        return self._dimension
+
+    def encode_image(self, image: Image.Image) -> np.ndarray:
+        return self.encode_images([image])[0]
+
+    def encode_images(self, images: Sequence[Image.Image]) -> np.ndarray:
+        if not images:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        result_bytes = len(images) * self.dimension * 4
+        segment, layouts, out_offset = self._client.write_images(images, result_bytes)
+        self._client.call(
+            _OP_ENCODE_IMAGES, (self._model, segment.name, layouts, out_offset)
+        )
+        return self._client.read_matrix(
+            segment, out_offset, len(images), self.dimension
+        )
+
+    def encode_text(self, text: str) -> np.ndarray:
+        # A single query vector is small enough to travel with the reply, and
+        # the server-side call goes through its shared query cache.
+        vector = self._client.call(_OP_ENCODE_TEXT, (self._model, text))
+        vector.setflags(write=False)
+        return vector
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        result_bytes = len(texts) * self.dimension * 4
+        segment = self._client.channel().reserve(result_bytes)
+        self._client.call(_OP_ENCODE_TEXTS, (self._model, list(texts), segment.name, 0))
+        return self._client.read_matrix(segment, 0, len(texts), self.dimension)
+
+
+class RemoteOCRService:
+    """OCR backend that forwards images to the model server.
+
+    ``submit`` runs requests on a small thread pool, each thread with its own
+    connection, so several images can be in flight at once.
+    """
+
+    def __init__(self, client: ModelServerClient, *, workers: int = 2) -> None:
+        self._client = client
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, workers), thread_name_prefix="remote-ocr"
+        )
+
+    def extract_text(self, image: Image.Image) -> Optional[str]:
+        segment, (layout,), _ = self._client.write_images([image], 0)
+        return self._client.call(_OP_OCR, (segment.name, layout))
+
+    def submit(self, image: Image.Image) -> "Future[Optional[str]]":
+        return self._executor.submit(self.extract_text, image)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+
+__all__ = [
+    "ModelKey",
+    "ModelServer",
+    "ModelServerClient",
+    "ModelServerError",
+    "RemoteEmbeddingService",
+    "RemoteOCRService",
+    "model_server_authkey",
+]
@@ -2,21 +2,49 @@
 
 from __future__ import annotations
 
-from functools import lru_cache
-from typing import Iterable, Optional
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Iterable, List, Optional, Protocol
 
-import easyocr
 import numpy as np
 from PIL import Image
 
+from app.core.config import get_settings
+from app.services.model_lifecycle import get_model_lifecycle
+
+logger = logging.getLogger(__name__)
+
+
+OCR_BACKEND_INLINE = "inline"
+OCR_BACKEND_PROCESS = "process"
+
+
+class OCRBackend(Protocol):
+    """Interface shared by the in-process and process-pool OCR backends."""
+
+    def extract_text(self, image: Image.Image) -> Optional[str]:
+        ...
+
+    def submit(self, image: Image.Image) -> "Future[Optional[str]]":
+        ...
+
 
 class OCRService:
     def __init__(self, languages: Iterable[str] | None = None, gpu: bool = False) -> None:
+        # Imported lazily: EasyOCR loads torch, which dominates startup time.
+        import easyocr
+
         self._reader = easyocr.Reader(list(languages or ["en"]), gpu=gpu)
 
     def extract_text(self, image: Image.Image) -> Optional[str]:
+        return self.extract_text_from_array(np.array(image))
+
+    def extract_text_from_array(self, pixels: np.ndarray) -> Optional[str]:
         try:
-            results = self._reader.readtext(np.array(image), detail=0)
+            results = self._reader.readtext(pixels, detail=0)
         except Exception:  # pragma: no cover - library level guard
             return None
         parts = [
@@ -26,10 +54,138 @@ class OCRService:
         ]
         return " ".join(parts) if parts else None
 
+    def submit(self, image: Image.Image) -> "Future[Optional[str]]":
+        """Run OCR inline and return the result as an already completed future."""
+
+        future: "Future[Optional[str]]" = Future()
+        try:
+            future.set_result(self.extract_text(image))
+        except BaseException as exc:  # pragma: no cover - mirrors executor semantics
+            future.set_exception(exc)
+        return future
+
+
+# Reader owned by each pool worker process; populated once by the initializer.
+_worker_service: Optional[OCRService] = None
+
+
+def _init_pool_worker(languages: List[str], gpu: bool) -> None:
+    global _worker_service
+    _worker_service = OCRService(languages, gpu=gpu)
+
+
+def _extract_in_pool_worker(pixels: np.ndarray) -> Optional[str]:
+    if _worker_service is None:  # pragma: no cover - initializer always runs first
+        raise RuntimeError("OCR worker process was not initialised")
+    return _worker_service.extract_text_from_array(pixels)
+
+
+class OCRProcessPool:
+    """Spread OCR across worker processes that each keep a warm EasyOCR reader.
+
+    EasyOCR serialises work through a single reader, so one reader per process
+    lets OCR throughput scale with the number of cores. Workers are started
+    with the ``spawn`` method to avoid forking a parent that already holds
+    torch thread pools. If a worker dies (e.g. killed for running out of
+    memory) the pool is replaced, so later requests do not all fail.
+    """
 
-@lru_cache
-def get_ocr_service() -> OCRService:
+    def __init__(
+        self,
+        languages: Iterable[str] | None = None,
+        gpu: bool = False,
+        workers: int = 2,
+    ) -> None:
+        self._workers = max(1, workers)
+        self._initargs = (list(languages or ["en"]), gpu)
+        self._lock = threading.Lock()
+        self._executor = self._create_executor()
+
+    def submit(self, image: Image.Image) -> "Future[Optional[str]]":
+        pixels = np.asarray(image)
+        executor = self._executor
+        try:
+            return executor.submit(_extract_in_pool_worker, pixels)
+        except BrokenProcessPool:
+            logger.warning("OCR worker pool is broken; starting a new one.")
+            return self._replace(executor).submit(_extract_in_pool_worker, pixels)
+
+    def extract_text(self, image: Image.Image) -> Optional[str]:
+        return self.submit(image).result()
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _create_executor(self) -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_pool_worker,
+            initargs=self._initargs,
+        )
+
+    def _replace(self, broken: ProcessPoolExecutor) -> ProcessPoolExecutor:
+        with self._lock:
+            # Concurrent callers may hit the same broken pool; only the first
+            # one replaces it.
+            if self._executor is broken:
+                broken.shutdown(wait=False)
+                self._executor = self._create_executor()
+            return self._executor
+
+
+MODEL_OCR = "ocr"
+
+
+def create_ocr_service() -> OCRBackend:
+    """Build the in-process OCR backend selected by ``OCR_BACKEND``."""
+
+    settings = get_settings()
+    if settings.ocr_backend == OCR_BACKEND_PROCESS:
+        return OCRProcessPool(workers=settings.ocr_workers)
+    if settings.ocr_backend != OCR_BACKEND_INLINE:
+        raise RuntimeError(f"Unknown OCR_BACKEND {settings.ocr_backend!r}")
     return OCRService()
 
 
-__all__ = ["OCRService", "get_ocr_service"]
+def _load_ocr_service() -> OCRBackend:
+    settings = get_settings()
+    if settings.model_server_socket:
+        from app.services.model_server import (
+            ModelServerClient,
+            RemoteOCRService,
+            model_server_authkey,
+        )
+
+        return RemoteOCRService(
+            ModelServerClient(
+                settings.model_server_socket, authkey=model_server_authkey(settings)
+            ),
+            workers=settings.ocr_workers,
+        )
+    return create_ocr_service()
+
+
+def _warm_up_ocr_service(service: OCRBackend) -> None:
+    service.extract_text(Image.new("RGB", (64, 64), "white"))
+
+
+get_model_lifecycle().register(MODEL_OCR, _load_ocr_service, warmup=_warm_up_ocr_service)
+
+
+def get_ocr_service() -> OCRBackend:
+    """Return the configured OCR backend, creating it on first use."""
+
+    return get_model_lifecycle().get(MODEL_OCR)
+
+
+__all__ = [
+    "MODEL_OCR",
+    "OCRBackend",
+    "OCRProcessPool",
+    "OCRService",
+    "OCR_BACKEND_INLINE",
+    "OCR_BACKEND_PROCESS",
+    "create_ocr_service",
+    "get_ocr_service",
+]
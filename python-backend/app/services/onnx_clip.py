@@ -0,0 +1,214 @@
+"""ONNX Runtime inference backend for the CLIP text and vision towers."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, List, Sequence
+
+import numpy as np
+from PIL import Image
+
+from app.services.embedding_service import EMBEDDING_BACKEND_ONNX, ClipBackend
+
+TEXT_TOWER = "text"
+VISION_TOWER = "vision"
+
+
+def model_path(model_dir: Path | str, tower: str, *, quantized: bool) -> Path:
+    suffix = ".int8.onnx" if quantized else ".onnx"
+    return Path(model_dir) / f"{tower}{suffix}"
+
+
+def _require_onnxruntime() -> Any:
+    try:
+        import onnxruntime
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError(
+            "EMBEDDING_BACKEND=onnx requires the 'onnxruntime' package"
+        ) from exc
+    return onnxruntime
+
+
+class OnnxClipBackend:
+    """Run exported CLIP towers with ONNX Runtime on the CPU.
+
+    The directory must contain the files written by :func:`export_clip_to_onnx`:
+    ``text[.int8].onnx``, ``vision[.int8].onnx`` and the saved CLIP processor.
+    """
+
+    def __init__(
+        self,
+        model_dir: Path | str,
+        *,
+        quantized: bool = True,
+        intra_op_threads: int = 0,
+    ) -> None:
+        ort = _require_onnxruntime()
+        from transformers import CLIPProcessor
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = intra_op_threads
+        providers = ["CPUExecutionProvider"]
+        self._text_session = ort.InferenceSession(
+            str(model_path(model_dir, TEXT_TOWER, quantized=quantized)),
+            options,
+            providers=providers,
+        )
+        self._vision_session = ort.InferenceSession(
+            str(model_path(model_dir, VISION_TOWER, quantized=quantized)),
+            options,
+            providers=providers,
+        )
+        self._processor = CLIPProcessor.from_pretrained(str(model_dir))
+        self.name = f"{EMBEDDING_BACKEND_ONNX}-int8" if quantized else EMBEDDING_BACKEND_ONNX
+
+    def encode_texts(self, texts: Sequence[str]) -> np.ndarray:
+        inputs = self._processor(
+            text=list(texts), padding=True, truncation=True, return_tensors="np"
+        )
+        (embeddings,) = self._text_session.run(
+            None,
+            {
+                "input_ids": inputs["input_ids"].astype(np.int64),
+                "attention_mask": inputs["attention_mask"].astype(np.int64),
+            },
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+    def encode_images(self, images: Sequence[Image.Image]) -> np.ndarray:
+        inputs = self._processor(images=list(images), return_tensors="np")
+        (embeddings,) = self._vision_session.run(
+            None, {"pixel_values": inputs["pixel_values"].astype(np.float32)}
+        )
+        return np.ascontiguousarray(embeddings, dtype=np.float32)
+
+
+def export_clip_to_onnx(
+    model_name: str,
+    output_dir: Path | str,
+    *,
+    quantize: bool = True,
+    opset: int = 17,
+) -> Path:
+    """Export the CLIP towers behind ``SentenceTransformer(model_name)`` to ONNX.
+
+    Both towers are exported with dynamic batch (and sequence) axes. With
+    ``quantize`` an int8 dynamically quantized copy of each tower is written
+    next to the full-precision one.
+    """
+
+    import torch
+    from sentence_transformers import SentenceTransformer
+
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    clip_module = SentenceTransformer(model_name, device="cpu")[0]
+    model = clip_module.model.eval()
+    processor = clip_module.processor
+
+    class TextTower(torch.nn.Module):
+        def forward(self, input_ids: Any, attention_mask: Any) -> Any:
+            return model.get_text_features(
+                input_ids=input_ids, attention_mask=attention_mask
+            )
+
+    class VisionTower(torch.nn.Module):
+        def forward(self, pixel_values: Any) -> Any:
+            return model.get_image_features(pixel_values=pixel_values)
+
+    text_inputs = processor(text=["a photo of a receipt"], padding=True, return_tensors="pt")
+    image_inputs = processor(images=[Image.new("RGB", (224, 224))], return_tensors="pt")
+
+    with torch.no_grad():
+        torch.onnx.export(
+            TextTower(),
+            (text_inputs["input_ids"], text_inputs["attention_mask"]),
+            str(model_path(directory, TEXT_TOWER, quantized=False)),
+            input_names=["input_ids", "attention_mask"],
+            output_names=["embeddings"],
+            dynamic_axes={
+                "input_ids": {0: "batch", 1: "sequence"},
+                "attention_mask": {0: "batch", 1: "sequence"},
+                "embeddings": {0: "batch"},
+            },
+            opset_version=opset,
+        )
+        torch.onnx.export(
+            VisionTower(),
+            (image_inputs["pixel_values"],),
+            str(model_path(directory, VISION_TOWER, quantized=False)),
+            input_names=["pixel_values"],
+            output_names=["embeddings"],
+            dynamic_axes={"pixel_values": {0: "batch"}, "embeddings": {0: "batch"}},
+            opset_version=opset,
+        )
+    processor.save_pretrained(str(directory))
+
+    if quantize:
+        _require_onnxruntime()
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+
+        for tower in (TEXT_TOWER, VISION_TOWER):
+            quantize_dynamic(
+                str(model_path(directory, tower, quantized=False)),
+                str(model_path(directory, tower, quantized=True)),
+                weight_type=QuantType.QInt8,
+            )
+    return directory
+
+
+@dataclass(slots=True)
+class ParityReport:
+    """Cosine agreement between two backends for one modality."""
+
+    modality: str
+    samples: int
+    min_cosine: float
+    mean_cosine: float
+
+
+def _row_cosines(reference: np.ndarray, candidate: np.ndarray) -> np.ndarray:
+    reference_norms = np.linalg.norm(reference, axis=1)
+    candidate_norms = np.linalg.norm(candidate, axis=1)
+    dots = np.einsum("ij,ij->i", reference, candidate)
+    return dots / np.maximum(reference_norms * candidate_norms, 1e-12)
+
+
+def check_parity(
+    reference: ClipBackend,
+    candidate: ClipBackend,
+    *,
+    texts: Sequence[str],
+    images: Sequence[Image.Image],
+) -> List[ParityReport]:
+    """Compare ``candidate`` embeddings against ``reference`` row by row."""
+
+    reports: List[ParityReport] = []
+    for modality, encode_reference, encode_candidate, inputs in (
+        (TEXT_TOWER, reference.encode_texts, candidate.encode_texts, texts),
+        (VISION_TOWER, reference.encode_images, candidate.encode_images, images),
+    ):
+        if not inputs:
+            continue
+        cosines = _row_cosines(encode_reference(inputs), encode_candidate(inputs))
+        reports.append(
+            ParityReport(
+                modality=modality,
+                samples=len(inputs),
+                min_cosine=float(cosines.min()),
+                mean_cosine=float(cosines.mean()),
+            )
+        )
+    return reports
+
+
+__all__ = [
+    "OnnxClipBackend",
+    "ParityReport",
+    "check_parity",
+    "export_clip_to_onnx",
+    "model_path",
+]
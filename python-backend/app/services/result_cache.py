@@ -0,0 +1,50 @@
+"""In-process cache of ranked retrieval results."""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Generic, Hashable, Optional, Sequence, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class RetrievalResultCache(Generic[T]):
+    """LRU cache of ranked results tagged with the index epoch they were built at.
+
+    An entry is only served while the caller's current epoch matches the one
+    it was stored under, so any committed change to ``images`` invalidates
+    every entry at once without tracking which queries it affects.
+    """
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self._max_entries = max(1, max_entries)
+        self._entries: "OrderedDict[Hashable, Tuple[int, Tuple[T, ...]]]" = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, epoch: int) -> Optional[Tuple[T, ...]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] != epoch:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+
+    def put(self, key: Hashable, epoch: int, results: Sequence[T]) -> None:
+        with self._lock:
+            self._entries[key] = (epoch, tuple(results))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+__all__ = ["RetrievalResultCache"]
@@ -4,16 +4,21 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from functools import lru_cache
-from typing import Dict, Iterable, List, Sequence
+from typing import Dict, Iterable, List, Optional, Sequence
 
 from sqlalchemy.orm import Session
 
-from app.models.images import ImageMetadata
-from app.repositories.images_repo import ImageRepository
-from app.services.embedding_service import (
-    EmbeddingService,
-    get_embedding_service,
+from app.core.config import get_settings
+from app.db.vector_indexes import index_metric
+from app.repositories.images_repo import HybridCandidate, ImageHit, ImageRepository
+from app.services.embedding_cache import EmbeddingCache
+from app.services.embedding_registry import (
+    EmbeddingModelRegistry,
+    get_embedding_registry,
 )
+from app.services.result_cache import RetrievalResultCache
+from app.services.semantic_cache import SemanticCacheStats, SemanticQueryCache
+from app.services.vector_index import VectorIndex, get_vector_index
 
 
 VISUAL_MODALITY = "visual"
@@ -24,7 +29,7 @@ OCR_MODALITY = "ocr"
 class RetrievalResult:
     """Container for a hybrid retrieval result."""
 
-    metadata: ImageMetadata
+    metadata: ImageHit
     score: float
     modalities: List[str]
     distances: Dict[str, float]
@@ -44,8 +49,24 @@ class RetrievalService:
     }
     _MAX_K = 20
 
-    def __init__(self, embedding_service: EmbeddingService) -> None:
-        self._embedding_service = embedding_service
+    def __init__(
+        self,
+        registry: EmbeddingModelRegistry,
+        vector_index: VectorIndex,
+        result_cache: Optional[RetrievalResultCache[RetrievalResult]] = None,
+        semantic_cache: Optional[SemanticQueryCache[RetrievalResult]] = None,
+    ) -> None:
+        self._registry = registry
+        self._vector_index = vector_index
+        # Exact repeats are answered before the query is encoded; paraphrases
+        # are matched on the query embedding before the index is searched.
+        self._result_cache = result_cache
+        self._semantic_cache = semantic_cache
+
+    def semantic_cache_stats(self) -> Optional[SemanticCacheStats]:
+        if self._semantic_cache is None:
+            return None
+        return self._semantic_cache.stats()
 
     def retrieve(
         self,
@@ -53,8 +74,13 @@ class RetrievalService:
         db: Session,
         query: str,
         k: int = 3,
+        ef_search: Optional[int] = None,
     ) -> List[RetrievalResult]:
-        """Return the top-k multimodal matches for the provided query."""
+        """Return the top-k multimodal matches for the provided query.
+
+        ``ef_search`` overrides the HNSW candidate list size for this request
+        only, trading latency for recall.
+        """
 
         if k <= 0:
             return []
@@ -63,62 +89,90 @@ class RetrievalService:
         if not normalized_query:
             return []
 
+        # The query is encoded by the active model and compared against that
+        # model's columns only.
+        encoder = self._registry.active_encoder()
+        top_k = min(k, self._MAX_K)
+
+        epoch = 0
+        weights = tuple(sorted(self._WEIGHTS.items()))
+        context = (top_k, encoder.spec.model_id, weights, ef_search)
+        cache_key = (EmbeddingCache.normalize_key(normalized_query), *context)
+        if self._result_cache is not None or self._semantic_cache is not None:
+            # The epoch is read before searching, so results computed while a
+            # concurrent upload commits are stored under the older epoch and
+            # never served after it.
+            epoch = ImageRepository(db).current_index_epoch()
+        if self._result_cache is not None:
+            cached = self._result_cache.get(cache_key, epoch)
+            if cached is not None:
+                return list(cached)
+
         try:
-            query_vector = self._embedding_service.encode_text(normalized_query)
+            query_vector = encoder.service.encode_text(normalized_query)
         except ValueError as exc:  # invalid user input
             raise RetrievalServiceError(str(exc)) from exc
         except Exception as exc:  # pragma: no cover - defensive guard
             raise RetrievalServiceError("failed to encode query text") from exc
 
-        if not query_vector:
+        if query_vector.size == 0:
             return []
 
-        repository = ImageRepository(db)
+        if self._semantic_cache is not None:
+            cached = self._semantic_cache.get(query_vector, context, epoch)
+            if cached is not None:
+                return list(cached)
 
-        top_k = min(k, self._MAX_K)
         pool_size = max(top_k * 2, top_k)
-        visual_candidates = repository.search_by_embedding_vector(
-            query_vector, limit=pool_size
-        )
-        text_candidates = repository.search_by_text_embedding_vector(
-            query_vector, limit=pool_size
+        # Both modalities are searched together in a single round trip: the
+        # pgvector query, or the metadata lookup after an in-process search.
+        candidates = self._vector_index.hybrid_search(
+            db,
+            query_vector,
+            pool_size,
+            image_column=encoder.spec.image_column,
+            text_column=encoder.spec.text_column,
+            ef_search=ef_search,
+            metric=index_metric(encoder.spec.inner_product),
         )
 
-        aggregated = self._merge_candidates(visual_candidates, text_candidates)
-        results = self._rank_results(aggregated)
-        return results[:top_k]
+        aggregated = self._merge_candidates(candidates)
+        results = self._rank_results(aggregated)[:top_k]
+        if self._result_cache is not None:
+            self._result_cache.put(cache_key, epoch, results)
+        if self._semantic_cache is not None:
+            self._semantic_cache.put(query_vector, context, epoch, results)
+        return results
 
     def _merge_candidates(
-        self,
-        visual_candidates: Sequence[tuple[ImageMetadata, float]],
-        text_candidates: Sequence[tuple[ImageMetadata, float]],
+        self, candidates: Sequence[HybridCandidate]
     ) -> Dict[int, Dict[str, object]]:
-        """Merge the ANN candidate pools into a single structure."""
+        """Collect the per-modality distances of each candidate row."""
 
         aggregated: Dict[int, Dict[str, object]] = {}
 
-        for metadata, distance in visual_candidates:
-            self._update_entry(
-                aggregated,
-                metadata,
-                VISUAL_MODALITY,
-                distance,
-            )
-
-        for metadata, distance in text_candidates:
-            self._update_entry(
-                aggregated,
-                metadata,
-                OCR_MODALITY,
-                distance,
-            )
+        for metadata, visual_distance, text_distance in candidates:
+            if visual_distance is not None:
+                self._update_entry(
+                    aggregated,
+                    metadata,
+                    VISUAL_MODALITY,
+                    visual_distance,
+                )
+            if text_distance is not None:
+                self._update_entry(
+                    aggregated,
+                    metadata,
+                    OCR_MODALITY,
+                    text_distance,
+                )
 
         return aggregated
 
     def _update_entry(
         self,
         aggregated: Dict[int, Dict[str, object]],
-        metadata: ImageMetadata,
+        metadata: ImageHit,
         modality: str,
         distance: float,
     ) -> None:
@@ -183,7 +237,25 @@ class RetrievalService:
 
 @lru_cache
 def get_retrieval_service() -> RetrievalService:
-    return RetrievalService(embedding_service=get_embedding_service())
+    settings = get_settings()
+    return RetrievalService(
+        registry=get_embedding_registry(),
+        vector_index=get_vector_index(),
+        result_cache=(
+            RetrievalResultCache(settings.retrieval_cache_entries)
+            if settings.retrieval_cache_entries > 0
+            else None
+        ),
+        semantic_cache=(
+            SemanticQueryCache(
+                capacity=settings.semantic_cache_entries,
+                threshold=settings.semantic_cache_threshold,
+                near_hit_margin=settings.semantic_cache_near_hit_margin,
+            )
+            if settings.semantic_cache_entries > 0
+            else None
+        ),
+    )
 
 
 __all__ = [
@@ -0,0 +1,138 @@
+"""Cache that reuses ranked results for near-identical query embeddings."""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass
+from typing import Dict, Generic, Hashable, List, Optional, Sequence, Tuple, TypeVar
+
+import numpy as np
+
+from app.utils.vectors import VectorLike, l2_normalize
+
+T = TypeVar("T")
+
+
+@dataclass(frozen=True, slots=True)
+class SemanticCacheStats:
+    entries: int
+    capacity: int
+    threshold: float
+    near_hit_margin: float
+    hits: int
+    misses: int
+    near_hits: int
+
+
+class SemanticQueryCache(Generic[T]):
+    """Serve cached results for queries whose embeddings are close enough.
+
+    The most recent ``capacity`` query vectors are kept unit-length in one
+    matrix, so a lookup is a single matrix-vector product. An entry is only
+    eligible when its context (``k``, model, blend weights) and index epoch
+    match the lookup. A best similarity at least ``threshold`` is a hit; a
+    miss within ``near_hit_margin`` below it is also counted as a near-hit,
+    which shows how many more queries a slightly lower threshold would serve.
+    """
+
+    def __init__(
+        self,
+        *,
+        capacity: int = 256,
+        threshold: float = 0.95,
+        near_hit_margin: float = 0.02,
+    ) -> None:
+        self._capacity = max(1, capacity)
+        self._threshold = threshold
+        self._near_hit_margin = max(0.0, near_hit_margin)
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._epochs = np.zeros(self._capacity, dtype=np.int64)
+        # Contexts are interned to small integers so eligibility is a
+        # vectorised comparison as well.
+        self._context_codes = np.full(self._capacity, -1, dtype=np.int64)
+        self._codes: Dict[Hashable, int] = {}
+        self._results: List[Tuple[T, ...]] = [()] * self._capacity
+        self._count = 0
+        self._next = 0
+        self._hits = 0
+        self._misses = 0
+        self._near_hits = 0
+
+    def get(
+        self, vector: VectorLike, context: Hashable, epoch: int
+    ) -> Optional[Tuple[T, ...]]:
+        query = l2_normalize(vector)
+        with self._lock:
+            code = self._codes.get(context)
+            matrix = self._matrix
+            if (
+                code is None
+                or matrix is None
+                or self._count == 0
+                or query.shape[-1] != matrix.shape[1]
+            ):
+                self._misses += 1
+                return None
+            count = self._count
+            similarities = matrix[:count] @ query
+            eligible = (self._context_codes[:count] == code) & (
+                self._epochs[:count] == epoch
+            )
+            similarities = np.where(eligible, similarities, -np.inf)
+            best = int(np.argmax(similarities))
+            similarity = float(similarities[best])
+            if similarity >= self._threshold:
+                self._hits += 1
+                return self._results[best]
+            self._misses += 1
+            if similarity >= self._threshold - self._near_hit_margin:
+                self._near_hits += 1
+            return None
+
+    def put(
+        self, vector: VectorLike, context: Hashable, epoch: int, results: Sequence[T]
+    ) -> None:
+        query = l2_normalize(vector)
+        with self._lock:
+            if self._matrix is None or self._matrix.shape[1] != query.shape[-1]:
+                # First entry, or the active model changed dimension.
+                self._matrix = np.zeros(
+                    (self._capacity, query.shape[-1]), dtype=np.float32
+                )
+                self._count = 0
+                self._next = 0
+            code = self._codes.get(context)
+            if code is None:
+                if len(self._codes) >= 4 * self._capacity:
+                    # Forget contexts no longer stored so the table stays small.
+                    live = set(self._context_codes[: self._count].tolist())
+                    self._codes = {
+                        key: value
+                        for key, value in self._codes.items()
+                        if value in live
+                    }
+                code = max(self._codes.values(), default=-1) + 1
+                self._codes[context] = code
+            slot = self._next
+            self._matrix[slot] = query
+            self._epochs[slot] = epoch
+            self._context_codes[slot] = code
+            self._results[slot] = tuple(results)
+            self._next = (slot + 1) % self._capacity
+            self._count = min(self._count + 1, self._capacity)
+
+    def stats(self) -> SemanticCacheStats:
+        with self._lock:
+            return SemanticCacheStats(
+                entries=self._count,
+                capacity=self._capacity,
+                threshold=self._threshold,
+                near_hit_margin=self._near_hit_margin,
+                hits=self._hits,
+                misses=self._misses,
+                near_hits=self._near_hits,
+            )
+
+
+__all__ = ["SemanticCacheStats", "SemanticQueryCache"]
@@ -0,0 +1,574 @@
+"""Pluggable vector index backends used by retrieval.
+
+``pgvector`` (the default) runs the ANN searches inside PostgreSQL. ``mmap``
+keeps a copy of each vector column on local disk as a memory-mapped
+``float32`` matrix and runs an exact search in-process, so a query costs a
+matrix-vector product plus one metadata lookup by id. It suits read-heavy
+corpora that change mostly by appending new images.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Sequence,
+)
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal
+from app.db.vector_indexes import METRIC_COSINE, STORAGE_FULL, VECTOR_STORAGE_MODES
+from app.repositories.images_repo import (
+    HNSW_ITERATIVE_SCAN_MODES,
+    HybridCandidate,
+    ImageRepository,
+)
+from app.utils.checkpoint import JsonCheckpoint
+from app.utils.vectors import VectorLike, l2_normalize
+
+VECTOR_INDEX_PGVECTOR = "pgvector"
+VECTOR_INDEX_MMAP = "mmap"
+
+# Rows scored per matrix-vector product; bounds the temporary score buffer.
+_SEARCH_CHUNK_ROWS = 1 << 16
+
+
+class VectorIndex(Protocol):
+    def hybrid_search(
+        self,
+        db: Session,
+        vector: VectorLike,
+        limit: int,
+        *,
+        image_column: str,
+        text_column: str,
+        ef_search: Optional[int] = None,
+        metric: str = METRIC_COSINE,
+    ) -> List[HybridCandidate]: ...
+
+    def add(self, ids: Sequence[int]) -> None: ...
+
+
+class PgVectorIndex:
+    """Search the HNSW indexes in PostgreSQL.
+
+    ``ef_search`` is the default candidate list size when a request does not
+    choose one (``None`` keeps the server setting); ``iterative_scan`` is
+    applied to every search. With a compact ``storage`` mode candidates come
+    from the halfvec or binary index and ``oversample`` times as many are
+    re-ranked exactly.
+    """
+
+    def __init__(
+        self,
+        *,
+        ef_search: Optional[int] = None,
+        iterative_scan: Optional[str] = None,
+        storage: str = STORAGE_FULL,
+        oversample: int = 4,
+    ) -> None:
+        if iterative_scan not in (None, *HNSW_ITERATIVE_SCAN_MODES):
+            raise RuntimeError(f"Unknown HNSW_ITERATIVE_SCAN {iterative_scan!r}")
+        if storage not in VECTOR_STORAGE_MODES:
+            raise RuntimeError(f"Unknown VECTOR_STORAGE {storage!r}")
+        self._storage = storage
+        self._oversample = max(1, oversample)
+        self._ef_search = ef_search
+        # "off" is pgvector's default, so there is nothing to set.
+        self._iterative_scan = None if iterative_scan == "off" else iterative_scan
+
+    def hybrid_search(
+        self,
+        db: Session,
+        vector: VectorLike,
+        limit: int,
+        *,
+        image_column: str,
+        text_column: str,
+        ef_search: Optional[int] = None,
+        metric: str = METRIC_COSINE,
+    ) -> List[HybridCandidate]:
+        return ImageRepository(db).hybrid_search(
+            vector,
+            limit,
+            image_column=image_column,
+            text_column=text_column,
+            ef_search=ef_search if ef_search is not None else self._ef_search,
+            iterative_scan=self._iterative_scan,
+            storage=self._storage,
+            oversample=self._oversample,
+            metric=metric,
+        )
+
+    def add(self, ids: Sequence[int]) -> None:
+        # PostgreSQL indexes are maintained on insert.
+        return None
+
+
+def _contains(sorted_ids: np.ndarray, image_id: int) -> bool:
+    position = int(np.searchsorted(sorted_ids, image_id))
+    return position < len(sorted_ids) and int(sorted_ids[position]) == image_id
+
+
+class _ColumnIndex:
+    """Append-only on-disk copy of one ``images`` vector column.
+
+    ``<column>.vectors`` holds unit-length ``float32`` rows and
+    ``<column>.ids`` the matching ``int64`` image ids; ``<column>.json``
+    records the dimension, the committed row count, the last image id
+    scanned and whether the copy was complete when last verified. Writers
+    append under an exclusive ``flock`` and write vectors before ids, so
+    readers in other processes can map whatever complete rows exist without
+    locking. The state and a sorted copy of the ids are cached per process
+    and only re-read when the files change.
+    """
+
+    def __init__(self, directory: Path, column: str) -> None:
+        self.column = column
+        self._vectors_path = directory / f"{column}.vectors"
+        self._ids_path = directory / f"{column}.ids"
+        self._lock_path = directory / f"{column}.lock"
+        self._state = JsonCheckpoint(directory / f"{column}.json")
+        self._map_lock = threading.Lock()
+        self._mapped_key: Optional[tuple[int, int, int]] = None
+        self._ids = np.empty(0, dtype=np.int64)
+        self._matrix: Optional[np.ndarray] = None
+        self._state_lock = threading.Lock()
+        self._state_key: Optional[tuple[int, int, int]] = None
+        self._cached_state: Dict[str, Any] = {}
+        self._sorted_key: Optional[tuple[Optional[str], int]] = None
+        self._sorted_ids = np.empty(0, dtype=np.int64)
+
+    def exists(self) -> bool:
+        return self._state.path.exists()
+
+    def ready(self) -> bool:
+        """Whether the copy held every stored vector when it was last verified."""
+
+        state = self._saved_state()
+        return bool(state.get("complete")) and int(state.get("rows", 0)) > 0
+
+    def search(self, query: np.ndarray, limit: int) -> List[tuple[int, float]]:
+        """Return ``(id, cosine distance)`` of the ``limit`` nearest rows."""
+
+        ids, matrix = self._mapped()
+        if matrix is None or not len(ids) or limit <= 0:
+            return []
+        best_ids: List[np.ndarray] = []
+        best_scores: List[np.ndarray] = []
+        for start in range(0, len(ids), _SEARCH_CHUNK_ROWS):
+            scores = matrix[start : start + _SEARCH_CHUNK_ROWS] @ query
+            take = min(limit, len(scores))
+            top = np.argpartition(-scores, take - 1)[:take]
+            best_scores.append(scores[top])
+            best_ids.append(ids[start + top])
+        scores = np.concatenate(best_scores)
+        candidates = np.concatenate(best_ids)
+        order = np.argsort(-scores, kind="stable")[:limit]
+        return [
+            (int(candidates[index]), float(1.0 - scores[index])) for index in order
+        ]
+
+    def add(self, session: Session, ids: Sequence[int]) -> int:
+        """Append the vectors of the committed rows ``ids``; return the count."""
+
+        with self._exclusive():
+            state = self._load_state()
+            rows = ImageRepository(session).get_vectors(self.column, ids)
+            session.rollback()
+            added = self._append(rows, state, self._known_ids(state))
+            if added:
+                self._state.save(state)
+            return added
+
+    def sync(self, session: Session, *, batch_size: int) -> int:
+        """Append vectors of rows added since the last sync; return the count."""
+
+        with self._exclusive():
+            state = self._load_state()
+            added = self._scan(
+                session, state, after_id=state["last_id"], batch_size=batch_size
+            )
+            return added + self._verify(session, state, batch_size=batch_size)
+
+    def rebuild(self, session: Session, *, batch_size: int) -> int:
+        """Re-read the whole column, e.g. after a backfill changed stored rows."""
+
+        with self._exclusive():
+            # Readers keep their mapping of the unlinked files until they
+            # notice the new ones.
+            self._vectors_path.unlink(missing_ok=True)
+            self._ids_path.unlink(missing_ok=True)
+            self._state.clear()
+            state = self._load_state()
+            added = self._scan(session, state, after_id=0, batch_size=batch_size)
+            return added + self._verify(session, state, batch_size=batch_size)
+
+    def invalidate(self) -> None:
+        """Stop serving the copy until the next sync verifies it again."""
+
+        with self._exclusive():
+            state = self._state.load()
+            if state is not None and state.get("complete"):
+                self._state.save({**state, "complete": False})
+
+    def _load_state(self) -> Dict[str, Any]:
+        state: Dict[str, Any] = {
+            "last_id": 0,
+            "dimension": None,
+            "rows": 0,
+            "complete": False,
+            # Identifies this copy of the files; a rebuild starts a new one.
+            "generation": uuid.uuid4().hex,
+            **(self._state.load() or {}),
+        }
+        if state["dimension"]:
+            # Drop rows a crashed writer appended after the last saved state;
+            # they are read again from the database.
+            self._truncate(state["rows"], state["dimension"])
+        return state
+
+    def _scan(
+        self,
+        session: Session,
+        state: Dict[str, Any],
+        *,
+        after_id: int,
+        batch_size: int,
+    ) -> int:
+        repository = ImageRepository(session)
+        # Pages are read in id order, so only rows already on disk before the
+        # scan can repeat.
+        known = self._known_ids(state)
+        added = 0
+        while True:
+            rows = repository.list_vectors(
+                self.column, after_id=after_id, limit=batch_size
+            )
+            # Release the snapshot between pages so long builds do not hold
+            # a transaction open.
+            session.rollback()
+            if not rows:
+                break
+            added += self._append(rows, state, known)
+            after_id = rows[-1][0]
+            state["last_id"] = max(state["last_id"], after_id)
+            self._state.save(state)
+        return added
+
+    def _verify(
+        self, session: Session, state: Dict[str, Any], *, batch_size: int
+    ) -> int:
+        """Check that no stored vector up to ``last_id`` is missing on disk.
+
+        A keyset scan misses rows whose transaction committed after the scan
+        passed their id, and rows whose vector was filled in later (a shadow
+        model's backfill, OCR text added afterwards). When the database holds
+        more vectors than the copy, the whole covered range is scanned again
+        and only the missing rows are appended.
+        """
+
+        repository = ImageRepository(session)
+        repaired = 0
+        for attempt in range(2):
+            expected = repository.count_vectors(self.column, max_id=state["last_id"])
+            session.rollback()
+            known = self._known_ids(state)
+            indexed = int(np.searchsorted(known, state["last_id"], side="right"))
+            state["complete"] = indexed >= expected
+            if state["complete"] or attempt:
+                break
+            repaired = self._scan(session, state, after_id=0, batch_size=batch_size)
+        self._state.save(state)
+        return repaired
+
+    def _append(
+        self,
+        rows: Sequence[tuple[int, Optional[np.ndarray]]],
+        state: Dict[str, Any],
+        known: np.ndarray,
+    ) -> int:
+        present = [
+            (image_id, vector)
+            for image_id, vector in rows
+            if vector is not None and not _contains(known, image_id)
+        ]
+        if not present:
+            return 0
+        matrix = l2_normalize(np.stack([vector for _, vector in present]))
+        if state["dimension"] is None:
+            state["dimension"] = int(matrix.shape[1])
+        elif matrix.shape[1] != state["dimension"]:
+            raise ValueError(
+                f"{self.column} vectors changed dimension; rebuild the index"
+            )
+        with self._vectors_path.open("ab") as handle:
+            handle.write(matrix.tobytes())
+        ids = np.asarray([image_id for image_id, _ in present], dtype=np.int64)
+        with self._ids_path.open("ab") as handle:
+            handle.write(ids.tobytes())
+        state["rows"] += len(present)
+        return len(present)
+
+    def _indexed_ids(self, rows: int) -> np.ndarray:
+        if not rows or not self._ids_path.exists():
+            return np.empty(0, dtype=np.int64)
+        return np.fromfile(self._ids_path, dtype=np.int64, count=rows)
+
+    def _known_ids(self, state: Dict[str, Any]) -> np.ndarray:
+        """Return the committed ids on disk, sorted for ``_contains``.
+
+        Committed rows never change within a generation, so only the rows
+        appended since the previous call are read and merged in.
+        """
+
+        rows = int(state["rows"])
+        generation = state.get("generation")
+        cached_generation, cached_rows = self._sorted_key or (None, 0)
+        if cached_generation != generation or cached_rows > rows:
+            self._sorted_ids = np.empty(0, dtype=np.int64)
+            cached_rows = 0
+        if rows > cached_rows and self._ids_path.exists():
+            tail = np.sort(
+                np.fromfile(
+                    self._ids_path,
+                    dtype=np.int64,
+                    count=rows - cached_rows,
+                    offset=cached_rows * 8,
+                )
+            )
+            self._sorted_ids = np.insert(
+                self._sorted_ids, np.searchsorted(self._sorted_ids, tail), tail
+            )
+        self._sorted_key = (generation, rows)
+        return self._sorted_ids
+
+    def _saved_state(self) -> Dict[str, Any]:
+        # Checkpoints are replaced atomically, so a new inode means new contents.
+        try:
+            stat = self._state.path.stat()
+        except FileNotFoundError:
+            return {}
+        key = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        with self._state_lock:
+            if key != self._state_key:
+                self._cached_state = self._state.load() or {}
+                self._state_key = key
+            return self._cached_state
+
+    def _truncate(self, rows: int, dimension: int) -> None:
+        for path, size in (
+            (self._vectors_path, rows * dimension * 4),
+            (self._ids_path, rows * 8),
+        ):
+            if path.exists() and path.stat().st_size > size:
+                os.truncate(path, size)
+
+    def _mapped(self) -> tuple[np.ndarray, Optional[np.ndarray]]:
+        try:
+            vectors_stat = self._vectors_path.stat()
+            ids_size = self._ids_path.stat().st_size
+        except FileNotFoundError:
+            return np.empty(0, dtype=np.int64), None
+        # The inode changes on rebuild; the sizes change on every append.
+        key = (vectors_stat.st_ino, vectors_stat.st_size, ids_size)
+        with self._map_lock:
+            if key != self._mapped_key:
+                dimension = self._saved_state().get("dimension")
+                rows = 0
+                if dimension:
+                    rows = min(vectors_stat.st_size // (4 * dimension), ids_size // 8)
+                if rows:
+                    self._ids = np.memmap(
+                        self._ids_path, dtype=np.int64, mode="r", shape=(rows,)
+                    )
+                    self._matrix = np.memmap(
+                        self._vectors_path,
+                        dtype=np.float32,
+                        mode="r",
+                        shape=(rows, dimension),
+                    )
+                else:
+                    self._ids = np.empty(0, dtype=np.int64)
+                    self._matrix = None
+                self._mapped_key = key
+            return self._ids, self._matrix
+
+    @contextmanager
+    def _exclusive(self) -> Iterator[None]:
+        with self._lock_path.open("a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+class MmapVectorIndex:
+    """Exact in-process search over memory-mapped copies of vector columns.
+
+    Only columns that :meth:`build` copied and verified complete are served
+    from disk; searches over any other column fall back to ``fallback``. The
+    search is exact, so ``ef_search`` only matters for the fallback.
+    :meth:`add` appends the rows an ingest just committed, so new uploads
+    become searchable immediately. A backfill calls :meth:`invalidate`, and
+    the column is served from PostgreSQL until the next build picks up the
+    filled rows; rows whose stored vectors change (a re-embed) need a rebuild.
+    """
+
+    def __init__(
+        self,
+        directory: os.PathLike[str] | str,
+        *,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = 4096,
+        fallback: Optional[PgVectorIndex] = None,
+    ) -> None:
+        self._directory = Path(directory)
+        self._directory.mkdir(parents=True, exist_ok=True)
+        self._session_factory = session_factory
+        self._batch_size = max(1, batch_size)
+        self._fallback = fallback or PgVectorIndex()
+        self._columns: Dict[str, _ColumnIndex] = {}
+        self._lock = threading.Lock()
+
+    def hybrid_search(
+        self,
+        db: Session,
+        vector: VectorLike,
+        limit: int,
+        *,
+        image_column: str,
+        text_column: str,
+        ef_search: Optional[int] = None,
+        metric: str = METRIC_COSINE,
+    ) -> List[HybridCandidate]:
+        visual_index = self._column(image_column)
+        text_index = self._column(text_column)
+        if not (visual_index.ready() and text_index.ready()):
+            return self._fallback.hybrid_search(
+                db,
+                vector,
+                limit,
+                image_column=image_column,
+                text_column=text_column,
+                ef_search=ef_search,
+                metric=metric,
+            )
+
+        # Stored rows are unit length, so the dot product is the cosine
+        # similarity whichever ``metric`` the model is searched with.
+        query = l2_normalize(vector)
+        if query.size == 0:
+            return []
+        distances: Dict[int, List[Optional[float]]] = {}
+        for slot, index in enumerate((visual_index, text_index)):
+            for image_id, distance in index.search(query, limit):
+                distances.setdefault(image_id, [None, None])[slot] = distance
+        # Rows deleted since the index was built are simply not returned.
+        hits = ImageRepository(db).get_hits(distances)
+        return [
+            (hits[image_id], visual_distance, text_distance)
+            for image_id, (visual_distance, text_distance) in distances.items()
+            if image_id in hits
+        ]
+
+    def build(self, columns: Sequence[str], *, rebuild: bool = False) -> Dict[str, int]:
+        """Create (or fully re-read) the on-disk copy of ``columns``."""
+
+        added: Dict[str, int] = {}
+        session = self._session_factory()
+        try:
+            for column in columns:
+                index = self._column(column)
+                if rebuild:
+                    added[column] = index.rebuild(session, batch_size=self._batch_size)
+                else:
+                    added[column] = index.sync(session, batch_size=self._batch_size)
+            if rebuild or any(added.values()):
+                # Results cached while these rows were missing from disk
+                # must not outlive them.
+                ImageRepository(session).advance_index_epoch()
+        finally:
+            session.close()
+        return added
+
+    def add(self, ids: Sequence[int]) -> None:
+        """Append the just-committed rows ``ids`` to every built column."""
+
+        columns = [path.stem for path in self._directory.glob("*.json")]
+        if not columns or not ids:
+            return
+        session = self._session_factory()
+        try:
+            added = [self._column(column).add(session, ids) for column in columns]
+            if any(added):
+                # Results cached while these rows were missing from disk
+                # must not outlive them.
+                ImageRepository(session).advance_index_epoch()
+        finally:
+            session.close()
+
+    def is_ready(self, column: str) -> bool:
+        return self._column(column).ready()
+
+    def invalidate(self, columns: Sequence[str]) -> None:
+        """Serve ``columns`` from PostgreSQL until they are synced again."""
+
+        for column in columns:
+            index = self._column(column)
+            if index.exists():
+                index.invalidate()
+
+    def _column(self, column: str) -> _ColumnIndex:
+        with self._lock:
+            index = self._columns.get(column)
+            if index is None:
+                index = _ColumnIndex(self._directory, column)
+                self._columns[column] = index
+            return index
+
+
+@lru_cache
+def get_vector_index() -> VectorIndex:
+    """Build the vector index backend selected by ``VECTOR_INDEX_BACKEND``."""
+
+    settings = get_settings()
+    pgvector = PgVectorIndex(
+        ef_search=settings.hnsw_ef_search,
+        iterative_scan=settings.hnsw_iterative_scan,
+        storage=settings.vector_storage,
+        oversample=settings.vector_rerank_oversample,
+    )
+    if settings.vector_index_backend == VECTOR_INDEX_MMAP:
+        return MmapVectorIndex(settings.vector_index_path, fallback=pgvector)
+    if settings.vector_index_backend != VECTOR_INDEX_PGVECTOR:
+        raise RuntimeError(
+            f"Unknown VECTOR_INDEX_BACKEND {settings.vector_index_backend!r}"
+        )
+    return pgvector
+
+
+__all__ = [
+    "MmapVectorIndex",
+    "PgVectorIndex",
+    "VECTOR_INDEX_MMAP",
+    "VECTOR_INDEX_PGVECTOR",
+    "VectorIndex",
+    "get_vector_index",
+]
@@ -1,12 +1,22 @@
 """Utility module exports."""
 
-from .hashing import hash_password, sha256_hash, verify_password
+from .checkpoint import JsonCheckpoint
+from .hashing import hash_password, sha256_hash, sha256_stream, verify_password
+from .perceptual_hash import dhash, hamming_distance
+from .vectors import as_float32, l2_normalize, vector_to_list
 from .storage import MinioStorageClient, get_storage_client
 
 __all__ = [
+    "JsonCheckpoint",
     "hash_password",
     "sha256_hash",
+    "sha256_stream",
     "verify_password",
+    "dhash",
+    "hamming_distance",
+    "as_float32",
+    "l2_normalize",
+    "vector_to_list",
     "MinioStorageClient",
     "get_storage_client",
 ]
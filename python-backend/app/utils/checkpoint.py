@@ -0,0 +1,42 @@
+"""Checkpoint files that let long-running batch jobs resume."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class JsonCheckpoint:
+    """Persist a small JSON document atomically after each unit of work."""
+
+    def __init__(self, path: os.PathLike[str] | str) -> None:
+        self._path = Path(path)
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with self._path.open("r", encoding="utf-8") as handle:
+                return json.load(handle)
+        except FileNotFoundError:
+            return None
+
+    def save(self, state: Dict[str, Any]) -> None:
+        # Write to a sibling file first so an interrupted run never leaves a
+        # truncated checkpoint behind.
+        temporary = self._path.with_name(f"{self._path.name}.tmp")
+        with temporary.open("w", encoding="utf-8") as handle:
+            json.dump(state, handle)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(temporary, self._path)
+
+    def clear(self) -> None:
+        self._path.unlink(missing_ok=True)
+
+
+__all__ = ["JsonCheckpoint"]
@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import hashlib
+from typing import BinaryIO, Optional
+
 from passlib.context import CryptContext
 
 pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
@@ -20,4 +22,33 @@ def sha256_hash(data: bytes) -> str:
     return hashlib.sha256(data).hexdigest()
 
 
-__all__ = ["hash_password", "verify_password", "sha256_hash", "pwd_context"]
+def sha256_stream(
+    stream: BinaryIO,
+    *,
+    chunk_size: int = 1024 * 1024,
+    sink: Optional[BinaryIO] = None,
+) -> str:
+    """Hash ``stream`` chunk by chunk, optionally copying it into ``sink``.
+
+    Only one chunk is held in memory at a time, so arbitrarily large uploads
+    can be hashed without buffering the whole payload.
+    """
+
+    digest = hashlib.sha256()
+    while True:
+        chunk = stream.read(chunk_size)
+        if not chunk:
+            break
+        digest.update(chunk)
+        if sink is not None:
+            sink.write(chunk)
+    return digest.hexdigest()
+
+
+__all__ = [
+    "hash_password",
+    "verify_password",
+    "sha256_hash",
+    "sha256_stream",
+    "pwd_context",
+]
@@ -0,0 +1,68 @@
+"""Perceptual hashing helpers for near-duplicate image detection."""
+
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+from PIL import Image
+
+HASH_BITS = 64
+SEGMENT_COUNT = 4
+SEGMENT_BITS = HASH_BITS // SEGMENT_COUNT
+_SEGMENT_MASK = (1 << SEGMENT_BITS) - 1
+
+
+def dhash(image: Image.Image) -> int:
+    """Return the 64-bit difference hash of ``image``.
+
+    The image is reduced to a 9x8 grayscale thumbnail and each bit records
+    whether a pixel is brighter than its right-hand neighbour, which makes the
+    hash stable across re-encoding, resizing and small colour shifts.
+    """
+
+    thumbnail = image.convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    pixels = np.asarray(thumbnail, dtype=np.int16)
+    bits = (pixels[:, 1:] > pixels[:, :-1]).flatten()
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming_distance(left: int, right: int) -> int:
+    return ((left ^ right) & ((1 << HASH_BITS) - 1)).bit_count()
+
+
+def hash_segments(value: int) -> Tuple[int, ...]:
+    """Split ``value`` into ``SEGMENT_COUNT`` 16-bit segments, most significant first.
+
+    Two hashes within Hamming distance ``SEGMENT_COUNT - 1`` share at least one
+    identical segment, so exact lookups on the segments find every such pair.
+    """
+
+    return tuple(
+        (value >> (SEGMENT_BITS * (SEGMENT_COUNT - 1 - index))) & _SEGMENT_MASK
+        for index in range(SEGMENT_COUNT)
+    )
+
+
+def to_signed64(value: int) -> int:
+    """Map an unsigned 64-bit hash onto PostgreSQL's signed ``BIGINT`` range."""
+
+    return value - (1 << HASH_BITS) if value >= 1 << (HASH_BITS - 1) else value
+
+
+def from_signed64(value: int) -> int:
+    return value + (1 << HASH_BITS) if value < 0 else value
+
+
+__all__ = [
+    "HASH_BITS",
+    "SEGMENT_COUNT",
+    "dhash",
+    "from_signed64",
+    "hamming_distance",
+    "hash_segments",
+    "to_signed64",
+]
@@ -4,7 +4,7 @@ from __future__ import annotations
 
 from functools import lru_cache
 from io import BytesIO
-from typing import Optional
+from typing import BinaryIO, Optional
 
 from minio import Minio
 
@@ -41,10 +41,52 @@ class MinioStorageClient:
         )
         return self.object_url(object_name)
 
+    def upload_stream(
+        self, object_name: str, stream: BinaryIO, content_type: Optional[str]
+    ) -> str:
+        """Upload ``stream`` without knowing its length up front.
+
+        MinIO switches to a multipart upload so only one part of
+        ``minio_part_size`` bytes is buffered at a time.
+        """
+
+        self._client.put_object(
+            self.bucket,
+            object_name,
+            stream,
+            length=-1,
+            part_size=self._settings.minio_part_size,
+            content_type=content_type or "application/octet-stream",
+        )
+        return self.object_url(object_name)
+
+    def download_file(self, object_name: str) -> bytes:
+        response = self._client.get_object(self.bucket, object_name)
+        try:
+            return response.read()
+        finally:
+            response.close()
+            response.release_conn()
+
+    def delete_file(self, object_name: str) -> None:
+        self._client.remove_object(self.bucket, object_name)
+
     def object_url(self, object_name: str) -> str:
         scheme = "https" if self._settings.minio_secure else "http"
         return f"{scheme}://{self._settings.minio_endpoint}/{self.bucket}/{object_name}"
 
+    def object_name_from_url(self, url: str) -> str:
+        """Invert :meth:`object_url`, tolerating a changed endpoint or scheme."""
+
+        prefix = self.object_url("")
+        if url.startswith(prefix):
+            return url[len(prefix):]
+        marker = f"/{self.bucket}/"
+        _, separator, object_name = url.partition(marker)
+        if not separator or not object_name:
+            raise ValueError(f"URL {url!r} does not reference bucket {self.bucket!r}")
+        return object_name
+
     @property
     def client(self) -> Minio:
         return self._client
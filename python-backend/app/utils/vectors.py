@@ -0,0 +1,34 @@
+"""Helpers for embedding vectors carried as ``float32`` arrays."""
+
+from __future__ import annotations
+
+from typing import List, Optional, Sequence, Union
+
+import numpy as np
+
+VectorLike = Union[np.ndarray, Sequence[float]]
+
+
+def as_float32(vector: VectorLike) -> np.ndarray:
+    """Return ``vector`` as a contiguous ``float32`` array, copying only if needed."""
+
+    return np.ascontiguousarray(vector, dtype=np.float32)
+
+
+def l2_normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale ``vectors`` (one per row, or a single vector) to unit length."""
+
+    array = as_float32(vectors)
+    norms = np.linalg.norm(array, axis=-1, keepdims=True)
+    return array / np.maximum(norms, np.float32(1e-12))
+
+
+def vector_to_list(vector: Optional[VectorLike]) -> Optional[List[float]]:
+    """Convert a stored vector to plain floats for JSON responses."""
+
+    if vector is None:
+        return None
+    return as_float32(vector).tolist()
+
+
+__all__ = ["VectorLike", "as_float32", "l2_normalize", "vector_to_list"]
@@ -1,5 +1,15 @@
 """Worker task exports."""
 
-from .ocr_tasks import extract_text_from_image
+from .backfill import BackfillProgress, EmbeddingBackfill
+from .ingest_jobs import IngestJob, IngestJobQueue, get_ingest_job_queue
+from .ocr_tasks import extract_text_from_image, submit_text_extraction
 
-__all__ = ["extract_text_from_image"]
+__all__ = [
+    "BackfillProgress",
+    "EmbeddingBackfill",
+    "IngestJob",
+    "IngestJobQueue",
+    "extract_text_from_image",
+    "get_ingest_job_queue",
+    "submit_text_extraction",
+]
@@ -0,0 +1,162 @@
+"""Resumable re-embedding of stored images."""
+
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from io import BytesIO
+from typing import Callable, Dict, List, Optional, Sequence
+
+from PIL import Image
+from sqlalchemy.orm import Session
+
+from app.db.session import SessionLocal
+from app.repositories.images_repo import ImageRepository
+from app.services.embedding_registry import ModelEncoder, encode_batch_columns
+from app.services.ocr_service import OCRBackend
+from app.utils.checkpoint import JsonCheckpoint
+from app.utils.storage import MinioStorageClient
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(slots=True)
+class BackfillProgress:
+    """Counters persisted in the checkpoint after every batch."""
+
+    last_id: int = 0
+    updated: int = 0
+    failed: int = 0
+
+
+class EmbeddingBackfill:
+    """Re-run CLIP and OCR over existing ``images`` rows in keyset batches.
+
+    Each batch is read without its vectors, the objects are re-fetched from
+    MinIO concurrently, images and texts are encoded with one model pass per
+    batch and model, and the results are written with a single bulk
+    ``UPDATE`` into the columns of every model in ``encoders``. The
+    checkpoint is saved after every committed batch so a restart continues
+    from the last processed id, and each batch holds its transaction only for
+    the duration of the write. A run that reaches the end of the table
+    clears the checkpoint, so the next one starts from the first row.
+    """
+
+    def __init__(
+        self,
+        *,
+        storage_client: MinioStorageClient,
+        encoders: Sequence[ModelEncoder],
+        ocr_service: Optional[OCRBackend],
+        checkpoint: JsonCheckpoint,
+        session_factory: Callable[[], Session] = SessionLocal,
+        batch_size: int = 64,
+        download_workers: int = 8,
+        missing_only: bool = True,
+    ) -> None:
+        self._storage_client = storage_client
+        self._encoders = list(encoders)
+        # ``None`` reuses the stored OCR text and only re-encodes it.
+        self._ocr_service = ocr_service
+        self._checkpoint = checkpoint
+        self._session_factory = session_factory
+        self._batch_size = max(1, batch_size)
+        self._download_workers = max(1, download_workers)
+        self._missing_only = missing_only
+
+    def load_progress(self) -> BackfillProgress:
+        state = self._checkpoint.load() or {}
+        return BackfillProgress(
+            last_id=int(state.get("last_id", 0)),
+            updated=int(state.get("updated", 0)),
+            failed=int(state.get("failed", 0)),
+        )
+
+    def run(
+        self,
+        progress: Optional[BackfillProgress] = None,
+        on_batch: Optional[Callable[[BackfillProgress], None]] = None,
+    ) -> BackfillProgress:
+        progress = progress or self.load_progress()
+        with ThreadPoolExecutor(
+            max_workers=self._download_workers, thread_name_prefix="backfill-download"
+        ) as downloader:
+            while True:
+                session = self._session_factory()
+                try:
+                    repository = ImageRepository(session)
+                    rows = repository.list_for_backfill(
+                        after_id=progress.last_id,
+                        limit=self._batch_size,
+                        missing_only=self._missing_only,
+                        image_columns=[
+                            encoder.spec.image_column for encoder in self._encoders
+                        ],
+                        text_columns=[
+                            encoder.spec.text_column for encoder in self._encoders
+                        ],
+                    )
+                    if not rows:
+                        self._checkpoint.clear()
+                        return progress
+                    # End the read transaction before the slow model stages.
+                    session.rollback()
+                    updates, failed = self._process_batch(rows, downloader)
+                    repository.bulk_update(updates)
+                finally:
+                    session.close()
+
+                progress.last_id = rows[-1][0]
+                progress.updated += len(updates)
+                progress.failed += failed
+                self._checkpoint.save(
+                    {
+                        "last_id": progress.last_id,
+                        "updated": progress.updated,
+                        "failed": progress.failed,
+                    }
+                )
+                if on_batch is not None:
+                    on_batch(progress)
+
+    def _process_batch(
+        self,
+        rows: List[tuple[int, str, Optional[str]]],
+        downloader: ThreadPoolExecutor,
+    ) -> tuple[List[Dict[str, object]], int]:
+        downloads = [downloader.submit(self._load_image, url) for _, url, _ in rows]
+        loaded: List[tuple[int, Optional[str], Image.Image]] = []
+        failed = 0
+        for (image_id, url, text), future in zip(rows, downloads):
+            try:
+                loaded.append((image_id, text, future.result()))
+            except Exception:
+                logger.exception("Skipping image %s; could not load %s.", image_id, url)
+                failed += 1
+        if not loaded:
+            return [], failed
+
+        if self._ocr_service is None:
+            texts = [text for _, text, _ in loaded]
+        else:
+            ocr_futures = [self._ocr_service.submit(image) for _, _, image in loaded]
+            texts = [future.result() for future in ocr_futures]
+
+        batch_vectors = encode_batch_columns(
+            self._encoders, [image for _, _, image in loaded], texts
+        )
+        updates = [
+            {"id": image_id, "text": text, **vectors}
+            for (image_id, _, _), text, vectors in zip(loaded, texts, batch_vectors)
+        ]
+        return updates, failed
+
+    def _load_image(self, url: str) -> Image.Image:
+        object_name = self._storage_client.object_name_from_url(url)
+        data = self._storage_client.download_file(object_name)
+        return Image.open(BytesIO(data)).convert("RGB")
+
+
+__all__ = ["BackfillProgress", "EmbeddingBackfill"]
@@ -0,0 +1,394 @@
+"""Background job pipeline for image ingestion."""
+
+from __future__ import annotations
+
+import logging
+import secrets
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Callable, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from app.core.config import get_settings
+from app.db.session import SessionLocal, engine
+from app.models.ingest_jobs import IngestJobRecord
+from app.repositories.ingest_jobs_repo import IngestJobRepository
+from app.services.image_ingest_service import (
+    PROCESSING_STAGES,
+    ImageIngestService,
+    get_image_ingest_service,
+)
+from app.utils.hashing import sha256_hash
+
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_SUCCEEDED = "succeeded"
+JOB_FAILED = "failed"
+
+_FINISHED_STATUSES = frozenset({JOB_SUCCEEDED, JOB_FAILED})
+_UNFINISHED_STATUSES = frozenset({JOB_QUEUED, JOB_RUNNING})
+
+
+class IngestQueueFullError(RuntimeError):
+    """Raised when ``max_pending`` jobs are already waiting or running."""
+
+
+@dataclass(slots=True)
+class IngestJob:
+    """Snapshot of an ingest job's progress."""
+
+    id: str
+    filename: str
+    status: str
+    created_at: datetime
+    updated_at: datetime
+    stage: Optional[str] = None
+    progress: float = 0.0
+    image_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+def _to_job(record: IngestJobRecord) -> IngestJob:
+    return IngestJob(
+        id=record.id,
+        filename=record.filename,
+        status=record.status,
+        created_at=record.created_at,
+        updated_at=record.updated_at,
+        stage=record.stage,
+        progress=record.progress,
+        image_id=record.image_id,
+        error=record.error,
+    )
+
+
+class IngestJobQueue:
+    """Run the expensive ingest stages on a pool of worker threads.
+
+    The raw bytes are written to object storage before a job is enqueued, so
+    the request handler only pays for the upload while CLIP, OCR and the
+    database write happen on the pool. Each pending job holds its upload in
+    memory, so at most ``max_pending`` jobs are accepted at once and further
+    submissions are refused until one finishes.
+
+    Job state lives in the ``ingest_jobs`` table so any API process can report
+    it; only the most recent ``max_finished_jobs`` completed jobs are kept.
+    Each process holds a PostgreSQL advisory lock on its own owner key for as
+    long as it runs, and :meth:`recover` re-enqueues unfinished jobs whose
+    owner's lock is free, i.e. whose process has exited.
+    """
+
+    def __init__(
+        self,
+        ingest_service: ImageIngestService,
+        *,
+        max_workers: int = 2,
+        max_pending: int = 32,
+        session_factory: Callable[[], Session] = SessionLocal,
+        bind: Engine = engine,
+        max_finished_jobs: int = 1000,
+    ) -> None:
+        self._ingest_service = ingest_service
+        self._pending = threading.BoundedSemaphore(max(1, max_pending))
+        self._session_factory = session_factory
+        self._bind = bind
+        self._max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="ingest-worker"
+        )
+        # Advisory lock keys are signed 64-bit integers.
+        self._owner = secrets.randbits(63)
+        self._owner_connection: Optional[Connection] = None
+        self._owner_lock = threading.Lock()
+
+    def submit(
+        self,
+        *,
+        data: bytes,
+        filename: str,
+        content_type: Optional[str],
+    ) -> IngestJob:
+        """Store ``data`` and enqueue the remaining ingest stages.
+
+        Content that was already ingested completes immediately with the id of
+        the existing image instead of being stored and processed again. Raises
+        :class:`IngestQueueFullError` when the queue has no free slot.
+        """
+
+        hash_value = sha256_hash(data)
+        session = self._session_factory()
+        try:
+            existing = self._ingest_service.find_duplicate(
+                db=session, hash_value=hash_value
+            )
+            existing_id = existing.id if existing is not None else None
+        finally:
+            session.close()
+
+        now = datetime.now(timezone.utc)
+        record = IngestJobRecord(
+            id=uuid.uuid4().hex,
+            filename=filename,
+            status=JOB_QUEUED,
+            progress=0.0,
+            hash=hash_value,
+            created_at=now,
+            updated_at=now,
+        )
+        if existing_id is not None:
+            record.status = JOB_SUCCEEDED
+            record.progress = 1.0
+            record.image_id = existing_id
+            job = self._create(record)
+            self._prune()
+            return job
+
+        if not self._pending.acquire(blocking=False):
+            raise IngestQueueFullError("too many ingest jobs are pending")
+        try:
+            record.owner = self._owner_key()
+            record.url = self._ingest_service.store(
+                data=data, filename=filename, content_type=content_type
+            )
+            try:
+                job = self._create(record)
+            except BaseException:
+                self._discard(record.id, record.url)
+                raise
+            self._executor.submit(self._run, job.id, record.url, data, hash_value)
+        except BaseException:
+            self._pending.release()
+            raise
+        return job
+
+    def get(self, job_id: str) -> Optional[IngestJob]:
+        session = self._session_factory()
+        try:
+            record = IngestJobRepository(session).get(job_id)
+            return _to_job(record) if record is not None else None
+        finally:
+            session.close()
+
+    def recover(self) -> int:
+        """Re-enqueue unfinished jobs of processes that have exited.
+
+        Returns the number of jobs picked up. Recovered jobs read their bytes
+        back from object storage and do not count against ``max_pending``.
+        """
+
+        owner = self._owner_key()
+        claimed: list[tuple[str, Optional[str], Optional[str]]] = []
+        session = self._session_factory()
+        try:
+            repository = IngestJobRepository(session)
+            for previous in repository.owners_of(_UNFINISHED_STATUSES):
+                if previous == owner:
+                    continue
+                with self._owner_lock:
+                    connection = self._owner_connection
+                    assert connection is not None
+                    # The lock is only free once the previous owner's
+                    # connection has closed; holding it while claiming keeps
+                    # two recovering processes from taking the same jobs.
+                    free = connection.scalar(
+                        select(func.pg_try_advisory_lock(previous))
+                    )
+                    connection.commit()
+                    if not free:
+                        continue
+                    try:
+                        records = repository.claim(
+                            previous_owner=previous,
+                            owner=owner,
+                            statuses=_UNFINISHED_STATUSES,
+                            status=JOB_QUEUED,
+                        )
+                    finally:
+                        connection.scalar(select(func.pg_advisory_unlock(previous)))
+                        connection.commit()
+                claimed.extend((record.id, record.url, record.hash) for record in records)
+        finally:
+            session.close()
+
+        for job_id, url, hash_value in claimed:
+            if url is None:
+                self._update(job_id, status=JOB_FAILED, error="upload was interrupted")
+                continue
+            logger.info("Recovering ingest job %s.", job_id)
+            self._executor.submit(self._run, job_id, url, None, hash_value, False)
+        return len(claimed)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+        with self._owner_lock:
+            if self._owner_connection is not None:
+                self._owner_connection.close()
+                self._owner_connection = None
+
+    def _owner_key(self) -> int:
+        """Return this process's owner key, taking its advisory lock once."""
+
+        with self._owner_lock:
+            if self._owner_connection is None:
+                connection = self._bind.connect()
+                try:
+                    connection.scalar(select(func.pg_advisory_lock(self._owner)))
+                    connection.commit()
+                except BaseException:
+                    connection.close()
+                    raise
+                self._owner_connection = connection
+        return self._owner
+
+    def _create(self, record: IngestJobRecord) -> IngestJob:
+        session = self._session_factory()
+        try:
+            return _to_job(IngestJobRepository(session).create(record))
+        finally:
+            session.close()
+
+    def _run(
+        self,
+        job_id: str,
+        url: str,
+        data: Optional[bytes],
+        hash_value: Optional[str],
+        holds_slot: bool = True,
+    ) -> None:
+        session: Optional[Session] = None
+        try:
+            self._update(job_id, status=JOB_RUNNING)
+            if data is None:
+                # A recovered job may have been committed just before its
+                # process exited.
+                existing_id = self._referencing_image(url, hash_value)
+                if existing_id is not None:
+                    self._update(
+                        job_id,
+                        status=JOB_SUCCEEDED,
+                        stage=None,
+                        progress=1.0,
+                        image_id=existing_id,
+                    )
+                    return
+                data = self._ingest_service.fetch(url)
+            session = self._session_factory()
+            metadata = self._ingest_service.process(
+                db=session,
+                url=url,
+                data=data,
+                hash_value=hash_value,
+                on_stage=lambda stage: self._on_stage(job_id, stage),
+            )
+        except Exception as exc:
+            logger.exception("Ingest job %s failed.", job_id)
+            self._update(job_id, status=JOB_FAILED, error=str(exc) or type(exc).__name__)
+            try:
+                referenced = self._referencing_image(url, hash_value) is not None
+            except Exception:
+                # Keep the object rather than risk deleting one that is in use.
+                logger.warning("Could not check whether %s is in use.", url, exc_info=True)
+            else:
+                if not referenced:
+                    self._discard(job_id, url)
+        else:
+            self._update(
+                job_id,
+                status=JOB_SUCCEEDED,
+                stage=None,
+                progress=1.0,
+                image_id=metadata.id,
+            )
+        finally:
+            if session is not None:
+                session.close()
+            if holds_slot:
+                self._pending.release()
+            self._prune()
+
+    def _on_stage(self, job_id: str, stage: str) -> None:
+        try:
+            completed = PROCESSING_STAGES.index(stage)
+        except ValueError:
+            completed = 0
+        self._update(
+            job_id, stage=stage, progress=completed / len(PROCESSING_STAGES)
+        )
+
+    def _update(self, job_id: str, **changes: object) -> None:
+        session = self._session_factory()
+        try:
+            IngestJobRepository(session).update(job_id, **changes)
+        except Exception:
+            logger.warning("Could not update ingest job %s.", job_id, exc_info=True)
+        finally:
+            session.close()
+
+    def _referencing_image(self, url: str, hash_value: Optional[str]) -> Optional[int]:
+        """Return the id of a committed image stored at ``url``, if any."""
+
+        if hash_value is None:
+            return None
+        session = self._session_factory()
+        try:
+            existing = self._ingest_service.find_duplicate(
+                db=session, hash_value=hash_value
+            )
+        finally:
+            session.close()
+        if existing is None or existing.url != url:
+            return None
+        return existing.id
+
+    def _discard(self, job_id: str, url: str) -> None:
+        try:
+            self._ingest_service.discard(url)
+        except Exception:
+            logger.warning(
+                "Could not delete the stored object of ingest job %s.",
+                job_id,
+                exc_info=True,
+            )
+
+    def _prune(self) -> None:
+        session = self._session_factory()
+        try:
+            IngestJobRepository(session).prune(
+                statuses=_FINISHED_STATUSES, keep=self._max_finished_jobs
+            )
+        except Exception:
+            logger.warning("Could not prune finished ingest jobs.", exc_info=True)
+        finally:
+            session.close()
+
+
+@lru_cache
+def get_ingest_job_queue() -> IngestJobQueue:
+    settings = get_settings()
+    return IngestJobQueue(
+        get_image_ingest_service(),
+        max_workers=settings.ingest_workers,
+        max_pending=settings.ingest_queue_size,
+    )
+
+
+__all__ = [
+    "IngestJob",
+    "IngestJobQueue",
+    "IngestQueueFullError",
+    "JOB_FAILED",
+    "JOB_QUEUED",
+    "JOB_RUNNING",
+    "JOB_SUCCEEDED",
+    "get_ingest_job_queue",
+]
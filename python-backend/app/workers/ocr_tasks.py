@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from concurrent.futures import Future
 from typing import Optional
 
 from PIL import Image
@@ -15,4 +16,10 @@ def extract_text_from_image(image: Image.Image) -> Optional[str]:
     return get_ocr_service().extract_text(image)
 
 
-__all__ = ["extract_text_from_image"]
+def submit_text_extraction(image: Image.Image) -> "Future[Optional[str]]":
+    """Queue OCR for ``image`` on the configured backend without blocking."""
+
+    return get_ocr_service().submit(image)
+
+
+__all__ = ["extract_text_from_image", "submit_text_extraction"]
@@ -0,0 +1,10 @@
+"""Shared test configuration."""
+
+from __future__ import annotations
+
+import os
+
+# ``app.db.session`` builds its engine at import time; no connection is made
+# until a test actually queries the database.
+os.environ.setdefault("DATABASE_URL", "postgresql://localhost/rag_test")
+os.environ.setdefault("JWT_SECRET", "test-secret")
@@ -0,0 +1,75 @@
+"""Tests for the perceptual hashing helpers."""
+
+from __future__ import annotations
+
+import itertools
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import _MAX_NEAR_DUPLICATE_DISTANCE
+from app.utils.perceptual_hash import (
+    HASH_BITS,
+    SEGMENT_COUNT,
+    dhash,
+    from_signed64,
+    hamming_distance,
+    hash_segments,
+    to_signed64,
+)
+
+
+def _gradient(width: int = 64, height: int = 48) -> Image.Image:
+    row = np.linspace(0, 255, width, dtype=np.uint8)
+    return Image.fromarray(np.tile(row, (height, 1))).convert("RGB")
+
+
+def test_dhash_of_horizontal_gradient_sets_every_bit() -> None:
+    # Already 9x8, so the thumbnail is the image itself.
+    assert dhash(_gradient(9, 8)) == (1 << HASH_BITS) - 1
+
+
+def test_dhash_of_flat_image_is_zero() -> None:
+    assert dhash(Image.new("RGB", (32, 32), (120, 30, 200))) == 0
+
+
+def test_dhash_is_stable_across_resizing() -> None:
+    image = _gradient(640, 480)
+    assert hamming_distance(dhash(image), dhash(image.resize((320, 240)))) <= 2
+
+
+def test_hamming_distance_counts_differing_bits() -> None:
+    assert hamming_distance(0, 0) == 0
+    assert hamming_distance(0b1011, 0b0001) == 2
+    assert hamming_distance(0, (1 << HASH_BITS) - 1) == HASH_BITS
+
+
+def test_hamming_distance_ignores_bits_above_the_hash_width() -> None:
+    assert hamming_distance(1 << HASH_BITS, 0) == 0
+
+
+def test_hash_segments_split_most_significant_first() -> None:
+    value = 0x1234_5678_9ABC_DEF0
+    assert hash_segments(value) == (0x1234, 0x5678, 0x9ABC, 0xDEF0)
+
+
+def test_close_hashes_share_a_segment() -> None:
+    value = 0x0F0F_F0F0_AAAA_5555
+    for bits in itertools.combinations(range(HASH_BITS), SEGMENT_COUNT - 1):
+        other = value
+        for bit in bits:
+            other ^= 1 << bit
+        assert set(enumerate(hash_segments(value))) & set(
+            enumerate(hash_segments(other))
+        )
+
+
+def test_near_duplicate_distance_limit_matches_the_segment_count() -> None:
+    assert _MAX_NEAR_DUPLICATE_DISTANCE == SEGMENT_COUNT - 1
+
+
+def test_signed64_round_trip() -> None:
+    for value in (0, 1, (1 << 63) - 1, 1 << 63, (1 << HASH_BITS) - 1):
+        signed = to_signed64(value)
+        assert -(1 << 63) <= signed < 1 << 63
+        assert from_signed64(signed) == value
@@ -0,0 +1,121 @@
+"""Tests for the on-disk column copies behind the mmap vector index."""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.services.vector_index import _ColumnIndex
+
+
+def _index_with(tmp_path: Path, rows: dict[int, list[float]]) -> _ColumnIndex:
+    index = _ColumnIndex(tmp_path, "embedding")
+    state = index._load_state()
+    vectors = [
+        (image_id, np.asarray(vector, dtype=np.float32))
+        for image_id, vector in rows.items()
+    ]
+    index._append(vectors, state, np.empty(0, dtype=np.int64))
+    state["last_id"] = max(rows)
+    state["complete"] = True
+    index._state.save(state)
+    return index
+
+
+def test_search_returns_nearest_rows_by_cosine_distance(tmp_path: Path) -> None:
+    index = _index_with(
+        tmp_path, {1: [1.0, 0.0], 2: [0.0, 3.0], 3: [2.0, 2.0], 4: [-1.0, 0.0]}
+    )
+
+    results = index.search(np.asarray([1.0, 0.0], dtype=np.float32), 3)
+
+    assert [image_id for image_id, _ in results] == [1, 3, 2]
+    distances = [distance for _, distance in results]
+    assert distances == pytest.approx([0.0, 1.0 - np.sqrt(0.5), 1.0], abs=1e-6)
+
+
+def test_search_merges_chunks(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr("app.services.vector_index._SEARCH_CHUNK_ROWS", 2)
+    index = _index_with(
+        tmp_path,
+        {image_id: [1.0, image_id / 10] for image_id in range(1, 8)},
+    )
+
+    results = index.search(np.asarray([1.0, 0.0], dtype=np.float32), 3)
+
+    assert [image_id for image_id, _ in results] == [1, 2, 3]
+
+
+def test_search_on_empty_index_returns_nothing(tmp_path: Path) -> None:
+    index = _ColumnIndex(tmp_path, "embedding")
+
+    assert index.search(np.asarray([1.0, 0.0], dtype=np.float32), 3) == []
+    assert not index.ready()
+
+
+def test_append_skips_rows_already_on_disk_and_missing_vectors(tmp_path: Path) -> None:
+    index = _index_with(tmp_path, {1: [1.0, 0.0], 2: [0.0, 1.0]})
+    state = index._load_state()
+    known = np.sort(index._indexed_ids(state["rows"]))
+
+    added = index._append(
+        [
+            (2, np.asarray([0.0, 1.0], dtype=np.float32)),
+            (3, None),
+            (4, np.asarray([1.0, 1.0], dtype=np.float32)),
+        ],
+        state,
+        known,
+    )
+
+    assert added == 1
+    assert index._indexed_ids(state["rows"]).tolist() == [1, 2, 4]
+
+
+def test_known_ids_merge_rows_appended_since_the_last_call(tmp_path: Path) -> None:
+    index = _index_with(tmp_path, {5: [1.0, 0.0], 2: [0.0, 1.0]})
+    state = index._load_state()
+    assert index._known_ids(state).tolist() == [2, 5]
+
+    index._append(
+        [
+            (3, np.asarray([1.0, 1.0], dtype=np.float32)),
+            (9, np.asarray([1.0, 2.0], dtype=np.float32)),
+        ],
+        state,
+        index._known_ids(state),
+    )
+
+    assert index._known_ids(state).tolist() == [2, 3, 5, 9]
+    rebuilt = {**state, "generation": "rebuilt", "rows": 1}
+    assert index._known_ids(rebuilt).tolist() == [5]
+
+
+def test_rows_appended_after_the_last_saved_state_are_truncated(tmp_path: Path) -> None:
+    index = _index_with(tmp_path, {1: [1.0, 0.0], 2: [0.0, 1.0]})
+    # A writer that crashed after appending but before saving its state.
+    crashed = index._load_state()
+    index._append(
+        [(3, np.asarray([1.0, 1.0], dtype=np.float32))],
+        crashed,
+        np.empty(0, dtype=np.int64),
+    )
+
+    state = index._load_state()
+
+    assert state["rows"] == 2
+    assert (tmp_path / "embedding.ids").stat().st_size == 2 * 8
+    assert (tmp_path / "embedding.vectors").stat().st_size == 2 * 2 * 4
+    results = index.search(np.asarray([1.0, 1.0], dtype=np.float32), 5)
+    assert sorted(image_id for image_id, _ in results) == [1, 2]
+
+
+def test_ready_requires_a_verified_non_empty_copy(tmp_path: Path) -> None:
+    index = _index_with(tmp_path, {1: [1.0, 0.0]})
+    assert index.ready()
+
+    index.invalidate()
+
+    assert not index.ready()